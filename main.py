@@ -4,6 +4,7 @@ Local CLI tool for generating contributors data.
 
 Usage:
     python main.py [--token TOKEN] <target1> [target2] [...]
+    python main.py [--token TOKEN] --batch jobs.json
     
 Examples:
     python main.py 'Sunrisepeak/*'
@@ -16,6 +17,8 @@ Targets format:
     
 Options:
     --token TOKEN    : GitHub personal access token (or use GITHUB_TOKEN env var)
+    --batch FILE     : Run every job in a JSON batch file from one shared collection
+                       (outputs are written only; no commit / PR)
 """
 
 import os
@@ -38,6 +41,31 @@ os.environ.setdefault("OUTPUT_DIR", ".thanks-contributors")
 os.environ.setdefault("INCLUDE_ANONYMOUS", "true")
 os.environ.setdefault("SKIP_ARCHIVED", "false")
 os.environ.setdefault("PER_REPO_DELAY_MS", "150")
+os.environ.setdefault("HTML_MODE", "inline")
+
+def run_batch(batch_file, token):
+    from batch import BatchRunner, load_jobs
+    from collect_contributors import CollectorConfig
+    from git import write_github_output
+
+    try:
+        jobs = load_jobs(batch_file, CollectorConfig.from_env(token=token))
+        print(f"🚀 Running {len(jobs)} batch jobs from {batch_file}")
+        results = BatchRunner(jobs).run()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted by user")
+        sys.exit(130)
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    print("\n✅ Batch complete!")
+    for name, result in results.items():
+        print(f"   {'📝' if result.changed else '✔️ '} {name}: {len(result.contributors_list)} contributors, {len(result.written)} files written")
+    write_github_output("updated", "true" if any(r.changed for r in results.values()) else "false")
+
 
 def main():
     # Parse command line arguments
@@ -47,6 +75,7 @@ def main():
         add_help=False
     )
     parser.add_argument('--token', type=str, help='GitHub personal access token')
+    parser.add_argument('--batch', type=str, help='JSON batch file with many jobs')
     parser.add_argument('targets', nargs='*', help='Target repositories (owner/* or owner/repo)')
     parser.add_argument('-h', '--help', action='store_true', help='Show this help message')
 
@@ -71,6 +100,10 @@ def main():
     
     # Set token for script
     os.environ["GH_TOKEN"] = token
+
+    if args.batch:
+        run_batch(args.batch, token)
+        return
     
     # Resolve targets: CLI > env TARGETS > default for this repo > auto-detect
     if args.targets:
@@ -91,16 +124,16 @@ def main():
         targets = "Sunrisepeak/* mcpp-community/* d2learn/*"
         print("🔧 Using default targets for Sunrisepeak/thanks-contributors")
 
-    os.environ["TARGETS"] = targets
-
     print(f"🚀 Collecting contributors for: {targets or '(auto-detect)'}")
     print(f"📁 Output directory: {os.getcwd()}")
     print()
     
     # Import and run the collector
     try:
-        from collect_contributors import main as collect_main
-        changed = collect_main()  # Returns True if contributors changed
+        from collect_contributors import Collector, CollectorConfig
+        config = CollectorConfig.from_env(token=token, targets=targets)
+        result = Collector(config).run()
+        changed = result.changed  # True if outputs changed
         
         # Resolve output paths
         paths = get_output_paths()
@@ -127,6 +160,7 @@ def main():
         generated_files = list(get_tracked_files())
         repo_root = str(GITHUB_WORKSPACE or REPO_ROOT)
         write_github_output("updated", "true" if changed else "false")
+        write_github_output("partial", "true" if result.partial else "false")
 
         auto_commit_enabled = os.environ.get("AUTO_COMMIT", "true").lower() == "true"
         commit_message = os.environ.get("COMMIT_MESSAGE", "chore: update contributors")
@@ -136,6 +170,7 @@ def main():
         )
         pr_branch_name = os.environ.get("PR_BRANCH_NAME", "thanks-contributors/update")
         pr_title = os.environ.get("PR_TITLE", "chore: update contributors")
+        commit_mode = os.environ.get("COMMIT_MODE", "git").strip().lower() or "git"
 
         if changed:
             if auto_commit_enabled:
@@ -145,6 +180,7 @@ def main():
                     user_name=git_user_name,
                     user_email=git_user_email,
                     cwd=repo_root,
+                    mode=commit_mode,
                 )
             else:
                 # Create or update PR instead of auto-commit
@@ -157,6 +193,7 @@ def main():
                     user_name=git_user_name,
                     user_email=git_user_email,
                     cwd=repo_root,
+                    mode=commit_mode,
                 )
         else:
             print("ℹ️  No changes detected; skipping git push.")
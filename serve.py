@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Long-running contributors service with webhook-triggered refresh.
+
+Keeps one Collector (repo inventory, contributor lists, HTTP connections,
+ETag and avatar caches) warm in memory, refreshes only the repos named by
+incoming events and serves the current walls over HTTP.
+
+Usage:
+    python serve.py [--token TOKEN] [--port 8080] [--debounce 10] <target1> [target2] [...]
+
+Endpoints:
+    POST /webhook                GitHub push / repository events
+                                 (signature checked when WEBHOOK_SECRET is set)
+    POST /refresh[?repo=o/r]     Local trigger; without repo refreshes everything
+    GET  /healthz                Service status as JSON
+    GET  /<file>                 Current artifacts (contributors.json, .html, .png, ...)
+                                 with ETag / If-None-Match support
+
+Options:
+    --token TOKEN    : GitHub personal access token (or use GITHUB_TOKEN env var)
+    --host HOST      : Bind address (default 127.0.0.1)
+    --port PORT      : Bind port (default 8080)
+    --debounce SECS  : Quiet period that coalesces bursts of events (default 10)
+"""
+
+import os
+import sys
+import json
+import hmac
+import time
+import hashlib
+import argparse
+import mimetypes
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent
+SRC_DIR = REPO_ROOT / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from collect_contributors import Collector, CollectorConfig
+
+os.environ.setdefault("OUTPUT_DIR", ".thanks-contributors")
+os.environ.setdefault("PER_REPO_DELAY_MS", "0")
+
+# Refresh at the latest this long after the first queued event, even if
+# events keep arriving inside the debounce window
+MAX_DEBOUNCE_FACTOR = 6
+FULL_REFRESH = "*"
+
+
+class Artifacts:
+    """In-memory snapshot of the output directory, served with strong ETags"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def reload(self):
+        files = {}
+        if self.root.exists():
+            for path in self.root.rglob("*"):
+                if not path.is_file() or path.name.startswith("."):
+                    continue
+                data = path.read_bytes()
+                ctype = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+                etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+                files[path.relative_to(self.root).as_posix()] = (data, etag, ctype)
+        with self._lock:
+            self._files = files
+
+    def get(self, name: str):
+        with self._lock:
+            return self._files.get(name)
+
+
+class Refresher:
+    """Queues repos to refresh and runs the Collector once per burst of events"""
+
+    def __init__(self, collector: Collector, artifacts: Artifacts, debounce: float):
+        self.collector = collector
+        self.artifacts = artifacts
+        self.debounce = debounce
+        self.pending = set()
+        self.invalidate = False
+        self.first_event = None
+        self.last_event = None
+        self.last_refresh = None
+        self.last_error = None
+        self.refreshes = 0
+        self._cond = threading.Condition()
+
+    def submit(self, repo: str = FULL_REFRESH, invalidate: bool = False):
+        now = time.monotonic()
+        with self._cond:
+            self.pending.add(repo)
+            self.invalidate = self.invalidate or invalidate
+            self.first_event = self.first_event or now
+            self.last_event = now
+            self._cond.notify()
+
+    def _take_batch(self):
+        with self._cond:
+            while True:
+                if not self.pending:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                quiet_until = self.last_event + self.debounce
+                latest = self.first_event + self.debounce * MAX_DEBOUNCE_FACTOR
+                if now >= quiet_until or now >= latest:
+                    break
+                self._cond.wait(min(quiet_until, latest) - now)
+            batch, invalidate = self.pending, self.invalidate
+            self.pending, self.invalidate = set(), False
+            self.first_event = self.last_event = None
+            return batch, invalidate
+
+    def run_once(self, batch, invalidate: bool = False):
+        started = time.time()
+        if invalidate:
+            self.collector.invalidate_inventory()
+        refresh = None if FULL_REFRESH in batch else batch
+        label = "all repos" if refresh is None else ", ".join(sorted(refresh))
+        print(f"🔄 Refreshing {label}")
+        try:
+            result = self.collector.write(self.collector.collect(refresh=refresh))
+            self.artifacts.reload()
+            self.last_error = None
+            print(f"✅ Refresh done in {time.time() - started:.1f}s (changed={result.changed})")
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"❌ Refresh failed: {e}")
+        self.last_refresh = time.time()
+        self.refreshes += 1
+
+    def loop(self):
+        while True:
+            batch, invalidate = self._take_batch()
+            self.run_once(batch, invalidate)
+
+    def status(self):
+        with self._cond:
+            pending = sorted(self.pending)
+        return {
+            "pending": pending,
+            "refreshes": self.refreshes,
+            "last_refresh": self.last_refresh,
+            "last_error": self.last_error,
+            "api": self.collector.client.stats.snapshot(),
+        }
+
+
+def verify_signature(secret: str, body: bytes, signature: str) -> bool:
+    if not secret:
+        return True
+    expected = "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+def make_handler(refresher: Refresher, artifacts: Artifacts, secret: str):
+    collector = refresher.collector
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, body: bytes = b"", ctype: str = "application/json", headers=None):
+            self.send_response(status)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            if status != 304:
+                self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _json(self, status: int, payload):
+            self._reply(status, json.dumps(payload).encode("utf-8"))
+
+        def do_GET(self):
+            path = urllib.parse.urlsplit(self.path).path
+            if path == "/healthz":
+                return self._json(200, refresher.status())
+            name = path.lstrip("/") or "contributors.html"
+            entry = artifacts.get(name)
+            if entry is None:
+                return self._json(404, {"error": f"{name} not found"})
+            data, etag, ctype = entry
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+                return self._reply(304, headers=headers)
+            self._reply(200, data, ctype, headers)
+
+        do_HEAD = do_GET
+
+        def do_POST(self):
+            parsed = urllib.parse.urlsplit(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+
+            if parsed.path == "/refresh":
+                repos = urllib.parse.parse_qs(parsed.query).get("repo") or [FULL_REFRESH]
+                for repo in repos:
+                    refresher.submit(repo)
+                return self._json(202, {"queued": repos})
+
+            if parsed.path != "/webhook":
+                return self._json(404, {"error": "not found"})
+            if not verify_signature(secret, body, self.headers.get("X-Hub-Signature-256")):
+                return self._json(401, {"error": "bad signature"})
+
+            event = self.headers.get("X-GitHub-Event", "")
+            if event == "ping":
+                return self._json(200, {"ok": True})
+            try:
+                payload = json.loads(body.decode("utf-8") or "{}")
+            except ValueError:
+                return self._json(400, {"error": "invalid JSON"})
+            full_name = (payload.get("repository") or {}).get("full_name")
+            if event not in ("push", "repository") or not full_name:
+                return self._json(202, {"ignored": event})
+            if not collector.tracks(full_name):
+                return self._json(202, {"ignored": full_name})
+
+            # Repos created / renamed / archived change the inventory itself
+            refresher.submit(full_name, invalidate=(event == "repository"))
+            return self._json(202, {"queued": [full_name]})
+
+        def log_message(self, fmt, *args):
+            print(f"INFO: {self.address_string()} {fmt % args}")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve contributor walls and refresh them on GitHub webhooks",
+        usage="python serve.py [--token TOKEN] [--port 8080] <target1> [target2] ...",
+    )
+    parser.add_argument("--token", type=str, help="GitHub personal access token")
+    parser.add_argument("--host", type=str, default=os.environ.get("SERVE_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("SERVE_PORT", "8080")))
+    parser.add_argument("--debounce", type=float, default=float(os.environ.get("REFRESH_DEBOUNCE", "10")))
+    parser.add_argument("targets", nargs="*", help="Target repositories (owner/* or owner/repo)")
+    args = parser.parse_args()
+
+    token = args.token or os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+    if not token:
+        print("❌ Error: GitHub token not found (use --token or GITHUB_TOKEN)")
+        sys.exit(1)
+
+    targets = " ".join(args.targets) or os.environ.get("TARGETS", "").strip()
+    config = CollectorConfig.from_env(token=token, targets=targets)
+    collector = Collector(config)
+    artifacts = Artifacts(config.output_dir)
+    refresher = Refresher(collector, artifacts, args.debounce)
+
+    print(f"🚀 Initial collection for: {targets or '(auto-detect)'}")
+    refresher.run_once({FULL_REFRESH})
+    threading.Thread(target=refresher.loop, name="refresher", daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(refresher, artifacts, os.environ.get("WEBHOOK_SECRET", "")))
+    print(f"🌐 Serving on http://{args.host}:{args.port} (debounce={args.debounce}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted by user")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
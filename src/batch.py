@@ -0,0 +1,206 @@
+"""Batch mode: render many jobs from one shared collection.
+
+A batch file lists jobs that each have their own targets and outputs:
+
+    {
+      "defaults": {"formats": ["html", "png", "md"]},
+      "jobs": [
+        {"name": "sunrise", "targets": "Sunrisepeak/*", "output_dir": "walls/sunrise"},
+        {"name": "all", "targets": "Sunrisepeak/* d2learn/*",
+         "output_dir": "walls/all", "readme": "README.md"}
+      ]
+    }
+
+Every owner listing and every repo's contributor list is fetched once for
+the whole batch, so API cost scales with unique repos, not jobs x repos.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from collect_contributors import (
+    CollectResult,
+    Collector,
+    CollectorConfig,
+    describe_target,
+    load_existing_json,
+    parse_max_contributors,
+)
+from config import get_workspace_path
+from github_client import ETagCache, GitHubClient, RateLimitError
+from resilience import DeadlineExceeded
+from render_contributors import DEFAULT_FORMATS, AvatarCache
+
+# Job keys in the batch file -> CollectorConfig fields
+JOB_FIELDS = {
+    "targets": "targets",
+    "output_dir": "output_dir",
+    "readme": "readme_path",
+    "formats": "render_formats",
+    "html_mode": "html_mode",
+    "include_anonymous": "include_anonymous",
+    "skip_archived": "skip_archived",
+    "exclude_logins": "exclude_logins",
+    "per_repo_walls": "per_repo_walls",
+    "per_org_walls": "per_org_walls",
+    "max_contributors": "max_contributors",
+}
+
+
+@dataclass
+class BatchJob:
+    name: str
+    config: CollectorConfig
+
+
+def _job_overrides(spec: Mapping) -> Dict:
+    unknown = set(spec) - set(JOB_FIELDS) - {"name"}
+    if unknown:
+        raise ValueError(f"Unknown batch job keys: {', '.join(sorted(unknown))}")
+
+    overrides = {}
+    for key, value in spec.items():
+        if key == "name":
+            continue
+        if key in ("targets", "formats", "exclude_logins") and isinstance(value, str):
+            value = value.replace(",", " ").split()
+        if key == "targets":
+            value = " ".join(value)
+        elif key == "formats":
+            value = tuple(s.lower() for s in value)
+        elif key == "exclude_logins":
+            value = frozenset(value)
+        elif key in ("output_dir", "readme"):
+            value = get_workspace_path(value)
+        elif key == "max_contributors":
+            # 100, "readme=100 png=300" or {"readme": 100, "png": 300}
+            value = {k.lower(): int(v) for k, v in value.items()} if isinstance(value, Mapping) else parse_max_contributors(str(value))
+        overrides[JOB_FIELDS[key]] = value
+    return overrides
+
+
+def load_jobs(path: str | Path, base: CollectorConfig) -> List[BatchJob]:
+    """Read a batch file; each job is `base` with defaults and job keys applied"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    defaults = _job_overrides(data.get("defaults", {}))
+    # Outputs are set per job: the base's OUTPUT_DIR / README_PATH don't apply
+    base = replace(base, output_dir=None, readme_path=None)
+    jobs = []
+    for i, spec in enumerate(data.get("jobs", [])):
+        name = spec.get("name") or f"job-{i + 1}"
+        config = replace(base, **{**defaults, **_job_overrides(spec)})
+        if not config.targets:
+            raise ValueError(f"Batch job '{name}' has no targets")
+        if not config.output_dir:
+            raise ValueError(f"Batch job '{name}' has no output_dir")
+        if not config.readme_path:
+            # Jobs without a README would all update the same default one
+            formats = config.render_formats or DEFAULT_FORMATS
+            config = replace(config, render_formats=tuple(f for f in formats if f != "readme"))
+        jobs.append(BatchJob(name, config))
+    if not jobs:
+        raise ValueError(f"No jobs in batch file {path}")
+    return jobs
+
+
+class BatchRunner:
+    """Collects the union of all jobs' repos once, then renders every job"""
+
+    def __init__(
+        self,
+        jobs: List[BatchJob],
+        client: Optional[GitHubClient] = None,
+        avatar_cache: Optional[AvatarCache] = None,
+    ):
+        self.jobs = jobs
+        first = jobs[0].config
+        self.client = client or GitHubClient(
+            first.token, api=first.api, etag_cache=ETagCache(), retry=first.retry_policy()
+        )
+        self.avatar_cache = avatar_cache if avatar_cache is not None else AvatarCache()
+        # describe_target label -> repo objects
+        self._listings: Dict[str, List[Dict]] = {}
+        # (full_name, include_anonymous) -> raw contributor list
+        self._contributors: Dict[Tuple[str, bool], Optional[List[Dict]]] = {}
+        # Set once the rate limit or the deadline runs out; later jobs only
+        # render what was already fetched
+        self._out_of_budget = False
+
+    def _inventory(self, collector: Collector) -> List[Dict]:
+        targets = collector.resolve_targets()
+        missing = {describe_target(t): t for t in targets if describe_target(t) not in self._listings}
+        if missing:
+            # Listings no earlier job fetched, resolved concurrently
+            self._listings.update(zip(missing, collector.resolve_listings(list(missing.values()))))
+        repo_pool = []
+        seen = set()
+        for t in targets:
+            for r in self._listings[describe_target(t)]:
+                full = r.get("full_name")
+                if full and full in seen:
+                    continue
+                seen.add(full)
+                repo_pool.append(r)
+        return repo_pool
+
+    def run_job(self, job: BatchJob) -> CollectResult:
+        print(f"📦 Batch job '{job.name}' -> {job.config.output_dir}")
+        collector = Collector(job.config, client=self.client, avatar_cache=self.avatar_cache)
+        inventory = self._inventory(collector)
+
+        # Same pre-flight budget check as a single run, over the repos no
+        # earlier job has fetched
+        self.client.start_deadline(job.config.run_deadline)
+        anon = job.config.include_anonymous
+        repos = [r for r in inventory if collector.scannable(r)]
+        pending = [r for r in repos if (r["full_name"], anon) not in self._contributors]
+        deferred = set()
+        if pending and not self._out_of_budget:
+            plan = collector.plan(pending, load_existing_json(collector.output_paths()["json"]) or {})
+            if plan:
+                deferred.update(name.lower() for name in plan.deferred)
+
+        primed = {}
+        for r in repos:
+            full = r["full_name"]
+            key = (full, anon)
+            if key not in self._contributors:
+                if self._out_of_budget or full.lower() in deferred:
+                    deferred.add(full.lower())
+                    continue
+                print(f"  scanning {full}")
+                owner, _, name = full.partition("/")
+                try:
+                    self._contributors[key] = collector.fetch_contributors(owner, name)
+                except (RateLimitError, DeadlineExceeded) as e:
+                    # Never die halfway: later jobs still render from what was fetched
+                    print(f"WARNING: out of budget, deferring {full} and the remaining repos: {e}")
+                    self._out_of_budget = True
+                    deferred.add(full.lower())
+                    continue
+                if job.config.per_repo_delay_ms > 0:
+                    time.sleep(job.config.per_repo_delay_ms / 1000.0)
+            primed[full] = self._contributors[key]
+
+        collector.prime(inventory, primed)
+        return collector.write(collector.collect(refresh=(), defer=deferred))
+
+    def run(self) -> Dict[str, CollectResult]:
+        results = {}
+        for job in self.jobs:
+            results[job.name] = self.run_job(job)
+        scanned = sum(r.scanned for r in results.values())
+        deferred = {name for r in results.values() for name in r.deferred}
+        print(
+            f"Batch done: {len(results)} jobs, {len(self._contributors)} repo fetches "
+            f"for {scanned} job-repo scans"
+            + (f", {len(deferred)} repos deferred to the next run" if deferred else "")
+        )
+        return results
@@ -0,0 +1,123 @@
+"""Pre-flight API request budget planning.
+
+Before scanning, the collector asks /rate_limit how many core requests are
+left and estimates what the scan will cost: one request per page of each
+repo's contributor list (100 per page), using last run's counts, with
+pages the ETag cache can answer with a free 304 counted as zero. When the
+estimate doesn't fit, the "degrade" policy scans the most urgent repos
+(deferred last time, then most recently pushed) and defers the rest.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+BUDGET_POLICIES = ("degrade", "strict", "off")
+CONTRIBUTORS_PER_PAGE = 100
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised up front by the "strict" policy when the scan won't fit."""
+
+
+@dataclass
+class BudgetPlan:
+    policy: str
+    limit: int
+    remaining: int
+    reset: int
+    reserve: int
+    estimated: int
+    scheduled_cost: int
+    scheduled: List[str] = field(default_factory=list)
+    deferred: List[str] = field(default_factory=list)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.deferred)
+
+    def to_dict(self) -> Dict:
+        return dict(asdict(self), partial=self.partial)
+
+    def describe(self) -> str:
+        text = (
+            f"Request budget: remaining={self.remaining}/{self.limit} reserve={self.reserve} "
+            f"estimated={self.estimated} for {len(self.scheduled) + len(self.deferred)} repos"
+        )
+        if self.partial:
+            text += f"; scanning {len(self.scheduled)} (~{self.scheduled_cost} requests), deferring {len(self.deferred)} to the next run"
+        return text
+
+    def write(self, path: str | Path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def estimate_pages(previous_count: Optional[int]) -> int:
+    """Contributor pages for a repo whose list had previous_count entries last time"""
+    if not previous_count:
+        return 1
+    return max(1, math.ceil(previous_count / CONTRIBUTORS_PER_PAGE))
+
+
+def plan_budget(
+    repos: List[Dict],
+    rate: Dict,
+    policy: str,
+    reserve: int,
+    previous_counts: Dict[str, int],
+    is_cached: Callable[[str], bool],
+    previously_deferred: Optional[List[str]] = None,
+) -> BudgetPlan:
+    """Decide which repos (full names) to scan with the requests that are left
+
+    rate is the "core" object from /rate_limit. Repos are ordered by urgency
+    (deferred by the previous run first, then most recently pushed) so a
+    degraded run always makes progress on the backlog.
+    """
+    deferred_before = {name.lower() for name in previously_deferred or ()}
+    ordered = sorted(repos, key=lambda r: r.get("pushed_at") or "", reverse=True)
+    ordered.sort(key=lambda r: r["full_name"].lower() not in deferred_before)
+
+    costs = []
+    for r in ordered:
+        full = r["full_name"]
+        cost = 0 if is_cached(full) else estimate_pages(previous_counts.get(full))
+        costs.append((full, cost))
+    estimated = sum(cost for _, cost in costs)
+
+    remaining = int(rate.get("remaining", 0))
+    available = max(0, remaining - reserve)
+    plan = BudgetPlan(
+        policy=policy,
+        limit=int(rate.get("limit", 0)),
+        remaining=remaining,
+        reset=int(rate.get("reset", 0)),
+        reserve=reserve,
+        estimated=estimated,
+        scheduled_cost=estimated,
+        scheduled=[full for full, _ in costs],
+    )
+    if estimated <= available:
+        return plan
+    if policy == "strict":
+        raise BudgetExceeded(
+            f"Scan needs ~{estimated} requests but only {available} are available "
+            f"(remaining={remaining}, reserve={reserve}, reset={plan.reset})"
+        )
+
+    spent = 0
+    plan.scheduled = []
+    for full, cost in costs:
+        if spent + cost <= available:
+            plan.scheduled.append(full)
+            spent += cost
+        else:
+            plan.deferred.append(full)
+    plan.scheduled_cost = spent
+    return plan
@@ -1,116 +1,327 @@
 #!/usr/bin/env python3
+"""Collect contributors across GitHub targets and render the contributor wall.
+
+Library use:
+
+    from collect_contributors import Collector, CollectorConfig
+
+    collector = Collector(CollectorConfig(token="ghp_xxx", targets="octocat/*"))
+    result = collector.collect()      # API calls only, nothing written
+    collector.write(result)           # JSON + rendered walls
+
+A Collector keeps its HTTP client (pooled connections, ETag cache) and its
+avatar cache between calls, so one instance can serve many runs.
+"""
+from __future__ import annotations
+
 import os
 import sys
 import json
 import time
-import urllib.request
-import urllib.parse
-import ssl
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from datetime import datetime, timezone
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
 
-from config import get_output_dir, get_output_paths
+from config import DEFAULT_OUTPUT_DIR, DEFAULT_README_NAME, get_output_dir, get_output_paths, get_readme_path, get_workspace_path
+from output import write_if_changed
 
-API = "https://api.github.com"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+import tracing
+from budget import BudgetPlan, plan_budget
+from events import FeedCursor, feed_url, poll_feed
+from github_client import API, ETagCache, GitHubClient, GitHubError, RateLimitError
+from resilience import DeadlineExceeded, RetryPolicy
+from render_contributors import ALL_FORMATS, FORMATS, AvatarCache, ImageOptions, render_wall
+from store import ContributorStore
 
-TARGETS_RAW = os.environ.get("TARGETS", "")
-REPO_CTX = os.environ.get("GITHUB_REPOSITORY")
-TOKEN = os.environ.get("GH_TOKEN")
+# Formats rendered for each per-repo / per-org wall (JSON is always written)
+SCOPED_WALL_FORMATS = ("md", "png", "svg")
 
-INCLUDE_ANONYMOUS = (os.environ.get("INCLUDE_ANONYMOUS", "true").lower() == "true")
-SKIP_ARCHIVED = (os.environ.get("SKIP_ARCHIVED", "true").lower() == "true")
-PER_REPO_DELAY_MS = int(os.environ.get("PER_REPO_DELAY_MS", "150"))
-EXCLUDE_LOGINS = set(
-    s.strip() for s in os.environ.get("EXCLUDE_LOGINS", "github-actions[bot]").split() if s.strip()
-)
+# contributors.json format: 2.0.0 is the compact, normalized layout written
+# by encode_contributors_json(); 1.0.0 files are still read
+JSON_SCHEMA_VERSION = "2.0.0"
+LEGACY_SCHEMA_VERSION = "1.0.0"
 
-if not TOKEN:
-    raise SystemExit("Missing env GH_TOKEN")
 
+def _env_bool(environ: Mapping[str, str], key: str, default: str) -> bool:
+    return environ.get(key, default).lower() == "true"
 
 
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-if SCRIPT_DIR not in sys.path:
-    sys.path.insert(0, SCRIPT_DIR)
-from render_contributors import render_wall
+def _env_list(environ: Mapping[str, str], key: str, default: str = "") -> Tuple[str, ...]:
+    return tuple(s.strip() for s in environ.get(key, default).replace(",", " ").split() if s.strip())
 
-def request(url: str):
-    req = urllib.request.Request(url)
-    req.add_header("Authorization", f"Bearer {TOKEN}")
-    req.add_header("Accept", "application/vnd.github+json")
-    req.add_header("X-GitHub-Api-Version", "2022-11-28")
-    req.add_header("User-Agent", "org-contributors-action")
 
-    try:
-        # Create SSL context that doesn't verify certificates
-        # (needed in some environments with corporate proxies or certificate issues)
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        return urllib.request.urlopen(req, context=ssl_context)
-    except urllib.error.HTTPError as e:
-        body = e.read().decode("utf-8", errors="replace")[:300]
-        remaining = e.headers.get("x-ratelimit-remaining")
-        reset = e.headers.get("x-ratelimit-reset")
-        if e.code == 403:
-            raise RuntimeError(
-                f"403 Forbidden. rate_remaining={remaining} rate_reset={reset} body={body}"
-            ) from None
-        raise RuntimeError(f"{e.code} {e.reason}: {body}") from None
-
-
-def parse_next_link(link_header: str):
-    # Link: <url>; rel="next", <url>; rel="last"
-    if not link_header:
-        return None
-    parts = [p.strip() for p in link_header.split(",")]
-    for p in parts:
-        if 'rel="next"' in p:
-            start = p.find("<")
-            end = p.find(">")
-            if start != -1 and end != -1 and end > start:
-                return p[start + 1 : end]
-    return None
-
-
-def paginate(url: str):
-    items = []
-    next_url = url
-    while next_url:
-        with request(next_url) as res:
-            data = json.loads(res.read().decode("utf-8"))
-            if not isinstance(data, list):
-                raise RuntimeError(f"Expected list response for {next_url}")
-            items.extend(data)
-            link = res.headers.get("Link")
-            next_url = parse_next_link(link)
-    return items
-
-
-def list_org_public_repos(org: str):
-    qs = urllib.parse.urlencode({"type": "public", "per_page": 100, "sort": "updated"})
-    return paginate(f"{API}/orgs/{org}/repos?{qs}")
-
-
-def list_user_public_repos(user: str):
-    qs = urllib.parse.urlencode({"type": "public", "per_page": 100, "sort": "updated"})
-    return paginate(f"{API}/users/{user}/repos?{qs}")
-
-
-def list_repo_contributors(owner: str, repo: str):
-    qs = urllib.parse.urlencode(
-        {"per_page": 100, "anon": "true" if INCLUDE_ANONYMOUS else "false"}
-    )
-    return paginate(f"{API}/repos/{owner}/{repo}/contributors?{qs}")
-
-
-def get_repo(owner: str, repo: str):
-    with request(f"{API}/repos/{owner}/{repo}") as res:
-        data = json.loads(res.read().decode("utf-8"))
+def parse_max_contributors(spec: str) -> Dict[str, int]:
+    """Parse "100" (every format) or "readme=100 png=300" into a per-format cap map"""
+    limits = {}
+    for item in spec.replace(",", " ").split():
+        fmt, sep, value = item.rpartition("=")
+        fmt = fmt.strip().lower() if sep else ALL_FORMATS
+        if fmt != ALL_FORMATS and fmt not in FORMATS:
+            raise ValueError(f"Unknown format in MAX_CONTRIBUTORS: {fmt}")
+        try:
+            limits[fmt] = int(value)
+        except ValueError:
+            raise ValueError(f"Invalid MAX_CONTRIBUTORS entry: {item}") from None
+    return limits
+
+
+@dataclass
+class CollectorConfig:
+    """Explicit settings for a Collector; from_env() maps the action's env vars."""
+
+    token: str
+    targets: str = ""
+    repo_ctx: Optional[str] = None
+    api: str = API
+    include_anonymous: bool = True
+    skip_archived: bool = True
+    per_repo_delay_ms: int = 150
+    exclude_logins: FrozenSet[str] = frozenset({"github-actions[bot]"})
+    # None: DEFAULT_OUTPUT_DIR / README.md under the working directory;
+    # from_env() resolves OUTPUT_DIR / README_PATH against the workspace
+    output_dir: Optional[Path] = None
+    readme_path: Optional[Path] = None
+    html_mode: str = "inline"
+    render_formats: Tuple[str, ...] = ()
+    image_options: ImageOptions = field(default_factory=ImageOptions)
+    per_repo_walls: bool = False
+    per_org_walls: bool = False
+    wall_workers: int = 4
+    # Threads listing the targets' repos before the scan
+    resolve_workers: int = 8
+    # Per-format top-N caps ("*" for every format); contributors.json stays complete
+    max_contributors: Dict[str, int] = field(default_factory=dict)
+    # Optional SQLite store; walls are then rendered from its run snapshot
+    store_path: Optional[Path] = None
+    # Pre-flight request budget: "degrade" defers repos that don't fit,
+    # "strict" refuses to start, "off" skips planning
+    budget_policy: str = "degrade"
+    budget_reserve: int = 100
+    budget_plan_file: Optional[Path] = None
+    # Per-request timeout and retries, hedging percentile (0 = off) and an
+    # overall deadline for one collection in seconds (0 = none)
+    request_timeout: float = 15.0
+    request_retries: int = 3
+    hedge_percentile: float = 0.0
+    run_deadline: float = 0.0
+    # Read the targets' events feeds first and only rescan repos with new
+    # activity; needs a baseline (store_path, or a long-lived Collector)
+    change_feed: bool = False
+    # Chrome trace-event file written at exit (see tracing.py); None = off
+    trace_file: Optional[Path] = None
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None, **overrides) -> "CollectorConfig":
+        env = os.environ if environ is None else environ
+        token = overrides.pop("token", None) or env.get("GH_TOKEN")
+        if not token:
+            raise ValueError("Missing env GH_TOKEN")
+        config = cls(
+            token=token,
+            targets=env.get("TARGETS", ""),
+            repo_ctx=env.get("GITHUB_REPOSITORY"),
+            api=env.get("GITHUB_API_URL", API),
+            output_dir=get_output_dir(env),
+            readme_path=get_readme_path(env),
+            include_anonymous=_env_bool(env, "INCLUDE_ANONYMOUS", "true"),
+            skip_archived=_env_bool(env, "SKIP_ARCHIVED", "true"),
+            per_repo_delay_ms=int(env.get("PER_REPO_DELAY_MS", "150")),
+            exclude_logins=frozenset(_env_list(env, "EXCLUDE_LOGINS", "github-actions[bot]")),
+            html_mode=env.get("HTML_MODE", "inline").strip().lower() or "inline",
+            render_formats=tuple(s.lower() for s in _env_list(env, "RENDER_FORMATS")),
+            image_options=ImageOptions(
+                quantize=_env_bool(env, "PNG_QUANTIZE", "false"),
+                optimize=_env_bool(env, "PNG_OPTIMIZE", "false"),
+                variants=tuple(s.lower() for s in _env_list(env, "IMAGE_VARIANTS")),
+                max_bytes=int(env.get("IMAGE_MAX_BYTES", "0") or 0),
+                engine=env.get("PNG_ENGINE", "pil").strip().lower() or "pil",
+            ),
+            per_repo_walls=_env_bool(env, "PER_REPO_WALLS", "false"),
+            per_org_walls=_env_bool(env, "PER_ORG_WALLS", "false"),
+            wall_workers=max(1, int(env.get("WALL_WORKERS", "4") or 4)),
+            resolve_workers=max(1, int(env.get("RESOLVE_WORKERS", "8") or 8)),
+            max_contributors=parse_max_contributors(env.get("MAX_CONTRIBUTORS", "")),
+            store_path=get_workspace_path(env["STORE_PATH"], env) if env.get("STORE_PATH") else None,
+            budget_policy=env.get("BUDGET_POLICY", "degrade").strip().lower() or "degrade",
+            budget_reserve=int(env.get("BUDGET_RESERVE", "100") or 100),
+            budget_plan_file=get_workspace_path(env["BUDGET_PLAN_FILE"], env) if env.get("BUDGET_PLAN_FILE") else None,
+            request_timeout=float(env.get("REQUEST_TIMEOUT", "15") or 15),
+            request_retries=int(env.get("REQUEST_RETRIES", "3") or 3),
+            hedge_percentile=float(env.get("HEDGE_PERCENTILE", "0") or 0),
+            run_deadline=float(env.get("RUN_DEADLINE", "0") or 0),
+            change_feed=_env_bool(env, "CHANGE_FEED", "false"),
+            trace_file=get_workspace_path(env["TRACE_FILE"], env) if env.get("TRACE_FILE") else None,
+        )
+        return replace(config, **overrides)
+
+    def retry_policy(self) -> RetryPolicy:
+        return RetryPolicy(
+            timeout=self.request_timeout,
+            retries=self.request_retries,
+            hedge_percentile=self.hedge_percentile,
+        )
+
+
+@dataclass
+class CollectResult:
+    """Everything one collection produced; write() fills in changed/written."""
+
+    targets: List[str]
+    # Display data: name, email, avatar_url, html_url, contributions
+    contributors: List[Dict]
+    # JSON data: name/email, sorted by name
+    contributors_list: List[Dict]
+    details: Dict[str, Dict]
+    repo_walls: Dict[str, List[Dict]] = field(default_factory=dict)
+    org_walls: Dict[str, List[Dict]] = field(default_factory=dict)
+    scanned: int = 0
+    # Contributor key -> login/name/email/urls, and repo -> {key: contributions}
+    people: Dict[str, Dict] = field(default_factory=dict)
+    contributions: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    # Store run id when a store is configured
+    run_id: Optional[int] = None
+    # Repos left for the next run when the request budget ran short (their
+    # previous contributors stay on the walls)
+    plan: Optional[BudgetPlan] = None
+    deferred: List[str] = field(default_factory=list)
+    # Events feed cursors this collection vouches for (saved with the run)
+    feed_cursors: Dict[str, FeedCursor] = field(default_factory=dict)
+    changed: bool = False
+    written: List[str] = field(default_factory=list)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.deferred)
+
+    def to_json(self) -> Dict:
+        return encode_contributors_json(self.contributors_list, self.details, self.deferred)
+
+
+def encode_contributors_json(contributors_list: List[Dict], details: Dict[str, Dict], deferred: Iterable[str] = ()) -> Dict:
+    """contributors.json 2.0.0 payload
+
+    Each contributor appears once, in a columnar table sorted by name;
+    repos refer to table rows by index, in GitHub's order, with the
+    contribution count of each. login (null for anonymous entries) lets a
+    later run rebuild the wall rows of repos it has to defer:
+
+        {"thanks-contributors": "2.0.0", "count": 2,
+         "contributors": {"name": ["Alice", "Bob"], "email": ["a@x", null],
+                          "login": ["alice", "bob"]},
+         "repos": {"o/r": {"index": [1, 0], "contributions": [12, 3]}}}
+    """
+    names, emails, logins, rows = [], [], [], {}
+
+    def row(c: Dict) -> int:
+        identity = (c.get("name"), c.get("email"))
+        if identity not in rows:
+            rows[identity] = len(names)
+            names.append(identity[0])
+            emails.append(identity[1])
+            logins.append(None)
+        i = rows[identity]
+        logins[i] = logins[i] or c.get("login")
+        return i
+
+    for c in contributors_list:
+        row(c)
+    count = len(names)
+
+    repos = {}
+    for full in sorted(details):
+        index, counts = [], []
+        for c in details[full].get("contributors") or ():
+            index.append(row(c))
+            counts.append(int(c.get("contributions") or 0))
+        repos[full] = {"index": index, "contributions": counts}
+
+    data = {
+        "thanks-contributors": JSON_SCHEMA_VERSION,
+        "count": count,
+        "contributors": {"name": names, "email": emails, "login": logins},
+        "repos": repos,
+    }
+    deferred = list(deferred)
+    if deferred:
+        data["partial"] = {"deferred": deferred}
     return data
 
 
+def decode_contributors_json(data: Dict) -> Dict:
+    """Read a 2.0.0 or 1.0.0 payload into the in-memory (1.0.0-shaped) layout
+
+    {"contributors": [{name, email}], "details": {repo: {"count", "contributors":
+    [{name, email, login, contributions}]}}, "partial": ...}; 1.0.0 entries carry
+    no logins or contribution counts.
+    """
+    if data.get("thanks-contributors", LEGACY_SCHEMA_VERSION) == LEGACY_SCHEMA_VERSION:
+        return data
+    table = _decode_table(data)
+    columns = data.get("contributors") or {}
+    names, emails = columns.get("name") or [], columns.get("email") or []
+    # Files written before the login column existed read as anonymous
+    logins = columns.get("login") or [None] * len(names)
+    details = {}
+    for full, repo in (data.get("repos") or {}).items():
+        entries = [
+            {"name": names[i], "email": emails[i], "login": logins[i], "contributions": n}
+            for i, n in zip(repo.get("index") or (), repo.get("contributions") or ())
+        ]
+        details[full] = {"count": len(entries), "contributors": entries}
+    decoded = {
+        "thanks-contributors": data["thanks-contributors"],
+        "count": data.get("count", len(table)),
+        "contributors": table[:data.get("count", len(table))],
+        "details": details,
+    }
+    if "partial" in data:
+        decoded["partial"] = data["partial"]
+    return decoded
+
+
+def _decode_table(data: Dict) -> List[Dict]:
+    columns = data.get("contributors") or {}
+    return [{"name": name, "email": email} for name, email in zip(columns.get("name") or (), columns.get("email") or ())]
+
+
+def dump_contributors_json(payload: Dict) -> str:
+    """Compact serialization used for every contributors.json"""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def name_email_list(display_contributors: List[Dict]) -> List[Dict]:
+    """JSON contributor entries (name/email), sorted by name"""
+    contributors_list = [{"name": v.get("name"), "email": v.get("email")} for v in display_contributors]
+    contributors_list.sort(key=lambda x: (x.get("name") or "").lower())
+    return contributors_list
+
+
+def previous_contributors(detail: Optional[Dict]) -> List[Dict]:
+    """API-shaped contributor entries rebuilt from a previous contributors.json repo
+
+    Profile and avatar URLs are derived from the login; entries without one
+    (anonymous, or a file from before the login column) render as anonymous.
+    """
+    entries = []
+    for c in (detail or {}).get("contributors") or ():
+        login = c.get("login")
+        entries.append(
+            {
+                "login": login,
+                "name": c.get("name"),
+                "email": c.get("email"),
+                "html_url": f"https://github.com/{login}" if login else None,
+                "avatar_url": f"https://avatars.githubusercontent.com/{login}" if login else None,
+                "contributions": int(c.get("contributions") or 0),
+            }
+        )
+    return entries
+
+
 def ensure_parent_dir(file_path: str):
     parent = os.path.dirname(file_path)
     if parent:
@@ -123,28 +334,48 @@ def describe_target(t: dict):
     return f"{t['name']}/*"
 
 
-def load_existing_contributors(json_path):
-    """Load contributors from existing JSON file if it exists."""
+def _read_json(json_path) -> Optional[Dict]:
     if not json_path.exists():
         return None
     try:
         with open(json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data.get("contributors", [])
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def load_existing_json(json_path) -> Optional[Dict]:
+    """Load the previous contributors JSON (any schema version) if it exists and parses."""
+    data = _read_json(json_path)
+    if data is None:
+        return None
+    try:
+        return decode_contributors_json(data)
     except Exception:
         return None
 
 
+def load_existing_contributors(json_path):
+    """Load contributors (name/email) from existing JSON file if it exists."""
+    data = _read_json(json_path)
+    if data is None:
+        return None
+    if data.get("thanks-contributors", LEGACY_SCHEMA_VERSION) == LEGACY_SCHEMA_VERSION:
+        return data.get("contributors", [])
+    # Only the contributor table is needed to compare names; repos stay undecoded
+    return _decode_table(data)[:data.get("count")]
+
+
 def contributors_changed(json_path, new_contributors_list):
     """Check if contributors list has changed compared to existing file."""
     existing = load_existing_contributors(json_path)
     if existing is None:
         return True  # File doesn't exist, so it's new
-    
+
     # Normalize both lists for comparison
     existing_set = {(c.get("name"), c.get("email")) for c in existing}
     new_set = {(c.get("name"), c.get("email")) for c in new_contributors_list}
-    
+
     changed = existing_set != new_set
     if changed:
         print("Contributors changed (new/updated contributors detected)")
@@ -153,7 +384,8 @@ def contributors_changed(json_path, new_contributors_list):
     return changed
 
 
-def parse_targets(raw_targets: str, repo_ctx: str):
+def parse_targets(raw_targets: str) -> List[Dict]:
+    """Parse 'owner/* owner/repo ...' into target dicts (may be empty)."""
     tokens = []
     for part in raw_targets.replace(",", " ").split():
         if part.strip():
@@ -164,214 +396,621 @@ def parse_targets(raw_targets: str, repo_ctx: str):
         if "/" in tok:
             owner, _, repo = tok.partition("/")
             if not owner or not repo:
-                raise SystemExit(f"Invalid target '{tok}', expected owner/repo or owner/*")
+                raise ValueError(f"Invalid target '{tok}', expected owner/repo or owner/*")
             targets.append({"kind": "repo" if repo != "*" else "org_user", "owner": owner, "repo": repo, "name": owner})
         else:
-            raise SystemExit(f"Invalid target '{tok}', expected owner/repo or owner/*")
-
-    if not targets:
-        repo_target = detect_target_from_repo(repo_ctx)
-        if repo_target:
-            targets.append(repo_target)
-
-    if not targets:
-        raise SystemExit("No targets resolved. Provide targets or run in a GitHub Actions repo context.")
-
+            raise ValueError(f"Invalid target '{tok}', expected owner/repo or owner/*")
     return targets
 
 
-def detect_target_from_repo(repo_ctx: str):
-    if not repo_ctx or "/" not in repo_ctx:
-        return None
-    owner, _, repo = repo_ctx.partition("/")
-    try:
-        repo_info = get_repo(owner, repo)
-    except Exception:
-        return None
-    return {"kind": "org_user", "name": owner}
-
+def _scoped_wall(label: str, contributors: list, details: Dict[str, Dict]) -> Dict:
+    """JSON payload for a per-repo ("repos/o/r") or per-org ("orgs/o") wall:
+    the global 2.0.0 layout limited to the scope's repos"""
+    kind, _, name = label.partition("/")
+    if kind == "repos":
+        scope = {name: details[name]} if name in details else {}
+    else:
+        scope = {full: d for full, d in details.items() if full.partition("/")[0].lower() == name.lower()}
+    return encode_contributors_json(name_email_list(contributors), scope)
+
+
+class Collector:
+    """Collects contributors for config.targets and renders the walls.
+
+    Holds no global state: everything comes from the config, the client and
+    the avatar cache, which stay warm between collect()/run() calls.
+    """
+
+    def __init__(
+        self,
+        config: CollectorConfig,
+        client: Optional[GitHubClient] = None,
+        avatar_cache: Optional[AvatarCache] = None,
+    ):
+        self.config = config
+        if config.trace_file:
+            tracing.start(str(config.trace_file))
+        self.client = client or GitHubClient(
+            config.token, api=config.api, etag_cache=ETagCache(), retry=config.retry_policy()
+        )
+        self.avatar_cache = avatar_cache if avatar_cache is not None else AvatarCache()
+        self.store = ContributorStore(config.store_path) if config.store_path else None
+        if config.change_feed and self.store is None:
+            print("INFO: change_feed without store_path only saves requests for a long-lived Collector (serve.py)")
+        # Warm state for incremental collect(refresh=...): the resolved repo
+        # list and each repo's raw contributor list (None = skipped, too large)
+        self._targets: Optional[List[Dict]] = None
+        self._inventory: Optional[List[Dict]] = None
+        self._repo_contributors: Dict[str, Optional[List[Dict]]] = {}
+        # Events feed URL -> cursor, when there is no store to keep them
+        self._feed_cursors: Dict[str, FeedCursor] = {}
+        # Lowercased login -> "Organization" / "User", loaded from the store
+        self._owner_types: Optional[Dict[str, str]] = None
+
+    def output_paths(self) -> Dict[str, Path]:
+        return get_output_paths(
+            self.config.output_dir or DEFAULT_OUTPUT_DIR, self.config.readme_path or DEFAULT_README_NAME
+        )
 
-def main():
-    # Get output paths (must be done here after environment is fully set up)
-    # config.py handles GITHUB_WORKSPACE prefix automatically
-    output_dir_path = get_output_dir()
-    paths = get_output_paths(output_dir_path)
-    out_json_path = paths["json"]
-    html_out_path = paths["html"]
-    png_out_path = paths["png"]
-    md_out_path = paths["md"]
-    readme_path = paths["readme"]
-    
-    print(f"DEBUG: readme_path = {readme_path}")
-    print(f"DEBUG: readme_path type = {type(readme_path)}")
-    
-    targets = parse_targets(TARGETS_RAW, REPO_CTX)
-    seen_labels = set()
-    target_labels = []
-    for t in targets:
-        label = describe_target(t)
-        if label in seen_labels:
-            continue
-        seen_labels.add(label)
-        target_labels.append(label)
-    print(f"Targets: {', '.join(target_labels)}")
-
-    repo_pool = []
-    seen_repos = set()
-    for t in targets:
-        if t["kind"] == "org_user":
+    def resolve_targets(self) -> List[Dict]:
+        targets = parse_targets(self.config.targets)
+        if not targets:
+            repo_target = self._detect_target_from_repo(self.config.repo_ctx)
+            if repo_target:
+                targets.append(repo_target)
+        if not targets:
+            raise ValueError("No targets resolved. Provide targets or run in a GitHub Actions repo context.")
+        return targets
+
+    def _detect_target_from_repo(self, repo_ctx: Optional[str]):
+        if not repo_ctx or "/" not in repo_ctx:
+            return None
+        owner, _, repo = repo_ctx.partition("/")
+        try:
+            self.client.get_repo(owner, repo)
+        except Exception:
+            return None
+        return {"kind": "org_user", "name": owner}
+
+    def owner_types(self) -> Dict[str, str]:
+        """Account types learned while resolving targets, by lowercased login
+
+        Only a store keeps them across processes; without store_path they
+        last as long as this Collector.
+        """
+        if self._owner_types is None:
+            self._owner_types = self.store.owner_types() if self.store is not None else {}
+        return self._owner_types
+
+    def _resolve_target(self, t: Dict) -> Tuple[List[Dict], Optional[str]]:
+        """Repos of one target, and the owner's account type if the listing told"""
+        if t["kind"] != "org_user":
+            return [self.client.get_repo(t["owner"], t["repo"])], None
+        name = t["name"]
+        kinds = ["Organization", "User"]
+        # A known user skips the org endpoint's failed request; a stale type
+        # (account converted) still falls back to the other endpoint
+        if self.owner_types().get(name.lower()) == "User":
+            kinds.reverse()
+        errors = []
+        for kind in kinds:
             try:
-                repos = list_org_public_repos(t["name"])
+                if kind == "Organization":
+                    repos = self.client.list_org_public_repos(name)
+                else:
+                    repos = self.client.list_user_public_repos(name)
+            except (RateLimitError, DeadlineExceeded):
+                # Not an answer about the account: listing nothing would
+                # commit an empty wall for the owner
+                raise
             except Exception as e:
-                try:
-                    repos = list_user_public_repos(t["name"])
-                except Exception as e2:
-                    print(f"Warning: Could not fetch repos for {t['name']}, skipping.")
-                    print(f"  (org error: {e})")
-                    print(f"  (user error: {e2})")
-                    repos = []
-        else:
-            repos = [get_repo(t["owner"], t["repo"])]
-
-        for r in repos:
-            full = r.get("full_name")
-            if full and full in seen_repos:
+                errors.append(f"{'org' if kind == 'Organization' else 'user'} error: {e}")
                 continue
-            seen_repos.add(full)
-            repo_pool.append(r)
-
-    # Global aggregation: key -> { login, name, email, html_url, avatar_url, contributions }
-    agg = {}
-    # Per-repo contributors: full_repo_name -> list of contributors
-    repo_details = {}
-
-    scanned = 0
-    for r in repo_pool:
-        if SKIP_ARCHIVED and r.get("archived"):
-            continue
-        if r.get("disabled"):
-            continue
-        if r.get("fork"):
-            continue
-
-        scanned += 1
-        owner_login = (r.get("owner") or {}).get("login")
-        repo_name = r["name"]
-        owner_login = owner_login or r.get("full_name", "").split("/")[0]
-        full = r.get("full_name", f"{owner_login}/{repo_name}")
-        print(f"[{scanned}] scanning {full}")
-
+            # /users/{name}/repos also answers for orgs: only trust it once
+            # the org endpoint has failed
+            return repos, kind if kind == "Organization" or errors else None
+        print(f"Warning: Could not fetch repos for {name}, skipping.")
+        for error in errors:
+            print(f"  ({error})")
+        return [], None
+
+    def resolve_listings(self, targets: List[Dict]) -> List[List[Dict]]:
+        """Repo objects of each target, in order; targets are resolved concurrently"""
+        known = self.owner_types()
+        workers = max(1, min(len(targets), self.config.resolve_workers))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resolve") as pool:
+            resolved = list(pool.map(self._resolve_target, targets))
+
+        learned = {}
+        for t, (repos, kind) in zip(targets, resolved):
+            if kind and known.get(t["name"].lower()) != kind:
+                learned[t["name"].lower()] = kind
+            for r in repos:
+                owner = r.get("owner") or {}
+                login, kind = (owner.get("login") or "").lower(), owner.get("type")
+                if login and kind and known.get(login) != kind:
+                    learned[login] = kind
+        if learned:
+            known.update(learned)
+            if self.store is not None:
+                self.store.save_owner_types(learned)
+        return [repos for repos, _ in resolved]
+
+    def list_repos(self, targets: List[Dict]) -> List[Dict]:
+        """Resolve targets to a deduplicated list of repo objects"""
+        repo_pool = []
+        seen_repos = set()
+        for repos in self.resolve_listings(targets):
+            for r in repos:
+                full = r.get("full_name")
+                if full and full in seen_repos:
+                    continue
+                seen_repos.add(full)
+                repo_pool.append(r)
+        return repo_pool
+
+    def invalidate_inventory(self):
+        """Re-list repos on the next collect() (repo created, renamed, archived...)"""
+        self._inventory = None
+
+    def tracks(self, full_name: str) -> bool:
+        """Whether a repo ("owner/name") falls under the configured targets"""
+        owner, _, repo = full_name.partition("/")
+        if self._targets is None:
+            self._targets = self.resolve_targets()
+        for t in self._targets:
+            if t["kind"] == "org_user" and t["name"].lower() == owner.lower():
+                return True
+            if t["kind"] == "repo" and f"{t['owner']}/{t['repo']}".lower() == full_name.lower():
+                return True
+        return False
+
+    def _stored_contributors(self) -> Dict[str, List[Dict]]:
+        """Per-repo contributor entries of the store's latest run ({} without a store)"""
+        if self.store is None:
+            return {}
+        latest = self.store.latest_run()
+        return self.store.repo_contributors(latest) if latest else {}
+
+    def prime(self, inventory: List[Dict], repo_contributors: Mapping[str, Optional[List[Dict]]]):
+        """Seed the warm state from data fetched elsewhere (batch mode)
+
+        A following collect(refresh=()) then only fetches repos missing here.
+        """
+        self._inventory = list(inventory)
+        self._repo_contributors.update(repo_contributors)
+
+    def scannable(self, r: Dict) -> bool:
+        """Whether a repo object from list_repos() counts towards the wall"""
+        if self.config.skip_archived and r.get("archived"):
+            return False
+        return not r.get("disabled") and not r.get("fork")
+
+    def plan(self, repos: List[Dict], previous: Dict) -> Optional[BudgetPlan]:
+        """Check the scan of repos against the remaining request budget
+
+        Returns None when planning is off or /rate_limit can't be read.
+        Raises BudgetExceeded under the "strict" policy.
+        """
+        config = self.config
+        if config.budget_policy == "off":
+            return None
         try:
-            contributors = list_repo_contributors(owner_login, repo_name)
-        except RuntimeError as e:
-            if "too large" in str(e):
-                print(f"  ⚠️  skipped (contributor list too large)")
+            rate = self.client.rate_limit()
+        except Exception as e:
+            print(f"WARNING: could not read rate limit, skipping budget planning: {e}")
+            return None
+
+        previous_counts = {full: d.get("count", 0) for full, d in (previous.get("details") or {}).items()}
+        for full, contributors in self._repo_contributors.items():
+            if contributors is not None:
+                previous_counts[full] = len(contributors)
+
+        def is_cached(full: str) -> bool:
+            owner, _, repo = full.partition("/")
+            return self.client.is_cached(self.client.contributors_url(owner, repo, config.include_anonymous))
+
+        plan = plan_budget(
+            repos,
+            rate,
+            config.budget_policy,
+            config.budget_reserve,
+            previous_counts,
+            is_cached,
+            previously_deferred=(previous.get("partial") or {}).get("deferred"),
+        )
+        print(plan.describe())
+        if config.budget_plan_file:
+            plan.write(config.budget_plan_file)
+        return plan
+
+    def _feed_cursor(self, url: str) -> FeedCursor:
+        if url in self._feed_cursors:
+            return self._feed_cursors[url]
+        saved = self.store.feed_cursor(url) if self.store is not None else None
+        return FeedCursor(**saved) if saved else FeedCursor()
+
+    def changes_from_feeds(self, targets: List[Dict], repo_pool: List[Dict]) -> Tuple[Optional[Set[str]], Dict[str, FeedCursor]]:
+        """Repos ("owner/name", lowercased) with new activity per the targets'
+        events feeds, or None when a full scan is needed; plus the advanced cursors
+
+        Unchanged repos are served from the previous collection, loaded from
+        the store when this Collector hasn't collected yet.
+        """
+        if not self._repo_contributors and self.store is not None:
+            latest = self.store.latest_run()
+            if latest:
+                self._repo_contributors.update(self.store.repo_contributors(latest))
+
+        owner_types = dict(self.owner_types())
+        for r in repo_pool:
+            owner = r.get("owner") or {}
+            if owner.get("login") and owner.get("type"):
+                owner_types[owner["login"].lower()] = owner["type"]
+
+        changed, full, cursors, requests = set(), False, {}, 0
+        for t in targets:
+            label = describe_target(t)
+            url = feed_url(self.config.api, t, owner_types)
+            if url is None:
+                print(f"Change feed {label}: owner type unknown, full scan")
+                full = True
                 continue
-            raise
-
-        repo_contributors = []
-
-        for c in contributors:
-            login = c.get("login")
-            # Skip excluded bot accounts
-            if login and login in EXCLUDE_LOGINS:
+            try:
+                feed = poll_feed(self.client, url, self._feed_cursor(url))
+            except (GitHubError, DeadlineExceeded) as e:
+                print(f"WARNING: events feed of {label} unavailable, full scan: {e}")
+                full = True
                 continue
-            if not login and not INCLUDE_ANONYMOUS:
+            requests += feed.requests
+            cursors[url] = feed.cursor
+            full = full or feed.full
+            changed.update(name.lower() for name in feed.changed)
+            print(f"Change feed {label}: {feed.reason}")
+
+        if not self._repo_contributors:
+            print(f"Change feed: no previous collection to reuse, full scan ({requests} feed requests)")
+            return None, cursors
+        if full:
+            print(f"Change feed: full scan ({requests} feed requests)")
+            return None, cursors
+        print(f"Change feed: {len(changed)} repos to rescan ({requests} feed requests)")
+        return changed, cursors
+
+    def fetch_contributors(self, owner: str, repo: str) -> Optional[List[Dict]]:
+        """Raw contributor list of one repo, or None if GitHub refuses (too large)"""
+        with tracing.span(f"scan {owner}/{repo}", "collect") as sp:
+            try:
+                contributors = self.client.list_repo_contributors(owner, repo, anon=self.config.include_anonymous)
+            except RuntimeError as e:
+                if "too large" in str(e):
+                    print(f"  ⚠️  skipped (contributor list too large)")
+                    sp.set(skipped="too large")
+                    return None
+                raise
+            sp.set(contributors=len(contributors))
+            return contributors
+
+    def collect(self, refresh: Optional[Iterable[str]] = None, defer: Iterable[str] = ()) -> CollectResult:
+        """Query the API and aggregate contributors; writes nothing
+
+        With refresh=None every repo is fetched again, unless change_feed
+        narrows it down to the repos with new activity. Otherwise only the
+        named repos ("owner/name") are re-fetched and everything else comes
+        from the previous collection held by this Collector. Repos in defer
+        are left for a later run, like repos the budget plan defers.
+        """
+        config = self.config
+        refresh = None if refresh is None else {name.lower() for name in refresh}
+        self.client.start_deadline(config.run_deadline)
+        targets = self._targets = self.resolve_targets()
+        seen_labels = set()
+        target_labels = []
+        for t in targets:
+            label = describe_target(t)
+            if label in seen_labels:
+                continue
+            seen_labels.add(label)
+            target_labels.append(label)
+        print(f"Targets: {', '.join(target_labels)}")
+
+        if refresh is None or self._inventory is None:
+            self._inventory = self.list_repos(targets)
+        repo_pool = self._inventory
+
+        feed_cursors = {}
+        if refresh is None and config.change_feed:
+            refresh, feed_cursors = self.changes_from_feeds(targets, repo_pool)
+
+        previous = load_existing_json(self.output_paths()["json"]) or {}
+        previous_details = previous.get("details") or {}
+        plan = None
+        if refresh is None:
+            plan = self.plan([r for r in repo_pool if self.scannable(r)], previous)
+        deferred = {name.lower() for name in plan.deferred} if plan else set()
+        deferred.update(name.lower() for name in defer)
+        deferred_repos = []
+        stored = None
+        out_of_budget = False
+
+        # Global aggregation: key -> { login, name, email, html_url, avatar_url, contributions }
+        agg = {}
+        # Per-repo contributors: full_repo_name -> list of contributors
+        repo_details = {}
+        # Display data for per-repo / per-org walls: scope -> key -> contributor
+        repo_walls = {}
+        org_walls = {}
+        # Per-repo counts by contributor key, for the store
+        contributions = {}
+
+        scanned = 0
+        for r in repo_pool:
+            if not self.scannable(r):
                 continue
 
-            key = f"user:{login}" if login else f"anon:{c.get('name') or c.get('email') or 'unknown'}"
-            
-            # Build contributor info
-            contrib_info = {
-                "name": c.get("name") or c.get("login") or "unknown",
-                "email": c.get("email"),
-            }
-            repo_contributors.append(contrib_info)
+            scanned += 1
+            owner_login = (r.get("owner") or {}).get("login")
+            repo_name = r["name"]
+            owner_login = owner_login or r.get("full_name", "").split("/")[0]
+            full = r.get("full_name", f"{owner_login}/{repo_name}")
+            fetch = refresh is None or full.lower() in refresh or full not in self._repo_contributors
+            if fetch and (out_of_budget or full.lower() in deferred):
+                deferred_repos.append(full)
+                fetch = False
+            if fetch:
+                print(f"[{scanned}] scanning {full}")
+                try:
+                    self._repo_contributors[full] = self.fetch_contributors(owner_login, repo_name)
+                except (RateLimitError, DeadlineExceeded) as e:
+                    # Never die halfway: keep what we have and leave the rest for next run
+                    print(f"WARNING: out of budget, deferring {full} and the remaining repos: {e}")
+                    out_of_budget = True
+                    deferred_repos.append(full)
+                if config.per_repo_delay_ms > 0:
+                    time.sleep(config.per_repo_delay_ms / 1000.0)
+
+            if full in self._repo_contributors:
+                contributors = self._repo_contributors[full]
+            else:
+                # Deferred and never fetched: last run's rows keep the repo's
+                # contributors on the walls (full rows from the store, else
+                # rebuilt from the previous JSON)
+                if stored is None:
+                    stored = self._stored_contributors()
+                contributors = stored.get(full) or previous_contributors(previous_details.get(full)) or None
+            if contributors is None:
+                continue
 
-            # Aggregate globally
-            if key not in agg:
-                agg[key] = {
-                    "login": login,
-                    "name": c.get("name") or c.get("login") or "unknown",
-                    "email": c.get("email"),
-                    "html_url": c.get("html_url"),
-                    "avatar_url": c.get("avatar_url"),
-                    "contributions": 0,
-                }
+            repo_contributors = []
+            repo_counts = contributions.setdefault(full, {})
+            repo_wall = repo_walls.setdefault(full, {}) if config.per_repo_walls else None
+            org_wall = org_walls.setdefault(owner_login, {}) if config.per_org_walls else None
 
-            agg[key]["contributions"] += int(c.get("contributions") or 0)
+            for c in contributors:
+                login = c.get("login")
+                # Skip excluded bot accounts
+                if login and login in config.exclude_logins:
+                    continue
+                if not login and not config.include_anonymous:
+                    continue
 
-        repo_details[full] = {
-            "count": len(repo_contributors),
-            "contributors": repo_contributors,
-        }
+                key = f"user:{login}" if login else f"anon:{c.get('name') or c.get('email') or 'unknown'}"
 
-        if PER_REPO_DELAY_MS > 0:
-            time.sleep(PER_REPO_DELAY_MS / 1000.0)
+                # Build contributor info
+                contrib_info = {
+                    "name": c.get("name") or c.get("login") or "unknown",
+                    "email": c.get("email"),
+                    "login": login,
+                    "contributions": int(c.get("contributions") or 0),
+                }
+                repo_contributors.append(contrib_info)
+
+                # Aggregate globally
+                if key not in agg:
+                    agg[key] = {
+                        "login": login,
+                        "name": c.get("name") or c.get("login") or "unknown",
+                        "email": c.get("email"),
+                        "html_url": c.get("html_url"),
+                        "avatar_url": c.get("avatar_url"),
+                        "contributions": 0,
+                    }
+
+                agg[key]["contributions"] += int(c.get("contributions") or 0)
+                repo_counts[key] = repo_counts.get(key, 0) + int(c.get("contributions") or 0)
+
+                for wall in (repo_wall, org_wall):
+                    if wall is None:
+                        continue
+                    if key not in wall:
+                        wall[key] = dict(agg[key], contributions=0)
+                    wall[key]["contributions"] += int(c.get("contributions") or 0)
+
+            repo_details[full] = {
+                "count": len(repo_contributors),
+                "contributors": repo_contributors,
+            }
 
-    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        # Forget repos that dropped out of the inventory
+        pool_names = {r.get("full_name") for r in repo_pool}
+        for full in set(self._repo_contributors) - pool_names:
+            del self._repo_contributors[full]
+
+        display_contributors = []
+        for _, v in agg.items():
+            display_contributors.append(
+                {
+                    "name": v.get("name"),
+                    "email": v.get("email"),
+                    "avatar_url": v.get("avatar_url"),
+                    "html_url": v.get("html_url"),
+                    "contributions": v.get("contributions", 0),
+                }
+            )
 
-    display_contributors = []
-    for _, v in agg.items():
-        display_contributors.append(
-            {
-                "name": v.get("name"),
-                "email": v.get("email"),
-                "avatar_url": v.get("avatar_url"),
-                "html_url": v.get("html_url"),
-                "contributions": v.get("contributions", 0),
-            }
+        # A partial scan can't vouch for the feed events it skipped
+        if deferred_repos:
+            feed_cursors = {}
+        self._feed_cursors.update(feed_cursors)
+
+        return CollectResult(
+            targets=target_labels,
+            contributors=display_contributors,
+            # Final contributors list (deduplicated, sorted by name)
+            contributors_list=name_email_list(display_contributors),
+            details=repo_details,
+            repo_walls={name: list(wall.values()) for name, wall in repo_walls.items()},
+            org_walls={name: list(wall.values()) for name, wall in org_walls.items()},
+            scanned=scanned,
+            people={k: {f: v.get(f) for f in ("login", "name", "email", "html_url", "avatar_url")} for k, v in agg.items()},
+            contributions=contributions,
+            plan=plan,
+            deferred=deferred_repos,
+            feed_cursors=feed_cursors,
         )
 
-    # Build final contributors list (deduplicated, sorted by name)
-    contributors_list = []
-    for v in display_contributors:
-        contributors_list.append({"name": v.get("name"), "email": v.get("email")})
+    def write(self, result: CollectResult) -> CollectResult:
+        """Write JSON and render walls for a collected result"""
+        config = self.config
+        paths = self.output_paths()
+        out_json_path = paths["json"]
+        readme_path = paths["readme"]
+
+        if self.store is not None:
+            # Snapshot the run, then render from the store's view of it
+            result.run_id = self.store.record_run(result.targets, result.people, result.contributions)
+            result.contributors = self.store.wall(result.run_id)
+            result.contributors_list = name_email_list(result.contributors)
+            result.details = self.store.details(result.run_id)
+            # Cursors only advance together with the snapshot they describe
+            for url, cursor in result.feed_cursors.items():
+                self.store.save_feed_cursor(url, cursor.last_event_id, cursor.etag)
+            print(f"Recorded run {result.run_id} in {self.config.store_path}")
+
+        # Check if contributors have changed before writing/rendering
+        has_changes = contributors_changed(out_json_path, result.contributors_list)
+        written = []
+
+        # Only write and render if there are changes
+        if has_changes:
+            # Ensure output directories exist
+            ensure_parent_dir(str(out_json_path))
+            ensure_parent_dir(str(paths["html"]))
+            ensure_parent_dir(str(paths["png"]))
+            ensure_parent_dir(str(paths["md"]))
 
-    contributors_list.sort(key=lambda x: (x.get("name") or "").lower())
-
-    # Check if contributors have changed before writing/rendering
-    has_changes = contributors_changed(out_json_path, contributors_list)
-    
-    out = {
-        "thanks-contributors": "1.0.0",
-        "count": len(contributors_list),
-        "contributors": contributors_list,
-        "details": repo_details,
-    }
+            try:
+                written = render_wall(
+                    result.contributors,
+                    str(paths["html"]),
+                    str(paths["png"]),
+                    str(paths["md"]),
+                    str(readme_path),
+                    html_mode=config.html_mode,
+                    sprite_path=str(paths["sprite"]),
+                    sprite_map_path=str(paths["sprite_map"]),
+                    data_dir=str(paths["data"]),
+                    formats=config.render_formats or None,
+                    image_options=config.image_options,
+                    svg_path=str(paths["svg"]),
+                    avatar_cache=self.avatar_cache,
+                    max_contributors=config.max_contributors,
+                    full_data_path=str(out_json_path),
+                )
+            except Exception as e:
+                print(f"Warning: failed to render contributors wall: {e}")
 
-    # Only write and render if there are changes
-    if has_changes:
-        # Ensure output directories exist
-        ensure_parent_dir(str(out_json_path))
-        ensure_parent_dir(str(html_out_path))
-        ensure_parent_dir(str(png_out_path))
-        ensure_parent_dir(str(md_out_path))
+            if write_if_changed(out_json_path, dump_contributors_json(result.to_json())):
+                written.append(str(out_json_path))
 
-        try:
-            render_wall(
-                display_contributors, 
-                str(html_out_path), 
-                str(png_out_path),
-                str(md_out_path),
-                str(readme_path)
+            # Contributor set changed but every artifact came out byte-identical
+            if not written:
+                print("Rendered outputs identical to existing files; nothing to commit")
+                has_changes = False
+        else:
+            # Ensure parent directory exists even if we skip writing
+            ensure_parent_dir(str(out_json_path))
+            # Same people, but the partial marker appeared, moved or cleared,
+            # or the file still uses an older schema version
+            previous = load_existing_json(out_json_path) or {}
+            payload = result.to_json()
+            outdated = previous.get("thanks-contributors", LEGACY_SCHEMA_VERSION) != payload["thanks-contributors"]
+            if outdated or previous.get("partial") != payload.get("partial"):
+                if write_if_changed(out_json_path, dump_contributors_json(payload)):
+                    written.append(str(out_json_path))
+                    has_changes = True
+
+        # Scoped walls are cheap to re-check (writes are skipped when identical),
+        # so they render every run and catch per-repo changes the global set hides
+        scoped = {}
+        scoped.update({f"repos/{name}": wall for name, wall in result.repo_walls.items()})
+        scoped.update({f"orgs/{name}": wall for name, wall in result.org_walls.items()})
+        if scoped:
+            print(f"Rendering {len(scoped)} per-repo/per-org walls (workers={config.wall_workers})")
+            scoped_written = self._render_scoped_walls(scoped, result.details, out_json_path.parent)
+            if scoped_written:
+                written.extend(scoped_written)
+                has_changes = True
+
+        print(
+            f"Wrote {out_json_path} (contributors={len(result.contributors_list)}, scanned_repos={result.scanned})"
+        )
+        print(f"API stats: {self.client.stats}")
+        if result.partial:
+            print(f"WARNING: partial run, {len(result.deferred)} repos deferred to the next run (kept from last output)")
+        result.changed = has_changes
+        result.written = written
+        return result
+
+    def run(self) -> CollectResult:
+        """collect() then write()"""
+        return self.write(self.collect())
+
+    def _render_scoped_walls(self, walls: Dict[str, List[Dict]], details: Dict[str, Dict], out_root: Path) -> List[str]:
+        """Render one wall per scope ("repos/owner/repo" or "orgs/owner") in parallel
+
+        All walls share the collector's avatar cache, so each avatar is
+        downloaded and cropped once no matter how many walls show it.
+        Returns the paths that changed.
+        """
+        def render_one(label: str, contributors: list):
+            paths = get_output_paths(out_root / label, self.output_paths()["readme"])
+            written = render_wall(
+                contributors,
+                None,
+                str(paths["png"]),
+                str(paths["md"]),
+                formats=SCOPED_WALL_FORMATS,
+                image_options=self.config.image_options,
+                svg_path=str(paths["svg"]),
+                avatar_cache=self.avatar_cache,
+                max_contributors=self.config.max_contributors,
+                full_data_path=str(paths["json"]),
             )
-        except Exception as e:
-            print(f"Warning: failed to render contributors wall: {e}")
+            payload = dump_contributors_json(_scoped_wall(label, contributors, details))
+            if write_if_changed(paths["json"], payload):
+                written.append(str(paths["json"]))
+            return written
+
+        written = []
+        with ThreadPoolExecutor(max_workers=self.config.wall_workers) as pool:
+            futures = {pool.submit(render_one, label, contributors): label for label, contributors in walls.items()}
+            for future, label in futures.items():
+                try:
+                    written.extend(future.result())
+                except Exception as e:
+                    print(f"Warning: failed to render wall for {label}: {e}")
+        return written
 
-        with open(out_json_path, "w", encoding="utf-8") as f:
-            json.dump(out, f, ensure_ascii=False, indent=2)
-    else:
-        # Ensure parent directory exists even if we skip writing
-        ensure_parent_dir(str(out_json_path))
 
-    print(
-        f"Wrote {out_json_path} (contributors={len(contributors_list)}, scanned_repos={scanned})"
-    )
-    
-    # Return whether there were changes
-    return has_changes
+def main():
+    """Run one collection configured from the environment; returns whether outputs changed"""
+    try:
+        config = CollectorConfig.from_env()
+    except ValueError as e:
+        raise SystemExit(str(e))
+    return Collector(config).run().changed
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,20 +4,29 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, Mapping, Optional, Tuple
 
 DEFAULT_OUTPUT_DIR = ".thanks-contributors"
 CONTRIB_JSON_NAME = "contributors.json"
 CONTRIB_HTML_NAME = "contributors.html"
 CONTRIB_PNG_NAME = "contributors.png"
 CONTRIB_MD_NAME = "contributors.md"
+CONTRIB_SVG_NAME = "contributors.svg"
+CONTRIB_WEBP_NAME = "contributors.webp"
+CONTRIB_AVIF_NAME = "contributors.avif"
+CONTRIB_SPRITE_NAME = "contributors-sprite.png"
+CONTRIB_SPRITE_MAP_NAME = "contributors-sprite.json"
+CONTRIB_DATA_DIR_NAME = "contributors-data"
+REPO_WALLS_DIR_NAME = "repos"
+ORG_WALLS_DIR_NAME = "orgs"
 DEFAULT_README_NAME = "README.md"
 
 
-def get_output_dir() -> Path:
+def get_output_dir(environ: Optional[Mapping[str, str]] = None) -> Path:
     """Get output directory, using GITHUB_WORKSPACE as base when running as action."""
-    output_dir = os.environ.get("OUTPUT_DIR", DEFAULT_OUTPUT_DIR)
-    github_workspace = os.environ.get("GITHUB_WORKSPACE")
+    env = os.environ if environ is None else environ
+    output_dir = env.get("OUTPUT_DIR", DEFAULT_OUTPUT_DIR)
+    github_workspace = env.get("GITHUB_WORKSPACE")
     
     # If running as GitHub Action, use workspace as base
     if github_workspace:
@@ -26,10 +35,21 @@ def get_output_dir() -> Path:
         return Path(output_dir)
 
 
-def get_output_paths(base_dir: Path | None = None) -> Dict[str, Path]:
-    root = Path(base_dir) if base_dir else get_output_dir()
-    readme_name = os.environ.get("README_PATH", DEFAULT_README_NAME)
-    github_workspace = os.environ.get("GITHUB_WORKSPACE")
+def get_workspace_path(path: str | Path, environ: Optional[Mapping[str, str]] = None) -> Path:
+    """Resolve a user-supplied relative path against GITHUB_WORKSPACE when running as action."""
+    path = Path(path)
+    env = os.environ if environ is None else environ
+    github_workspace = env.get("GITHUB_WORKSPACE")
+    if github_workspace and not path.is_absolute():
+        return Path(github_workspace) / path
+    return path
+
+
+def get_readme_path(environ: Optional[Mapping[str, str]] = None) -> Path:
+    """README_PATH, resolved against the workspace (action) or current dir (local)."""
+    env = os.environ if environ is None else environ
+    readme_name = env.get("README_PATH", DEFAULT_README_NAME)
+    github_workspace = env.get("GITHUB_WORKSPACE")
     
     # README path: handle absolute vs relative paths
     readme_path = Path(readme_name)
@@ -42,16 +62,42 @@ def get_output_paths(base_dir: Path | None = None) -> Dict[str, Path]:
         else:
             # Running locally: resolve relative to current directory
             readme_path = Path.cwd() / readme_name
+    return readme_path
+
+
+def get_output_paths(base_dir: Path | None = None, readme_path: Path | None = None) -> Dict[str, Path]:
+    root = Path(base_dir) if base_dir else get_output_dir()
+    readme_path = Path(readme_path) if readme_path else get_readme_path()
     
     return {
         "json": root / CONTRIB_JSON_NAME,
         "html": root / CONTRIB_HTML_NAME,
         "png": root / CONTRIB_PNG_NAME,
         "md": root / CONTRIB_MD_NAME,
+        "svg": root / CONTRIB_SVG_NAME,
+        "webp": root / CONTRIB_WEBP_NAME,
+        "avif": root / CONTRIB_AVIF_NAME,
+        "sprite": root / CONTRIB_SPRITE_NAME,
+        "sprite_map": root / CONTRIB_SPRITE_MAP_NAME,
+        "data": root / CONTRIB_DATA_DIR_NAME,
+        "repos": root / REPO_WALLS_DIR_NAME,
+        "orgs": root / ORG_WALLS_DIR_NAME,
         "readme": readme_path,
     }
 
 
-def get_tracked_files(base_dir: Path | None = None) -> Tuple[str, str, str, str, str]:
+# Outputs that only exist when an optional render mode is enabled
+OPTIONAL_OUTPUT_KEYS = ("svg", "webp", "avif", "sprite", "sprite_map", "data", "repos", "orgs")
+
+
+def get_tracked_files(base_dir: Path | None = None) -> Tuple[str, ...]:
     paths = get_output_paths(base_dir)
-    return (str(paths["json"]), str(paths["png"]), str(paths["html"]), str(paths["md"]), str(paths["readme"]))
+    tracked = [str(paths["json"]), str(paths["png"]), str(paths["html"]), str(paths["md"]), str(paths["readme"])]
+    for key in OPTIONAL_OUTPUT_KEYS:
+        if paths[key].exists():
+            tracked.append(str(paths[key]))
+    # Optional SQLite store (STORE_PATH) travels with the outputs
+    store_path = os.environ.get("STORE_PATH")
+    if store_path and get_workspace_path(store_path).exists():
+        tracked.append(str(get_workspace_path(store_path)))
+    return tuple(tracked)
@@ -0,0 +1,111 @@
+"""Public events feeds as a cheap change oracle before scanning.
+
+Each target has an events feed (/orgs/{org}/events, /users/{user}/events/public
+or /repos/{owner}/{repo}/events). Reading it from the newest event down to
+the last one seen by the previous run tells which repos got pushes, merged
+pull requests or membership changes in between; only those need their
+contributor lists fetched again. An unchanged feed answers 304 for free.
+
+The feed holds at most 300 events (90 days), so when the previous cursor is
+not found in it (300 newer events, or the cursor aged out of the window), or
+there is no cursor yet, the oracle can't vouch for anything and reports a
+full scan instead.
+"""
+
+from __future__ import annotations
+
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+from github_client import GitHubClient
+
+FEED_PER_PAGE = 100
+FEED_PAGES = 3  # GitHub serves at most 300 events per feed
+# Events that can change a repo's contributor list (or who may push to it)
+RELEVANT_EVENTS = frozenset({"PushEvent", "PullRequestEvent", "MemberEvent", "CreateEvent", "PublicEvent"})
+
+
+@dataclass
+class FeedCursor:
+    """Newest event id seen and the first page's validator, persisted between runs"""
+
+    last_event_id: Optional[int] = None
+    etag: Optional[str] = None
+
+
+@dataclass
+class FeedResult:
+    changed: Set[str] = field(default_factory=set)
+    # True when the feed can't account for everything since the cursor
+    full: bool = False
+    reason: str = ""
+    cursor: FeedCursor = field(default_factory=FeedCursor)
+    requests: int = 0
+
+
+def feed_url(api: str, target: Dict, owner_types: Dict[str, str]) -> Optional[str]:
+    """Events feed of a resolved target, or None when the owner type is unknown"""
+    if target["kind"] == "repo":
+        return f"{api}/repos/{target['owner']}/{target['repo']}/events"
+    owner_type = owner_types.get(target["name"].lower())
+    if owner_type == "Organization":
+        return f"{api}/orgs/{target['name']}/events"
+    if owner_type == "User":
+        return f"{api}/users/{target['name']}/events/public"
+    return None
+
+
+def _relevant(event: Dict) -> bool:
+    kind = event.get("type")
+    if kind not in RELEVANT_EVENTS:
+        return False
+    payload = event.get("payload") or {}
+    if kind == "PullRequestEvent":
+        return payload.get("action") == "closed" and bool((payload.get("pull_request") or {}).get("merged"))
+    if kind == "CreateEvent":
+        return payload.get("ref_type") == "repository"
+    return True
+
+
+def poll_feed(client: GitHubClient, url: str, cursor: FeedCursor) -> FeedResult:
+    """Repos with relevant events newer than cursor, and the cursor advanced past them"""
+    result = FeedResult(cursor=FeedCursor(cursor.last_event_id, cursor.etag))
+    newest = None
+    for page in range(1, FEED_PAGES + 1):
+        qs = urllib.parse.urlencode({"per_page": FEED_PER_PAGE, "page": page})
+        # The first page carries the validator from the previous run
+        res = client.request(f"{url}?{qs}", etag=cursor.etag if page == 1 else None)
+        result.requests += 1
+        if page == 1:
+            if res.status == 304:
+                result.reason = "not modified"
+                return result
+            result.cursor.etag = res.headers.get("etag")
+
+        events = res.json()
+        for event in events:
+            event_id = int(event["id"])
+            if cursor.last_event_id is not None and event_id <= cursor.last_event_id:
+                result.cursor.last_event_id = newest or cursor.last_event_id
+                result.reason = f"{len(result.changed)} repos with new activity"
+                return result
+            newest = max(newest or 0, event_id)
+            repo = (event.get("repo") or {}).get("name")
+            if repo and _relevant(event):
+                result.changed.add(repo)
+        if len(events) < FEED_PER_PAGE:
+            break
+
+    # The cursor was never reached: either 300 newer events pushed it out,
+    # or it aged out of the 90-day window. Either way, activity between it
+    # and the oldest event still served is lost.
+    result.full = True
+    result.cursor.last_event_id = newest or cursor.last_event_id
+    if cursor.last_event_id is None:
+        result.reason = "no cursor yet"
+    elif len(events) < FEED_PER_PAGE:
+        result.reason = "cursor aged out of feed window"
+    else:
+        result.reason = "feed window overflowed"
+    return result
@@ -3,21 +3,49 @@
 from __future__ import annotations
 
 import os
+import base64
+import hashlib
+import http.client
 import subprocess
+import tempfile
 import json
-import urllib.request
-import urllib.error
-from typing import Iterable, Optional
+import urllib.parse
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
 from datetime import datetime
 
+import tracing
 from config import get_tracked_files
+from resilience import RETRYABLE_STATUSES, RetryableStatus, RetryPolicy, RunStats, call_with_retries
 
 
-def _run_git(args: list[str], cwd: str | None = None) -> subprocess.CompletedProcess:
+def _run_git(
+    args: list[str],
+    cwd: str | None = None,
+    env: dict | None = None,
+    input: str | None = None,
+) -> subprocess.CompletedProcess:
     """Run a git command and return the result."""
-    return subprocess.run(
-        ["git", *args], cwd=cwd, text=True, capture_output=True, check=False
-    )
+    with tracing.span(f"git {args[0]}", "git", args=" ".join(args)[:200]) as sp:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            text=True,
+            capture_output=True,
+            check=False,
+            env={**os.environ, **env} if env else None,
+            input=input,
+        )
+        sp.set(returncode=result.returncode)
+        return result
+
+
+def _git_or_raise(args: list[str], cwd: str | None = None, env: dict | None = None, input: str | None = None) -> str:
+    """Run a git command and return stripped stdout, raising on failure."""
+    result = _run_git(args, cwd=cwd, env=env, input=input)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip()}")
+    return result.stdout.strip()
 
 
 def _is_github_actions() -> bool:
@@ -35,8 +63,43 @@ def write_github_output(key: str, value: str) -> bool:
     return True
 
 
+class GitHubAPIError(RuntimeError):
+    """Non-2xx response from the GitHub API."""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"GitHub API error ({status}): {body}")
+        self.status = status
+
+
+# (scheme, host) -> open keep-alive connection, reused by every API call
+_API_CONNECTIONS: dict = {}
+_API_RETRY = RetryPolicy(timeout=30)
+API_STATS = RunStats("requests", "retries", "timeouts")
+# Content-addressed objects are safe to create twice; PR creation is not
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "PATCH", "DELETE"})
+_IDEMPOTENT_POSTS = ("/git/blobs", "/git/trees")
+
+
+def _api_base() -> str:
+    """GitHub REST API root; GITHUB_API_URL also lets a local stand-in server be used."""
+    return os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+
+def _api_connection(scheme: str, netloc: str, fresh: bool = False) -> http.client.HTTPConnection:
+    key = (scheme, netloc)
+    conn = _API_CONNECTIONS.get(key)
+    if conn is not None and fresh:
+        conn.close()
+        conn = None
+    if conn is None:
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = conn_cls(netloc, timeout=30)
+        _API_CONNECTIONS[key] = conn
+    return conn
+
+
 def _get_github_api(url: str, method: str = "GET", data: Optional[dict] = None) -> dict:
-    """Make GitHub API requests."""
+    """Make GitHub API requests over a pooled keep-alive connection."""
     token = os.environ.get("GH_TOKEN")
     if not token:
         raise RuntimeError("Missing GH_TOKEN environment variable")
@@ -51,15 +114,65 @@ def _get_github_api(url: str, method: str = "GET", data: Optional[dict] = None)
     request_data = None
     if data:
         request_data = json.dumps(data).encode("utf-8")
-    
-    req = urllib.request.Request(url, data=request_data, headers=headers, method=method)
-    
-    try:
-        with urllib.request.urlopen(req) as response:
-            return json.loads(response.read().decode("utf-8"))
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8", errors="replace")
-        raise RuntimeError(f"GitHub API error ({e.code}): {error_body}")
+        headers["Content-Type"] = "application/json"
+    
+    parsed = urllib.parse.urlsplit(url)
+    path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+
+    idempotent = method in _IDEMPOTENT_METHODS or parsed.path.endswith(_IDEMPOTENT_POSTS)
+
+    def send(timeout: float):
+        for attempt in range(2):
+            conn = _api_connection(parsed.scheme, parsed.netloc, fresh=attempt > 0)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                API_STATS.incr("requests")
+                conn.request(method, path, body=request_data, headers=headers)
+            except (http.client.HTTPException, ConnectionError):
+                # The server may close an idle keep-alive connection; the
+                # request never got through, so reconnect once
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            except OSError:
+                conn.close()
+                raise
+            try:
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                conn.close()
+                # The request was sent and may have been applied: only
+                # idempotent ones are safe to send again
+                if attempt or not idempotent:
+                    raise
+            except OSError:
+                conn.close()
+                raise
+        if response.status in RETRYABLE_STATUSES and response.getheader("x-ratelimit-remaining") != "0":
+            retry_after = response.getheader("retry-after")
+            raise RetryableStatus(
+                response.status,
+                f"{response.status} {response.reason} for {method} {url}",
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        return response, body
+
+    traced = tracing.enabled()
+    with tracing.span(f"{method} {tracing.url_class(url)}" if traced else method, "http") as sp:
+        try:
+            response, body = call_with_retries(send, _API_RETRY, API_STATS, idempotent=idempotent)
+        except RetryableStatus as e:
+            raise GitHubAPIError(e.status, str(e)) from None
+        sp.set(status=response.status, bytes=len(body), sent=len(request_data or b""))
+
+    if response.status >= 400:
+        raise GitHubAPIError(response.status, body.decode("utf-8", errors="replace"))
+    return json.loads(body.decode("utf-8")) if body else {}
 
 
 def _get_base_branch() -> str:
@@ -82,7 +195,7 @@ def _get_base_branch() -> str:
     repo = os.environ.get("GITHUB_REPOSITORY")
     if repo:
         try:
-            info = _get_github_api(f"https://api.github.com/repos/{repo}")
+            info = _get_github_api(f"{_api_base()}/repos/{repo}")
             default_branch = (info.get("default_branch") or "").strip()
             if default_branch:
                 return default_branch
@@ -98,7 +211,7 @@ def _find_existing_pr(branch_name: str) -> Optional[dict]:
     if not repo:
         raise RuntimeError("GITHUB_REPOSITORY not set")
     
-    api_url = f"https://api.github.com/repos/{repo}/pulls"
+    api_url = f"{_api_base()}/repos/{repo}/pulls"
     params = {
         "state": "open",
         "head": f"{repo.split('/')[0]}:{branch_name}",
@@ -134,7 +247,7 @@ def _create_pr(branch_name: str, title: str, body: str) -> dict:
     # Resolve base branch robustly
     default_branch = _get_base_branch()
     
-    api_url = f"https://api.github.com/repos/{repo}/pulls"
+    api_url = f"{_api_base()}/repos/{repo}/pulls"
     
     payload = {
         "title": title,
@@ -153,7 +266,7 @@ def _update_pr(pr_number: int, title: str, body: str) -> dict:
     if not repo:
         raise RuntimeError("GITHUB_REPOSITORY not set")
     
-    api_url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}"
+    api_url = f"{_api_base()}/repos/{repo}/pulls/{pr_number}"
     
     payload = {
         "title": title,
@@ -164,67 +277,240 @@ def _update_pr(pr_number: int, title: str, body: str) -> dict:
     return pr_data
 
 
-def _push_branch(branch_name: str, force: bool = False) -> bool:
+def _push_branch(branch_name: str, force: bool = False, cwd: str | None = None, remote: str = "origin") -> bool:
     """Push branch to remote."""
-    args = ["push", "origin", branch_name]
+    args = ["push", remote, f"refs/heads/{branch_name}:refs/heads/{branch_name}"]
     if force:
         args.insert(2, "-f")
     
-    result = _run_git(args)
+    result = _run_git(args, cwd=cwd)
     if result.returncode != 0:
         raise RuntimeError(f"git push failed: {result.stderr.strip()}")
     return True
 
 
-def _create_or_update_pr_branch(
+def _collect_worktree_files(files: Iterable[str], top: Path, base: Path) -> Tuple[List[str], List[str]]:
+    """Split generated paths into (existing files, directory prefixes), relative to top.
+
+    Directories (e.g. contributors-data/) are expanded to the files they hold
+    and returned as prefixes, so stale entries under them can be dropped. A
+    listed file that is missing locally (README not checked out, a format not
+    rendered this run) is left alone, never deleted. Relative paths are
+    resolved against base.
+    """
+    present = []
+    prefixes = []
+    for f in files:
+        path = Path(f)
+        if not path.is_absolute():
+            path = base / path
+        path = path.resolve()
+        try:
+            rel = path.relative_to(top)
+        except ValueError:
+            print(f"⚠️  Skipping {f}: outside repository {top}")
+            continue
+        if path.is_dir():
+            prefixes.append(rel.as_posix())
+            present.extend(p.relative_to(top).as_posix() for p in sorted(path.rglob("*")) if p.is_file())
+        elif path.is_file():
+            present.append(rel.as_posix())
+    return present, prefixes
+
+
+def commit_files_plumbing(
     files: Iterable[str],
     branch_name: str,
     message: str,
     user_name: str = "github-actions[bot]",
     user_email: str = "41898282+github-actions[bot]@users.noreply.github.com",
     cwd: str | None = None,
-) -> bool:
-    """Create or update a PR branch with changes."""
-    if cwd:
-        os.chdir(cwd)
-    
-    files = list(files)
-    
-    # Configure git user
-    _run_git(["config", "user.name", user_name])
-    _run_git(["config", "user.email", user_email])
-    
-    # Create or checkout branch
-    check_branch = _run_git(["rev-parse", "--verify", branch_name])
-    if check_branch.returncode != 0:
-        # Branch doesn't exist, create it
-        result = _run_git(["checkout", "-b", branch_name])
-        if result.returncode != 0:
-            raise RuntimeError(f"Failed to create branch: {result.stderr.strip()}")
+    base_ref: str = "HEAD",
+) -> Optional[str]:
+    """Commit files onto refs/heads/<branch_name> without touching the checkout.
+
+    The commit is built with hash-object / update-index against a private index
+    file, then write-tree / commit-tree / update-ref. The branch starts from its
+    current tip, or from base_ref if it doesn't exist yet. Neither the working
+    tree, the real index nor HEAD are modified.
+
+    Returns the new commit id, or None when the tree matches the parent.
+    """
+    top = Path(_git_or_raise(["rev-parse", "--show-toplevel"], cwd=cwd))
+    branch_ref = f"refs/heads/{branch_name}"
+
+    existing = _run_git(["rev-parse", "--verify", "-q", f"{branch_ref}^{{commit}}"], cwd=top)
+    old_tip = existing.stdout.strip() if existing.returncode == 0 else ""
+    parent, parent_tree = _git_or_raise(["rev-parse", old_tip or base_ref, f"{old_tip or base_ref}^{{tree}}"], cwd=top).split()
+    null_id = "0" * len(parent)
+
+    present, prefixes = _collect_worktree_files(files, top, Path(cwd) if cwd else Path.cwd())
+
+    fd, index_path = tempfile.mkstemp(prefix="thanks-contributors-index-")
+    os.close(fd)
+    os.unlink(index_path)  # git wants to create the index itself
+    env = {"GIT_INDEX_FILE": index_path}
+    try:
+        _git_or_raise(["read-tree", parent], cwd=top, env=env)
+
+        # Entries under the generated directories that no longer exist on disk
+        tracked = _git_or_raise(["ls-files", "-z", "--", *prefixes], cwd=top, env=env) if prefixes else ""
+        removed = sorted(set(p for p in tracked.split("\0") if p) - set(present))
+
+        index_info = []
+        if present:
+            blobs = _git_or_raise(["hash-object", "-w", "--stdin-paths"], cwd=top, input="\n".join(present) + "\n").split()
+            for rel, blob in zip(present, blobs):
+                mode = "100755" if os.access(top / rel, os.X_OK) else "100644"
+                index_info.append(f"{mode} {blob}\t{rel}")
+        index_info.extend(f"0 {null_id}\t{rel}" for rel in removed)
+        if index_info:
+            _git_or_raise(["update-index", "--index-info"], cwd=top, env=env, input="\n".join(index_info) + "\n")
+
+        tree = _git_or_raise(["write-tree"], cwd=top, env=env)
+    finally:
+        if os.path.exists(index_path):
+            os.unlink(index_path)
+
+    if tree == parent_tree:
+        print("ℹ️  No changes to commit")
+        return None
+
+    identity = {
+        "GIT_AUTHOR_NAME": user_name,
+        "GIT_AUTHOR_EMAIL": user_email,
+        "GIT_COMMITTER_NAME": user_name,
+        "GIT_COMMITTER_EMAIL": user_email,
+    }
+    commit = _git_or_raise(["commit-tree", tree, "-p", parent, "-m", message], cwd=top, env=identity)
+    # Compare-and-swap against the tip we read, so a concurrent update isn't clobbered
+    _git_or_raise(["update-ref", "-m", message, branch_ref, commit, old_tip or null_id], cwd=top)
+    return commit
+
+
+def _git_blob_sha(data: bytes) -> str:
+    """Object id git (and the GitHub API) assign to a blob with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def commit_files_api(
+    files: Iterable[str],
+    branch_name: str,
+    message: str,
+    user_name: str = "github-actions[bot]",
+    user_email: str = "41898282+github-actions[bot]@users.noreply.github.com",
+    cwd: str | None = None,
+    base_branch: str | None = None,
+    force: bool = True,
+) -> Optional[str]:
+    """Commit files onto branch_name through the GitHub Git Data API.
+
+    Only needs the generated files on disk, not a clone: paths are taken
+    relative to cwd (the repository root). Blobs are uploaded only for files
+    whose git blob id differs from the parent tree, then a tree, a commit and
+    a ref update are created. The branch starts from its current tip, or from
+    base_branch if it doesn't exist yet.
+
+    Returns the new commit sha, or None when nothing changed.
+    """
+    repo = os.environ.get("GITHUB_REPOSITORY")
+    if not repo:
+        raise RuntimeError("GITHUB_REPOSITORY not set")
+    api = f"{_api_base()}/repos/{repo}"
+    root = Path(cwd) if cwd else Path.cwd()
+
+    branch_path = urllib.parse.quote(branch_name, safe="/")
+    try:
+        old_tip = _get_github_api(f"{api}/git/ref/heads/{branch_path}")["object"]["sha"]
+    except GitHubAPIError as e:
+        if e.status != 404:
+            raise
+        old_tip = None
+    if old_tip:
+        parent = old_tip
     else:
-        # Branch exists, switch to it
-        result = _run_git(["checkout", branch_name])
-        if result.returncode != 0:
-            raise RuntimeError(f"Failed to checkout branch: {result.stderr.strip()}")
-    
-    # Add files
-    add_result = _run_git(["add", *files])
-    if add_result.returncode != 0:
-        raise RuntimeError(f"git add failed: {add_result.stderr.strip()}")
-    
-    # Check if there are changes
-    status_result = _run_git(["status", "--porcelain"])
-    if not status_result.stdout.strip():
+        base_path = urllib.parse.quote(base_branch or _get_base_branch(), safe="/")
+        parent = _get_github_api(f"{api}/git/ref/heads/{base_path}")["object"]["sha"]
+
+    parent_tree = _get_github_api(f"{api}/git/commits/{parent}")["tree"]["sha"]
+    remote_tree = _get_github_api(f"{api}/git/trees/{parent_tree}?recursive=1")
+    remote_blobs = {e["path"]: e["sha"] for e in remote_tree.get("tree", []) if e.get("type") == "blob"}
+    if remote_tree.get("truncated"):
+        print("⚠️  Remote tree listing truncated; unchanged files may be re-uploaded")
+
+    present, prefixes = _collect_worktree_files(files, root.resolve(), root)
+
+    entries = []
+    for rel in present:
+        content = (root / rel).read_bytes()
+        if remote_blobs.get(rel) == _git_blob_sha(content):
+            continue
+        blob = _get_github_api(
+            f"{api}/git/blobs",
+            method="POST",
+            data={"content": base64.b64encode(content).decode("ascii"), "encoding": "base64"},
+        )
+        mode = "100755" if os.access(root / rel, os.X_OK) else "100644"
+        entries.append({"path": rel, "mode": mode, "type": "blob", "sha": blob["sha"]})
+
+    # Files under the generated paths that no longer exist locally
+    present_set = set(present)
+    for path in sorted(remote_blobs):
+        if path in present_set:
+            continue
+        if any(path == prefix or path.startswith(prefix + "/") for prefix in prefixes):
+            entries.append({"path": path, "mode": "100644", "type": "blob", "sha": None})
+
+    if not entries:
         print("ℹ️  No changes to commit")
+        return None
+
+    tree = _get_github_api(f"{api}/git/trees", method="POST", data={"base_tree": parent_tree, "tree": entries})
+    commit = _get_github_api(
+        f"{api}/git/commits",
+        method="POST",
+        data={
+            "message": message,
+            "tree": tree["sha"],
+            "parents": [parent],
+            "author": {"name": user_name, "email": user_email},
+        },
+    )
+    if old_tip:
+        _get_github_api(f"{api}/git/refs/heads/{branch_path}", method="PATCH", data={"sha": commit["sha"], "force": force})
+    else:
+        _get_github_api(f"{api}/git/refs", method="POST", data={"ref": f"refs/heads/{branch_name}", "sha": commit["sha"]})
+
+    print(f"✓ Committed {len(entries)} file(s) to {branch_name} via API: {commit['sha']}")
+    return commit["sha"]
+
+
+def _create_or_update_pr_branch(
+    files: Iterable[str],
+    branch_name: str,
+    message: str,
+    user_name: str = "github-actions[bot]",
+    user_email: str = "41898282+github-actions[bot]@users.noreply.github.com",
+    cwd: str | None = None,
+) -> bool:
+    """Create or update a PR branch with changes.
+
+    The branch commit is built with git plumbing, so the checkout and the
+    current branch are left alone; only the resulting ref is force-pushed.
+    """
+    commit = commit_files_plumbing(
+        files=files,
+        branch_name=branch_name,
+        message=message,
+        user_name=user_name,
+        user_email=user_email,
+        cwd=cwd,
+    )
+    if commit is None:
         return False
-    
-    # Commit
-    commit_result = _run_git(["commit", "-m", message, "--allow-empty"])
-    if commit_result.returncode != 0:
-        raise RuntimeError(f"git commit failed: {commit_result.stderr.strip()}")
-    
+
     # Push to remote
-    _push_branch(branch_name, force=True)
+    _push_branch(branch_name, force=True, cwd=cwd)
     
     return True
 
@@ -236,14 +522,34 @@ def auto_commit(
     user_email: str = "41898282+github-actions[bot]@users.noreply.github.com",
     cwd: str | None = None,
     push: bool = True,
+    mode: str = "git",
 ) -> bool:
-    """Automatically commit and push changes to tracked files."""
+    """Automatically commit and push changes to tracked files.
+
+    mode="api" commits through the GitHub Git Data API onto the workflow's
+    branch instead, which works without a local clone.
+    """
     if files is None:
         files = get_tracked_files()
     
     if not _is_github_actions():
         print("INFO: Not running in GitHub Actions; skipping auto-commit.")
         return False
+
+    if mode == "api":
+        branch = os.environ.get("GITHUB_REF_NAME") or _get_base_branch()
+        commit = commit_files_api(
+            files,
+            branch_name=branch,
+            message=message,
+            user_name=user_name,
+            user_email=user_email,
+            cwd=cwd,
+            force=False,
+        )
+        if commit:
+            print("✓ Auto-commit completed")
+        return commit is not None
     
     # Change to repo directory if specified
     if cwd:
@@ -260,6 +566,12 @@ def auto_commit(
     if add_result.returncode != 0:
         raise RuntimeError(f"git add failed: {add_result.stderr.strip()}")
 
+    # Outputs are only rewritten when their bytes change; skip empty commits
+    staged = _run_git(["diff", "--cached", "--quiet", "--", *files])
+    if staged.returncode == 0:
+        print("ℹ️  No changes to commit")
+        return False
+
     # Commit
     commit_result = _run_git(["commit", "-m", message])
     if commit_result.returncode != 0:
@@ -283,9 +595,13 @@ def create_or_update_pr(
     user_name: str = "github-actions[bot]",
     user_email: str = "41898282+github-actions[bot]@users.noreply.github.com",
     cwd: str | None = None,
+    mode: str = "git",
 ) -> dict | None:
     """
     Create a new PR or update an existing one with changes.
+
+    mode="git" builds the branch commit locally and pushes it; mode="api"
+    creates it through the GitHub Git Data API without needing a clone.
     
     Returns:
         dict: PR data if created/updated, None if no changes
@@ -298,14 +614,24 @@ def create_or_update_pr(
         return None
     
     # Create or update branch with changes
-    has_changes = _create_or_update_pr_branch(
-        files=files,
-        branch_name=branch_name,
-        message=message,
-        user_name=user_name,
-        user_email=user_email,
-        cwd=cwd,
-    )
+    if mode == "api":
+        has_changes = commit_files_api(
+            files=files,
+            branch_name=branch_name,
+            message=message,
+            user_name=user_name,
+            user_email=user_email,
+            cwd=cwd,
+        ) is not None
+    else:
+        has_changes = _create_or_update_pr_branch(
+            files=files,
+            branch_name=branch_name,
+            message=message,
+            user_name=user_name,
+            user_email=user_email,
+            cwd=cwd,
+        )
     
     if not has_changes:
         return None
@@ -0,0 +1,321 @@
+"""Pooled, authenticated GitHub REST client used by the collector."""
+
+from __future__ import annotations
+
+import http.client
+import json
+import ssl
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import tracing
+from resilience import (
+    RETRYABLE_STATUSES,
+    Deadline,
+    LatencyTracker,
+    RetryableStatus,
+    RetryPolicy,
+    RunStats,
+    call_with_retries,
+    hedged,
+)
+
+API = "https://api.github.com"
+USER_AGENT = "org-contributors-action"
+MAX_REDIRECTS = 5
+HEDGE_WORKERS = 8
+
+
+class GitHubError(RuntimeError):
+    """Non-2xx response from the GitHub API."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class RateLimitError(GitHubError):
+    """The token ran out of requests (403/429 with no remaining quota)."""
+
+    def __init__(self, status: int, message: str, reset: Optional[int] = None):
+        super().__init__(status, message)
+        self.reset = reset
+
+
+class Response:
+    """Status, headers and body of one API call."""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body.decode("utf-8"))
+
+
+class ETagCache:
+    """Thread-safe (etag, response) store per URL for conditional requests.
+
+    GitHub doesn't count 304 Not Modified answers against the rate limit, so
+    a cache kept warm across runs in one process makes unchanged pages free.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, Response]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[Tuple[str, Response]]:
+        with self._lock:
+            return self._entries.get(url)
+
+    def put(self, url: str, etag: str, response: Response):
+        with self._lock:
+            self._entries[url] = (etag, response)
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return url in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def parse_next_link(link_header: str):
+    # Link: <url>; rel="next", <url>; rel="last"
+    if not link_header:
+        return None
+    parts = [p.strip() for p in link_header.split(",")]
+    for p in parts:
+        if 'rel="next"' in p:
+            start = p.find("<")
+            end = p.find(">")
+            if start != -1 and end != -1 and end > start:
+                return p[start + 1 : end]
+    return None
+
+
+class GitHubClient:
+    """GitHub REST client with keep-alive connections and an optional ETag cache.
+
+    Connections are kept per thread and per host, so one client can be shared
+    by concurrent callers and reused across many collection runs. Every call
+    goes through the retry policy (timeouts, jittered retries, optional
+    hedging) and the current overall deadline.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        api: str = API,
+        etag_cache: Optional[ETagCache] = None,
+        verify_ssl: bool = False,
+        retry: Optional[RetryPolicy] = None,
+    ):
+        self.token = token
+        self.api = api.rstrip("/")
+        self.etag_cache = etag_cache
+        self.retry = retry or RetryPolicy()
+        self.deadline = Deadline(None)
+        self.stats = RunStats("requests", "not_modified", "retries", "timeouts", "hedges", "hedge_wins")
+        self.latency = LatencyTracker()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+        self._local = threading.local()
+
+        self._ssl_context = ssl.create_default_context()
+        if not verify_ssl:
+            # Needed in some environments with corporate proxies or certificate issues
+            self._ssl_context.check_hostname = False
+            self._ssl_context.verify_mode = ssl.CERT_NONE
+
+    def start_deadline(self, seconds: Optional[float]):
+        """Bound every following call by seconds from now (None/0: no bound)"""
+        self.deadline = Deadline(seconds)
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.retry.hedge_percentile:
+            return None
+        delay = self.latency.percentile(self.retry.hedge_percentile)
+        if delay is not None and self._hedge_pool is None:
+            with self._hedge_lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(HEDGE_WORKERS, thread_name_prefix="gh-hedge")
+        return delay
+
+    def _connection(self, scheme: str, netloc: str, fresh: bool = False) -> http.client.HTTPConnection:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        key = (scheme, netloc)
+        conn = conns.get(key)
+        if conn is not None and fresh:
+            conn.close()
+            conn = None
+        if conn is None:
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(netloc, timeout=self.retry.timeout, context=self._ssl_context)
+            else:
+                conn = http.client.HTTPConnection(netloc, timeout=self.retry.timeout)
+            conns[key] = conn
+        return conn
+
+    def _send(self, url: str, headers: Dict[str, str], timeout: float) -> Tuple[http.client.HTTPResponse, bytes]:
+        parsed = urllib.parse.urlsplit(url)
+        path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        for attempt in range(2):
+            conn = self._connection(parsed.scheme, parsed.netloc, fresh=attempt > 0)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request("GET", path, headers=headers)
+                res = conn.getresponse()
+                return res, res.read()
+            except (http.client.HTTPException, ConnectionError):
+                # The server may close an idle keep-alive connection; reconnect once
+                conn.close()
+                if attempt:
+                    raise
+            except OSError:
+                # Timed out mid-exchange: the connection is unusable, the retry layer decides
+                conn.close()
+                raise
+        raise AssertionError("unreachable")
+
+    def _exchange(self, url: str, headers: Dict[str, str], timeout: float):
+        """One attempt: GET url following redirects, raising RetryableStatus for transient failures"""
+        started = time.monotonic()
+        target = url
+        for redirects in range(MAX_REDIRECTS + 1):
+            self.stats.incr("requests")
+            res, body = self._send(target, headers, timeout)
+            if res.status in (301, 302, 307, 308) and res.getheader("Location"):
+                # Renamed or transferred repos redirect to their new location
+                target = urllib.parse.urljoin(target, res.getheader("Location"))
+                continue
+            break
+
+        retry_after = res.getheader("retry-after")
+        exhausted = res.getheader("x-ratelimit-remaining") == "0"
+        if not exhausted and (res.status in RETRYABLE_STATUSES or (res.status == 403 and retry_after)):
+            # 5xx blips and secondary rate limits clear up; an exhausted quota doesn't
+            raise RetryableStatus(
+                res.status,
+                f"{res.status} {res.reason} for {url}",
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+        self.latency.add(time.monotonic() - started)
+        return res, body, redirects
+
+    def request(self, url: str, cache: bool = True, etag: Optional[str] = None) -> Response:
+        """GET url; etag is a validator kept from an earlier process, whose
+        304 comes back as an empty Response(304) unless the cache has the body"""
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "User-Agent": USER_AGENT,
+        }
+        cache = cache and self.etag_cache is not None
+        cached = self.etag_cache.get(url) if cache else None
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        elif etag:
+            headers["If-None-Match"] = etag
+
+        def attempt(timeout: float):
+            return hedged(lambda: self._exchange(url, headers, timeout), self._hedge_delay(), self._hedge_pool, self.stats)
+
+        traced = tracing.enabled()
+        with tracing.span(f"GET {tracing.url_class(url)}" if traced else "GET", "http") as sp:
+            try:
+                res, body, redirects = call_with_retries(attempt, self.retry, self.stats, self.deadline)
+            except RetryableStatus as e:
+                raise GitHubError(e.status, str(e)) from None
+            if traced:
+                sp.set(
+                    url=url,
+                    status=res.status,
+                    bytes=len(body),
+                    cache="hit" if res.status == 304 else ("miss" if cached else "none"),
+                    redirects=redirects,
+                    rate_remaining=res.getheader("x-ratelimit-remaining"),
+                )
+
+        if res.status == 304 and cached:
+            self.stats.incr("not_modified")
+            return cached[1]
+
+        if res.status >= 400:
+            text = body.decode("utf-8", errors="replace")[:300]
+            remaining = res.getheader("x-ratelimit-remaining")
+            reset = res.getheader("x-ratelimit-reset")
+            if res.status in (403, 429) and (remaining == "0" or "rate limit" in text.lower()):
+                raise RateLimitError(
+                    res.status,
+                    f"{res.status} rate limited. rate_remaining={remaining} rate_reset={reset} body={text}",
+                    reset=int(reset) if reset and reset.isdigit() else None,
+                )
+            if res.status == 403:
+                raise GitHubError(
+                    403, f"403 Forbidden. rate_remaining={remaining} rate_reset={reset} body={text}"
+                )
+            raise GitHubError(res.status, f"{res.status} {res.reason}: {text}")
+
+        response = Response(res.status, {k.lower(): v for k, v in res.getheaders()}, body)
+        if res.status == 304:
+            self.stats.incr("not_modified")
+        elif cache and response.headers.get("etag"):
+            self.etag_cache.put(url, response.headers["etag"], response)
+        return response
+
+    def get_json(self, url: str):
+        return self.request(url).json()
+
+    def paginate(self, url: str) -> List:
+        items = []
+        next_url = url
+        traced = tracing.enabled()
+        with tracing.span(f"paginate {tracing.url_class(url)}" if traced else "paginate", "http") as sp:
+            pages = 0
+            while next_url:
+                res = self.request(next_url)
+                pages += 1
+                data = res.json()
+                if not isinstance(data, list):
+                    raise RuntimeError(f"Expected list response for {next_url}")
+                items.extend(data)
+                next_url = parse_next_link(res.headers.get("link"))
+            sp.set(url=url, pages=pages, items=len(items))
+        return items
+
+    def list_org_public_repos(self, org: str) -> List[Dict]:
+        qs = urllib.parse.urlencode({"type": "public", "per_page": 100, "sort": "updated"})
+        return self.paginate(f"{self.api}/orgs/{org}/repos?{qs}")
+
+    def list_user_public_repos(self, user: str) -> List[Dict]:
+        qs = urllib.parse.urlencode({"type": "public", "per_page": 100, "sort": "updated"})
+        return self.paginate(f"{self.api}/users/{user}/repos?{qs}")
+
+    def contributors_url(self, owner: str, repo: str, anon: bool = True) -> str:
+        qs = urllib.parse.urlencode({"per_page": 100, "anon": "true" if anon else "false"})
+        return f"{self.api}/repos/{owner}/{repo}/contributors?{qs}"
+
+    def list_repo_contributors(self, owner: str, repo: str, anon: bool = True) -> List[Dict]:
+        return self.paginate(self.contributors_url(owner, repo, anon))
+
+    def is_cached(self, url: str) -> bool:
+        """Whether url has an ETag, i.e. an unchanged answer is a free 304"""
+        return self.etag_cache is not None and url in self.etag_cache
+
+    def rate_limit(self) -> Dict:
+        """The "core" quota: limit, remaining, reset (this call itself is free)"""
+        return self.request(f"{self.api}/rate_limit", cache=False).json()["resources"]["core"]
+
+    def get_repo(self, owner: str, repo: str) -> Dict:
+        return self.get_json(f"{self.api}/repos/{owner}/{repo}")
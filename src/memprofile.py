@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""Memory regression harness for collection and rendering.
+
+Runs the real Collector and render_wall() against synthetic orgs (no
+network: a fake API client and generated avatars) and records, per phase
+(inventory, aggregate, json, render.<format>):
+
+- traced peak: Python allocations seen by tracemalloc (incl. numpy arrays)
+- rss peak: growth of the process high-water mark (Linux), which also
+  covers Pillow's pixel buffers that tracemalloc can't see
+- the largest net allocation sites at the end of the phase
+
+Budgets fail the run (exit code 1) when a phase's peak, the larger of the
+two numbers, goes over them:
+
+    python src/memprofile.py --sizes 1000 10000 100000 \\
+        --budget aggregate=64MB --budget render.png@10000=3GB --report mem.json
+
+A budget key is PHASE or PHASE@CONTRIBUTORS; sizes take KB/MB/GB suffixes.
+--budget-file reads the same keys from a JSON object.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.parse
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import render_contributors
+from collect_contributors import Collector, CollectorConfig, dump_contributors_json, parse_max_contributors
+from output import write_if_changed
+from render_contributors import FORMATS, HAS_PIL, AvatarCache, render_wall
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+# Average contributors listed per synthetic repo
+CONTRIBUTORS_PER_REPO = 50
+SYNTHETIC_OWNER = "synthetic"
+# Uncapped raster walls above this many contributors need tens of GB (one
+# tile per contributor on one canvas), so they are skipped unless capped
+RASTER_FORMATS = ("png", "svg")
+RASTER_LIMIT = 10000
+TOP_SITES = 5
+
+_UNITS = {"": 1, "B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+_TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def parse_size(text: str) -> int:
+    """"64MB" -> bytes"""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", text.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def format_size(n: Optional[int]) -> str:
+    if n is None:
+        return "-"
+    for unit in ("GB", "MB", "KB"):
+        if abs(n) >= _UNITS[unit]:
+            return f"{n / _UNITS[unit]:.1f}{unit}"
+    return f"{n}B"
+
+
+def parse_budgets(items: List[str]) -> Dict[str, int]:
+    budgets = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid budget '{item}', expected PHASE[@CONTRIBUTORS]=SIZE")
+        budgets[key.strip()] = parse_size(value)
+    return budgets
+
+
+def _rss_peak() -> Optional[int]:
+    """Process resident-set high-water mark in bytes (Linux only)"""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_rss_peak() -> bool:
+    """Reset VmHWM to the current RSS so the next phase gets its own peak"""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+@dataclass
+class PhaseResult:
+    phase: str
+    contributors: int
+    seconds: float
+    traced_peak: int
+    retained: int
+    rss_peak: Optional[int]
+    top_sites: List[Tuple[str, int]] = field(default_factory=list)
+    budget: Optional[int] = None
+    skipped: str = ""
+
+    @property
+    def peak(self) -> int:
+        return max(self.traced_peak, self.rss_peak or 0)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and not self.skipped and self.peak > self.budget
+
+
+class PhaseMeter:
+    """Measures consecutive phases; tracemalloc runs for the meter's lifetime"""
+
+    def __init__(self, budgets: Dict[str, int], top: int = TOP_SITES):
+        self.budgets = budgets
+        self.top = top
+        self.results: List[PhaseResult] = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def budget_for(self, phase: str, contributors: int) -> Optional[int]:
+        return self.budgets.get(f"{phase}@{contributors}", self.budgets.get(phase))
+
+    @contextlib.contextmanager
+    def phase(self, name: str, contributors: int) -> Iterator[None]:
+        gc.collect()
+        before = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+        tracemalloc.reset_peak()
+        start_traced = tracemalloc.get_traced_memory()[0]
+        start_rss = _rss_peak() if _reset_rss_peak() else None
+        started = time.perf_counter()
+        # Collector / renderer progress lines would be traced too
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+        seconds = time.perf_counter() - started
+        current, peak = tracemalloc.get_traced_memory()
+        end_rss = _rss_peak()
+        after = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+        sites = [
+            (str(stat.traceback[0]), stat.size_diff)
+            for stat in after.compare_to(before, "lineno")[: self.top]
+            if stat.size_diff > 0
+        ]
+        self.results.append(
+            PhaseResult(
+                phase=name,
+                contributors=contributors,
+                seconds=seconds,
+                traced_peak=peak - start_traced,
+                retained=current - start_traced,
+                rss_peak=end_rss - start_rss if start_rss is not None and end_rss is not None else None,
+                top_sites=sites,
+                budget=self.budget_for(name, contributors),
+            )
+        )
+
+    def skip(self, name: str, contributors: int, reason: str):
+        self.results.append(PhaseResult(name, contributors, 0.0, 0, 0, None, skipped=reason))
+
+
+class SyntheticClient:
+    """Stands in for GitHubClient: one org with repos of generated contributors"""
+
+    def __init__(self, contributors: int, seed: int = 0):
+        self.contributors = contributors
+        self.repos = max(1, contributors // CONTRIBUTORS_PER_REPO)
+        self.seed = seed
+
+    def start_deadline(self, seconds):
+        pass
+
+    def _repo(self, i: int) -> Dict:
+        name = f"repo-{i:05d}"
+        full = f"{SYNTHETIC_OWNER}/{name}"
+        api = f"https://api.github.com/repos/{full}"
+        owner = {"login": SYNTHETIC_OWNER, "id": 1, "type": "Organization", "url": f"https://api.github.com/users/{SYNTHETIC_OWNER}"}
+        repo = {"id": i, "node_id": f"R_{i:012d}", "name": name, "full_name": full, "owner": owner, "private": False,
+                "html_url": f"https://github.com/{full}", "description": "Synthetic repository " * 4, "fork": False,
+                "archived": False, "disabled": False, "pushed_at": f"2024-01-{1 + i % 28:02d}T00:00:00Z",
+                "default_branch": "main", "stargazers_count": i, "forks_count": i % 7, "topics": ["synthetic", "memory"]}
+        # The rest of a real repo object: two dozen *_url templates
+        for key in ("archive", "assignees", "blobs", "branches", "collaborators", "comments", "commits", "compare",
+                    "contents", "contributors", "deployments", "downloads", "events", "forks", "git_commits",
+                    "git_refs", "git_tags", "hooks", "issue_comment", "issue_events", "issues", "keys", "labels",
+                    "languages", "merges", "milestones", "notifications", "pulls", "releases", "stargazers"):
+            repo[f"{key}_url"] = f"{api}/{key}{{/id}}"
+        return repo
+
+    def list_org_public_repos(self, org: str) -> List[Dict]:
+        # Round-trip through JSON like a real response body
+        return json.loads(json.dumps([self._repo(i) for i in range(self.repos)]))
+
+    def list_user_public_repos(self, user: str) -> List[Dict]:
+        return []
+
+    def list_repo_contributors(self, owner: str, repo: str, anon: bool = True) -> List[Dict]:
+        index = int(repo.rsplit("-", 1)[1])
+        rng = random.Random(self.seed * 1_000_003 + index)
+        # Each person has a home repo; a fifth of a repo's list are visitors
+        people = list(range(index, self.contributors, self.repos))
+        people += rng.sample(range(self.contributors), min(self.contributors, CONTRIBUTORS_PER_REPO // 5))
+        entries = []
+        for person in dict.fromkeys(people):
+            login = f"user-{person:06d}"
+            if person % 50 == 0:
+                entries.append({"name": f"Anonymous {person}", "email": f"{login}@example.com", "type": "Anonymous",
+                                "contributions": rng.randint(1, 50)})
+                continue
+            api = f"https://api.github.com/users/{login}"
+            entries.append({"login": login, "id": person, "node_id": f"U_{person:012d}",
+                            "avatar_url": f"https://avatars.githubusercontent.com/u/{person}?v=4", "gravatar_id": "",
+                            "url": api, "html_url": f"https://github.com/{login}", "followers_url": f"{api}/followers",
+                            "following_url": f"{api}/following{{/other_user}}", "gists_url": f"{api}/gists{{/gist_id}}",
+                            "starred_url": f"{api}/starred{{/owner}}{{/repo}}", "subscriptions_url": f"{api}/subscriptions",
+                            "organizations_url": f"{api}/orgs", "repos_url": f"{api}/repos", "events_url": f"{api}/events{{/privacy}}",
+                            "received_events_url": f"{api}/received_events", "type": "User", "site_admin": False,
+                            "contributions": rng.randint(1, 500)})
+        entries.sort(key=lambda c: c["contributions"], reverse=True)
+        return json.loads(json.dumps(entries))
+
+
+@lru_cache(maxsize=None)
+def _avatar_bytes(size: int) -> bytes:
+    """A noisy (poorly compressible) avatar of size x size, encoded like GitHub serves it"""
+    from PIL import Image
+
+    img = Image.frombytes("RGB", (size, size), random.Random(size).randbytes(size * size * 3))
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _synthetic_avatar(url: str):
+    """Replacement for render_contributors._download_avatar: decode a generated image"""
+    from PIL import Image
+
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+    size = int((query.get("s") or ["460"])[0])
+    return Image.open(io.BytesIO(_avatar_bytes(size))).convert("RGBA")
+
+
+def profile_size(meter: PhaseMeter, contributors: int, formats: List[str], max_contributors: Dict[str, int], workdir: Path):
+    out = workdir / str(contributors)
+    out.mkdir(parents=True, exist_ok=True)
+    readme = out / "README.md"
+    readme.write_text("# Synthetic\n", encoding="utf-8")
+    config = CollectorConfig(
+        token="synthetic",
+        targets=f"{SYNTHETIC_OWNER}/*",
+        output_dir=out,
+        readme_path=readme,
+        per_repo_delay_ms=0,
+        budget_policy="off",
+    )
+    collector = Collector(config, client=SyntheticClient(contributors))
+
+    with meter.phase("inventory", contributors):
+        repos = collector.list_repos(collector.resolve_targets())
+    with meter.phase("aggregate", contributors):
+        collector.prime(repos, {})
+        result = collector.collect(refresh=[r["full_name"] for r in repos])
+    with meter.phase("json", contributors):
+        write_if_changed(collector.output_paths()["json"], dump_contributors_json(result.to_json()))
+
+    paths = collector.output_paths()
+    outputs = {"html": paths["html"], "png": paths["png"], "md": paths["md"], "readme": readme, "svg": paths["svg"]}
+    shown = len(result.contributors)
+    for fmt in formats:
+        phase = f"render.{fmt}"
+        cap = max_contributors.get(fmt, max_contributors.get("*"))
+        if fmt in RASTER_FORMATS and min(shown, cap or shown) > RASTER_LIMIT:
+            meter.skip(phase, contributors, f"uncapped raster wall of {shown}; pass --max-contributors {fmt}=N")
+            continue
+        if fmt in RASTER_FORMATS and not HAS_PIL:
+            meter.skip(phase, contributors, "Pillow not installed")
+            continue
+        # A fresh avatar cache per format, so each one pays for its own avatars
+        with meter.phase(phase, contributors):
+            render_wall(
+                result.contributors,
+                str(outputs["html"]) if fmt == "html" else None,
+                str(outputs["png"]) if fmt == "png" else None,
+                str(outputs["md"]) if fmt == "md" else None,
+                str(outputs["readme"]) if fmt == "readme" else None,
+                formats=(fmt,),
+                svg_path=str(outputs["svg"]) if fmt == "svg" else None,
+                avatar_cache=AvatarCache(),
+                max_contributors=max_contributors,
+                full_data_path=str(paths["json"]),
+            )
+
+
+def print_report(results: List[PhaseResult]):
+    print(f"{'phase':<16}{'contributors':>13}{'seconds':>9}{'traced peak':>13}{'rss peak':>11}{'retained':>11}{'budget':>10}")
+    for r in results:
+        if r.skipped:
+            print(f"{r.phase:<16}{r.contributors:>13}  skipped: {r.skipped}")
+            continue
+        flag = "  ❌ over budget" if r.over_budget else ""
+        print(
+            f"{r.phase:<16}{r.contributors:>13}{r.seconds:>9.2f}{format_size(r.traced_peak):>13}"
+            f"{format_size(r.rss_peak):>11}{format_size(r.retained):>11}{format_size(r.budget):>10}{flag}"
+        )
+        for site, size in r.top_sites:
+            print(f"    {format_size(size):>9}  {site}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-phase memory of collect and render on synthetic orgs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Contributor counts to profile")
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS, help="Render formats to profile")
+    parser.add_argument("--max-contributors", default="", help='Wall caps as for MAX_CONTRIBUTORS, e.g. "png=1000"')
+    parser.add_argument("--budget", action="append", default=[], help="PHASE[@CONTRIBUTORS]=SIZE, e.g. render.png@10000=3GB")
+    parser.add_argument("--budget-file", help="JSON object of budget keys to sizes")
+    parser.add_argument("--top", type=int, default=TOP_SITES, help="Allocation sites listed per phase")
+    parser.add_argument("--report", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    budgets = {}
+    if args.budget_file:
+        with open(args.budget_file, "r", encoding="utf-8") as f:
+            budgets.update({k: parse_size(str(v)) for k, v in json.load(f).items()})
+    budgets.update(parse_budgets(args.budget))
+
+    render_contributors._download_avatar = _synthetic_avatar
+    meter = PhaseMeter(budgets, top=args.top)
+    with tempfile.TemporaryDirectory(prefix="memprofile-") as workdir:
+        for contributors in args.sizes:
+            print(f"🧪 Profiling {contributors} contributors ...", flush=True)
+            profile_size(meter, contributors, args.formats, parse_max_contributors(args.max_contributors), Path(workdir))
+
+    print_report(meter.results)
+    if args.report:
+        Path(args.report).write_text(
+            json.dumps([dict(asdict(r), peak=r.peak, over_budget=r.over_budget) for r in meter.results], indent=2),
+            encoding="utf-8",
+        )
+    over = [r for r in meter.results if r.over_budget]
+    if over:
+        for r in over:
+            print(f"❌ {r.phase} at {r.contributors} contributors: peak {format_size(r.peak)} > budget {format_size(r.budget)}")
+        sys.exit(1)
+    print("✅ All phases within budget" if budgets else "INFO: no budgets set")
+
+
+if __name__ == "__main__":
+    main()
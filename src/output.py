@@ -0,0 +1,60 @@
+"""Atomic, write-if-changed helpers for generated artifacts."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+_CHUNK_SIZE = 1 << 16
+
+
+def digest_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: str | Path) -> Optional[str]:
+    """Return the sha256 of a file on disk, or None if it can't be read."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def write_if_changed(path: str | Path, data: bytes | str) -> bool:
+    """Write data to path only when it differs from what is already there.
+
+    The new content goes to a temp file in the same directory and is renamed
+    over the target, so readers never see a half-written artifact.
+    Returns True if the file was written.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path = Path(path)
+
+    if path.exists() and file_digest(path) == digest_bytes(data):
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep generated files readable like a normal write
+        os.chmod(tmp_path, (path.stat().st_mode & 0o777) if path.exists() else 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return True
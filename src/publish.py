@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Static bundle of the contributor walls for GitHub Pages or any static host.
+
+build_bundle() turns the output directory into a publish directory:
+
+- index.html is contributors.html, minified, loading content-hashed assets
+- every asset is copied under its usual name (stable links from READMEs
+  keep working) and as contributors.<hash>.<ext>, which never changes
+  content and can be cached forever by browsers and CDNs
+- html / json / svg files get precompressed .gz (and .br with the optional
+  brotli package) siblings for hosts that serve them (nginx gzip_static,
+  CDNs); GitHub Pages itself compresses on the fly
+- manifest.json maps each logical file to its hashed name, size and encodings
+
+Usage:
+    python src/publish.py [OUTPUT_DIR] [PUBLIC_DIR]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import get_output_dir, get_output_paths
+from output import digest_bytes, write_if_changed
+
+# Optional: brotli siblings are skipped without it
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+MANIFEST_NAME = "manifest.json"
+INDEX_NAME = "index.html"
+HASH_LENGTH = 10
+# Output keys published next to index.html; the page links the hashed copies
+ASSET_KEYS = ("json", "png", "svg", "webp", "avif", "sprite", "sprite_map")
+COMPRESSIBLE = frozenset({".html", ".json", ".svg", ".js", ".css"})
+
+_STYLE_BLOCK = re.compile(r"(<style[^>]*>)(.*?)(</style>)", re.S | re.I)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_HTML_COMMENT = re.compile(r"<!--(?!\[).*?-->", re.S)
+
+
+def minify_html(text: str) -> str:
+    """Drop comments, indentation and blank lines
+
+    Line breaks are kept, so inline scripts never depend on automatic
+    semicolon insertion across joined lines.
+    """
+    text = _HTML_COMMENT.sub("", text)
+    text = _STYLE_BLOCK.sub(lambda m: m.group(1) + _CSS_COMMENT.sub("", m.group(2)) + m.group(3), text)
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line) + "\n"
+
+
+def hashed_name(name: str, data: bytes) -> str:
+    """contributors.png -> contributors.<hash>.png"""
+    stem, dot, ext = name.rpartition(".")
+    if not dot:
+        return f"{name}.{digest_bytes(data)[:HASH_LENGTH]}"
+    return f"{stem}.{digest_bytes(data)[:HASH_LENGTH]}.{ext}"
+
+
+def _compressed(data: bytes) -> Dict[str, bytes]:
+    """Precompressed variants that are actually smaller, by encoding"""
+    variants = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if HAS_BROTLI:
+        variants["br"] = brotli.compress(data, quality=11)
+    return {enc: blob for enc, blob in variants.items() if len(blob) < len(data)}
+
+
+class _Bundle:
+    def __init__(self, public_dir: Path):
+        self.public_dir = public_dir
+        self.files: Dict[str, Dict] = {}
+        self.written = []
+
+    def add(self, rel: str, data: bytes, hashed: Optional[str] = None) -> Dict:
+        """Write rel (and its hashed copy / compressed siblings); returns its manifest entry"""
+        entry = {"bytes": len(data), "sha256": digest_bytes(data)}
+        targets = [rel]
+        if hashed:
+            entry["hashed"] = hashed
+            targets.append(hashed)
+        encodings = _compressed(data) if Path(rel).suffix in COMPRESSIBLE else {}
+        if encodings:
+            entry["encodings"] = {enc: len(blob) for enc, blob in encodings.items()}
+        for target in targets:
+            self._write(target, data)
+            for enc, blob in encodings.items():
+                self._write(f"{target}.{'gz' if enc == 'gzip' else 'br'}", blob)
+        self.files[rel] = entry
+        return entry
+
+    def _write(self, rel: str, data: bytes):
+        if write_if_changed(self.public_dir / rel, data):
+            self.written.append(rel)
+
+    def generated(self) -> set:
+        """Every file name the bundle produced, including hashed copies and siblings"""
+        names = set()
+        for rel, entry in self.files.items():
+            for name in filter(None, (rel, entry.get("hashed"))):
+                names.add(name)
+                names.update(f"{name}.{'gz' if enc == 'gzip' else 'br'}" for enc in entry.get("encodings", {}))
+        return names
+
+
+def _previous_files(public_dir: Path) -> set:
+    try:
+        with open(public_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    return set(previous.get("generated", []))
+
+
+def build_bundle(output_dir: str | Path, public_dir: str | Path) -> Dict:
+    """Build the publish directory from rendered outputs and return the manifest"""
+    paths = get_output_paths(Path(output_dir))
+    public_dir = Path(public_dir)
+    public_dir.mkdir(parents=True, exist_ok=True)
+    previous = _previous_files(public_dir)
+    bundle = _Bundle(public_dir)
+
+    # Assets first: index.html is rewritten to their hashed names
+    renames = {}
+    for key in ASSET_KEYS:
+        path = paths[key]
+        if not path.is_file():
+            continue
+        data = path.read_bytes()
+        entry = bundle.add(path.name, data, hashed_name(path.name, data))
+        renames[path.name] = entry["hashed"]
+
+    # Virtual-mode pages are fetched by fixed names from index.json; copy as-is
+    data_dir = paths["data"]
+    if data_dir.is_dir():
+        for page in sorted(data_dir.rglob("*")):
+            if page.is_file() and not page.name.startswith("."):
+                bundle.add(page.relative_to(data_dir.parent).as_posix(), page.read_bytes())
+
+    if paths["html"].is_file():
+        page = minify_html(paths["html"].read_text(encoding="utf-8"))
+        # Only loads (src= / url()) switch to hashed files; the copy-link
+        # button and "+K more" links keep the stable names
+        for name, hashed in renames.items():
+            page = re.sub(rf"(src=['\"]|url\(['\"]?)\./{re.escape(name)}", rf"\g<1>./{hashed}", page)
+        bundle.add(INDEX_NAME, page.encode("utf-8"))
+
+    manifest = {
+        "files": bundle.files,
+        "generated": sorted(bundle.generated() | {MANIFEST_NAME}),
+    }
+    # Hashed copies from earlier builds that nothing references any more
+    for stale in sorted(previous - set(manifest["generated"])):
+        stale_path = public_dir / stale
+        if stale_path.is_file():
+            stale_path.unlink()
+            print(f"INFO: removed stale {stale}")
+
+    write_if_changed(public_dir / MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+    total = sum(entry["bytes"] for entry in bundle.files.values())
+    print(
+        f"📦 Bundled {len(bundle.files)} files ({total} bytes) into {public_dir}"
+        f" ({len(bundle.written)} written, brotli={'on' if HAS_BROTLI else 'off'})"
+    )
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a precompressed, content-hashed static bundle of the walls")
+    parser.add_argument("output_dir", nargs="?", help="Rendered outputs (default: OUTPUT_DIR)")
+    parser.add_argument("public_dir", nargs="?", default="public", help="Publish directory (default: public)")
+    args = parser.parse_args()
+    build_bundle(args.output_dir or get_output_dir(), args.public_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,123 @@
+from __future__ import annotations
+
+import os
+import re
 import html
+import heapq
+import base64
+import hashlib
+import urllib.parse
 import urllib.request
 import io
 import ssl
-import re
-from typing import List, Dict
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Callable, Iterable, List, Dict, Mapping, Optional, Tuple
 from pathlib import Path
 
+import tracing
+from output import write_if_changed
+
 FALLBACK_AVATAR = "https://github.githubassets.com/images/modules/logos_page/GitHub-Mark.png"
+GRAVATAR_URL = "https://www.gravatar.com/avatar/"
+GITHUB_AVATAR_URL = "https://avatars.githubusercontent.com/u/"
+# Commit emails GitHub generates for users who hide theirs: <id>+<login>@users.noreply.github.com
+NOREPLY_EMAIL = re.compile(r"^(\d+)\+[^@]+@users\.noreply\.github\.com$", re.IGNORECASE)
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 README_START_MARKER = "<!-- thanks-contributors-flag-start -->"
 README_END_MARKER = "<!-- thanks-contributors-flag-end -->"
 
+# Output formats render_wall() can emit; svg is opt-in
+FORMATS = ("html", "png", "md", "readme", "svg")
+DEFAULT_FORMATS = ("html", "png", "md", "readme")
+PNG_AVATAR_SIZE = 80
+PNG_PADDING = 16
+PNG_GAP = 10
+SVG_CLIP_ID = "avatar-clip"
+MD_COLUMNS = 10
+README_COLUMNS = 8
+
+# Avatars are requested at the pixel size each output needs (?s=N): raster
+# tiles at their supersampled size, linked <img> avatars at display size x2
+AVATAR_SUPERSAMPLE = 3
+HIDPI_SCALE = 2
+TABLE_AVATAR_SIZE = 50
+HTML_AVATAR_SIZE = 72
+# max_contributors key that caps every format without its own entry
+ALL_FORMATS = "*"
+
+# HTML render modes: "inline" hotlinks every avatar, "sprite" uses one sprite sheet,
+# "virtual" lazy-loads paged JSON data and only keeps visible rows in the DOM
+HTML_MODES = ("inline", "sprite", "virtual")
+SPRITE_TILE_SIZE = PNG_AVATAR_SIZE  # same size so PNG wall and sprite share tiles
+SPRITE_COLUMNS = 32
+SPRITE_DISPLAY_SIZE = HTML_AVATAR_SIZE
+VIRTUAL_PAGE_SIZE = 200
+VIRTUAL_ROW_HEIGHT = 170
+
+# Optional sibling formats for the PNG wall, written next to it (contributors.webp, ...)
+IMAGE_VARIANTS = ("webp", "avif")
+# Steps tried, in order, when an image exceeds ImageOptions.max_bytes
+BUDGET_SCALES = (1.0, 0.8, 0.6, 0.5)
+BUDGET_COLORS = (256, 128, 64, 32)
+BUDGET_QUALITIES = (85, 75, 65, 50, 35)
+
+# Compositing engines for the PNG wall. numpy is opt-in: its tiles are not
+# byte-identical to PIL's, so the installed packages must not pick the
+# committed PNG. "auto" uses numpy when it's installed, PIL otherwise.
+PNG_ENGINES = ("auto", "pil", "numpy")
+
 # Try to import PIL, but make it optional
 try:
-    from PIL import Image, ImageDraw
+    from PIL import Image, ImageDraw, ImageFont, features
     HAS_PIL = True
 except ImportError:
     HAS_PIL = False
 
+# numpy is optional too: it only speeds up PNG wall compositing
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+@dataclass(frozen=True)
+class ImageOptions:
+    """Encoding settings for raster outputs (PNG wall, sprite sheet, variants)"""
+
+    quantize: bool = False       # palette PNG with alpha instead of 32-bit RGBA
+    optimize: bool = False       # slower, smaller zlib encoding
+    variants: Tuple[str, ...] = ()
+    max_bytes: int = 0           # 0 disables the byte budget
+    engine: str = "pil"          # PNG wall compositing, see PNG_ENGINES
+
+
+def sized_avatar_url(url: str, px: int) -> str:
+    """url asking GitHub / Gravatar for a px x px image; other hosts are left alone"""
+    parts = urllib.parse.urlsplit(url)
+    host = parts.hostname or ""
+    if host != "avatars.githubusercontent.com" and not host.endswith("gravatar.com"):
+        return url
+    query = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True) if k not in ("s", "size")]
+    query.append(("s", str(px)))
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query)))
+
+
+def _anonymous_avatar(email: Optional[str]) -> str:
+    """Avatar for a contributor without a GitHub account (API entries with anon=1)"""
+    if not email:
+        return FALLBACK_AVATAR
+    email = email.strip().lower()
+    noreply = NOREPLY_EMAIL.match(email)
+    if noreply:
+        return f"{GITHUB_AVATAR_URL}{noreply.group(1)}?v=4"
+    # Gravatar serves a generated identicon when the address has no image
+    return f"{GRAVATAR_URL}{hashlib.md5(email.encode('utf-8')).hexdigest()}?d=identicon"
+
 
 def _normalize(contributors: List[Dict]) -> List[Dict]:
     normalized = []
@@ -26,7 +126,7 @@ def _normalize(contributors: List[Dict]) -> List[Dict]:
             {
                 "name": c.get("name") or "Unknown",
                 "email": c.get("email"),
-                "avatar_url": c.get("avatar_url") or FALLBACK_AVATAR,
+                "avatar_url": c.get("avatar_url") or _anonymous_avatar(c.get("email")),
                 "html_url": c.get("html_url") or "#",
                 "contributions": int(c.get("contributions") or 0),
             }
@@ -36,69 +136,483 @@ def _normalize(contributors: List[Dict]) -> List[Dict]:
 
 def _download_avatar(url: str) -> Image.Image:
     """Download avatar image from URL and return as PIL Image"""
-    try:
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        with urllib.request.urlopen(url, context=ssl_context, timeout=5) as response:
-            image_data = response.read()
-        
-        img = Image.open(io.BytesIO(image_data))
-        return img.convert("RGBA")
-    except Exception as e:
-        # Return a placeholder image if download fails
-        img = Image.new("RGBA", (80, 80), (200, 200, 200, 255))
-        return img
+    with tracing.span("avatar.download", "avatar") as sp:
+        try:
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
 
+            with urllib.request.urlopen(url, context=ssl_context, timeout=5) as response:
+                image_data = response.read()
+            sp.set(url=url, status=response.status, bytes=len(image_data))
 
-def _make_circular(img: Image.Image, size: int) -> Image.Image:
-    """Convert image to circular avatar with 3x anti-aliasing"""
-    # Render at 3x resolution for smoother edges
-    hi_size = size * 3
-    img = img.resize((hi_size, hi_size), Image.Resampling.LANCZOS)
-    
-    # Create circular mask at high resolution
+            img = Image.open(io.BytesIO(image_data))
+            return img.convert("RGBA")
+        except Exception as e:
+            # Return a placeholder image if download fails
+            sp.set(url=url, error=str(e))
+            img = Image.new("RGBA", (80, 80), (200, 200, 200, 255))
+            return img
+
+
+@lru_cache(maxsize=None)
+def _circle_mask(hi_size: int) -> Image.Image:
+    """Circular mask at supersampled resolution, built once per size"""
     mask = Image.new("L", (hi_size, hi_size), 0)
     mask_draw = ImageDraw.Draw(mask)
     mask_draw.ellipse([(0, 0), (hi_size, hi_size)], fill=255)
-    
-    # Create output with alpha channel at high resolution
-    output = Image.new("RGBA", (hi_size, hi_size), (0, 0, 0, 0))
-    output.paste(img.convert("RGBA"), (0, 0), mask)
-    
-    # Downsample to final size for smooth anti-aliased result
-    output = output.resize((size, size), Image.Resampling.LANCZOS)
-    return output
+    return mask
 
 
-def render_wall(contributors: List[Dict], html_path: str, png_path: str, md_path: str = None, readme_path: str = None):
-    data = _normalize(contributors)
-    data.sort(key=lambda x: x.get("contributions", 0), reverse=True)
+def _make_circular(img: Image.Image, size: int) -> Image.Image:
+    """Convert image to circular avatar with 3x anti-aliasing"""
+    with tracing.span("avatar.circular", "avatar", size=size):
+        # Render at 3x resolution for smoother edges
+        hi_size = size * AVATAR_SUPERSAMPLE
+        img = img.resize((hi_size, hi_size), Image.Resampling.LANCZOS)
 
-    _render_html(data, html_path)
-    if HAS_PIL:
-        _render_png(data, png_path)
-    if md_path:
-        _render_markdown(data, md_path)
-    if readme_path:
-        _update_readme(data, readme_path)
+        # Circular mask at high resolution (shared, never mutated)
+        mask = _circle_mask(hi_size)
 
+        # Create output with alpha channel at high resolution
+        output = Image.new("RGBA", (hi_size, hi_size), (0, 0, 0, 0))
+        output.paste(img.convert("RGBA"), (0, 0), mask)
 
-def _render_png(contributors: List[Dict], out_path: str):
-    """Render contributors as PNG image grid using PIL with circular avatars and centered layout"""
+        # Downsample to final size for smooth anti-aliased result
+        output = output.resize((size, size), Image.Resampling.LANCZOS)
+        return output
+
+
+@lru_cache(maxsize=None)
+def _placeholder_avatar(size: int) -> Image.Image:
+    """Neutral circle used when an avatar can't be downloaded or processed
+
+    Cached per size; callers only paste it, so every failure shares one image.
+    """
+    placeholder = Image.new("RGBA", (size, size), color=(0, 0, 0, 0))
+    placeholder_draw = ImageDraw.Draw(placeholder)
+    placeholder_draw.ellipse([(0, 0), (size, size)], fill=(48, 54, 61, 255))
+    return placeholder
+
+
+class AvatarCache:
+    """Thread-safe avatar store that can be shared by every wall of a run
+
+    Each avatar URL is downloaded once and each (url, size) circular tile is
+    built once, however many walls (global, per-repo, per-org) show it.
+    Tiles and squares of one size share a download requested at the
+    supersampled size, rather than whatever full size the URL serves.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, Image.Image] = {}
+        # (url, size) -> circular tile, ("square", url, size) -> resized source
+        self._tiles: Dict[tuple, Optional[Image.Image]] = {}
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def source(self, url: str, px: Optional[int] = None) -> Image.Image:
+        """Downloaded avatar, requested at px x px when given (placeholder on failure)"""
+        if px:
+            url = sized_avatar_url(url, px)
+        if url not in self._sources:
+            # Concurrent walls asking for the same URL wait for one download
+            with self._key_lock(("source", url)):
+                if url not in self._sources:
+                    self._sources[url] = _download_avatar(url)
+        return self._sources[url]
+
+    def square(self, url: str, size: int) -> Optional[Image.Image]:
+        """Source resized to size x size RGBA (None if it can't be decoded)"""
+        key = ("square", url, size)
+        if key not in self._tiles:
+            with self._key_lock(key):
+                if key not in self._tiles:
+                    try:
+                        source = self.source(url, size * AVATAR_SUPERSAMPLE)
+                        self._tiles[key] = source.convert("RGBA").resize((size, size), Image.Resampling.LANCZOS)
+                    except Exception:
+                        self._tiles[key] = None
+        return self._tiles[key]
+
+    def tile(self, url: str, size: int) -> Image.Image:
+        """Circular tile of the given size"""
+        key = (url, size)
+        if key not in self._tiles:
+            with self._key_lock(("tile", url, size)):
+                if key not in self._tiles:
+                    try:
+                        self._tiles[key] = _make_circular(self.source(url, size * AVATAR_SUPERSAMPLE), size)
+                    except Exception:
+                        self._tiles[key] = _placeholder_avatar(size)
+        return self._tiles[key]
+
+
+@lru_cache(maxsize=None)
+def _load_template(name: str) -> str:
+    """Read a template from TEMPLATE_DIR once per process"""
+    with open(TEMPLATE_DIR / name, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _table_cell(c: Dict) -> str:
+    """Clickable avatar + name cell shared by the Markdown and README tables"""
+    name = c.get("name") or "Unknown"
+    avatar = sized_avatar_url(c.get("avatar_url") or FALLBACK_AVATAR, TABLE_AVATAR_SIZE * HIDPI_SCALE)
+    link = c.get("html_url") or "#"
+    return f'''<td align="center">
+        <a href="{link}">
+            <img src="{avatar}" width="{TABLE_AVATAR_SIZE};" alt="{name}"/>
+            <br />
+            <sub><b>{name}</b></sub>
+        </a>
+    </td>'''
+
+
+def _more_cell(overflow: int, href: Optional[str]) -> str:
+    """Trailing "+K more" cell for a capped Markdown / README table"""
+    label = f"<sub><b>+{overflow} more</b></sub>"
+    if href:
+        label = f'<a href="{href}">{label}</a>'
+    return f'<td align="center">{label}</td>'
+
+
+def _more_href(target: Optional[str], out_path: str | Path) -> Optional[str]:
+    """Link from out_path to the complete listing, relative so it works in READMEs and Pages"""
+    if not target:
+        return None
+    rel = os.path.relpath(Path(target).resolve(), Path(out_path).resolve().parent)
+    return Path(rel).as_posix()
+
+
+def _top_contributors(data: List[Dict], limit: Optional[int]) -> List[Dict]:
+    """The limit largest by contributions, in wall order; heap selection, no full sort"""
+    key = lambda x: x.get("contributions", 0)
+    if limit is None or limit >= len(data):
+        return sorted(data, key=key, reverse=True)
+    # nlargest is stable like sorted(), so ties keep the same order as an uncapped wall
+    return heapq.nlargest(limit, data, key=key)
+
+
+def _format_limit(max_contributors: Optional[Mapping[str, int]], fmt: str) -> Optional[int]:
+    if not max_contributors:
+        return None
+    limit = max_contributors.get(fmt, max_contributors.get(ALL_FORMATS))
+    return limit if limit and limit > 0 else None
+
+
+def _build_table(cells: List[str], cols_per_row: int) -> str:
+    rows = []
+    for i in range(0, len(cells), cols_per_row):
+        row_cells = cells[i:i + cols_per_row]
+        # Fill empty cells if needed
+        row_cells = row_cells + ['<td></td>'] * (cols_per_row - len(row_cells))
+        rows.append('<tr>\n    ' + '\n    '.join(row_cells) + '\n</tr>')
+    return '<table>\n' + '\n'.join(rows) + '\n</table>'
+
+
+class _RenderContext:
+    """State shared by every output format of one render_wall() call
+
+    Table cells are built once up front and avatars come from an AvatarCache,
+    so formats can render concurrently from the same data.
+    """
+
+    def __init__(
+        self,
+        contributors: List[Dict],
+        html_mode: str = "inline",
+        sprite_path: str = None,
+        sprite_map_path: str = None,
+        data_dir: str = None,
+        image_options: Optional[ImageOptions] = None,
+        avatar_cache: Optional[AvatarCache] = None,
+        overflow: int = 0,
+        listing: Optional[str] = None,
+        data_listing: Optional[str] = None,
+    ):
+        self.contributors = contributors
+        # Contributors left off a capped wall, and where the full set lives:
+        # listing (the HTML wall) for image/table formats, data_listing (JSON) for HTML
+        self.overflow = overflow
+        self.listing = listing
+        self.data_listing = data_listing
+        self.html_mode = html_mode
+        self.sprite_path = sprite_path
+        self.sprite_map_path = sprite_map_path
+        self.data_dir = data_dir
+        self.image_options = image_options or ImageOptions()
+        self.cells = [_table_cell(c) for c in contributors]
+        self.written: List[str] = []
+        self.avatar_cache = avatar_cache if avatar_cache is not None else AvatarCache()
+        self._written_lock = threading.Lock()
+
+    def write(self, path: str | Path, data: bytes | str) -> bool:
+        """Write an artifact if its content changed and remember that it did"""
+        changed = write_if_changed(path, data)
+        if changed:
+            self.record(path)
+        return changed
+
+    def record(self, path: str | Path):
+        """Note a changed artifact (formats render concurrently)"""
+        with self._written_lock:
+            self.written.append(str(path))
+
+    def avatar_sources(self, size: int) -> List[Image.Image]:
+        """Downloaded avatars for every contributor, in order, fetched for size x size tiles"""
+        px = size * AVATAR_SUPERSAMPLE
+        return [self.avatar_cache.source(c.get("avatar_url") or FALLBACK_AVATAR, px) for c in self.contributors]
+
+    def avatars(self, size: int) -> List[Image.Image]:
+        """Circular avatar tiles for every contributor, in order"""
+        return [self.avatar_cache.tile(c.get("avatar_url") or FALLBACK_AVATAR, size) for c in self.contributors]
+
+    def squares(self, size: int) -> List[Optional[Image.Image]]:
+        """Square (uncropped) avatars for every contributor, in order"""
+        return [self.avatar_cache.square(c.get("avatar_url") or FALLBACK_AVATAR, size) for c in self.contributors]
+
+
+# format name -> renderer(ctx, out_path); register new formats with @_renderer
+_RENDERERS: Dict[str, Callable[[_RenderContext, str], None]] = {}
+
+
+def _renderer(fmt: str):
+    def register(fn):
+        _RENDERERS[fmt] = fn
+        return fn
+    return register
+
+
+def _traced_render(fmt: str, ctx: "_RenderContext", path: str):
+    with tracing.span(f"render.{fmt}", "render", path=path, contributors=len(ctx.contributors)):
+        return _RENDERERS[fmt](ctx, path)
+
+
+def render_wall(
+    contributors: List[Dict],
+    html_path: str,
+    png_path: str,
+    md_path: str = None,
+    readme_path: str = None,
+    html_mode: str = "inline",
+    sprite_path: str = None,
+    sprite_map_path: str = None,
+    data_dir: str = None,
+    formats: Optional[Iterable[str]] = None,
+    image_options: Optional[ImageOptions] = None,
+    svg_path: str = None,
+    avatar_cache: Optional[AvatarCache] = None,
+    max_contributors: Optional[Mapping[str, int]] = None,
+    full_data_path: str = None,
+) -> List[str]:
+    """Render the requested formats and return the paths whose content changed
+
+    max_contributors caps formats by name ("*" for all others) to the top N
+    by contributions; capped walls end with a "+K more" tile linking to the
+    uncapped HTML wall, or to full_data_path (the JSON) when there is none.
+    """
+    data = _normalize(contributors)
+
+    if html_mode not in HTML_MODES:
+        print(f"WARNING: unknown html_mode '{html_mode}', falling back to inline")
+        html_mode = "inline"
+    if html_mode == "sprite" and not (HAS_PIL and sprite_path and sprite_map_path):
+        print("WARNING: sprite mode needs Pillow and sprite output paths; falling back to inline")
+        html_mode = "inline"
+    if html_mode == "virtual" and not data_dir:
+        print("WARNING: virtual mode needs a data directory; falling back to inline")
+        html_mode = "inline"
+
+    requested = set(formats) if formats else set(DEFAULT_FORMATS)
+    unknown = requested - set(_RENDERERS)
+    if unknown:
+        print(f"WARNING: unknown formats skipped: {', '.join(sorted(unknown))}")
     if not HAS_PIL:
-        return
-    
-    if not contributors:
-        img = Image.new("RGBA", (400, 80), color=(0, 0, 0, 0))
-        img.save(out_path, "PNG")
-        return
-    
-    num_contributors = len(contributors)
-    avatar_size = 80
-    padding = 16
-    gap = 10  # Gap between avatars
+        requested.discard("png")
+        requested.discard("svg")
+
+    outputs = {"html": html_path, "png": png_path, "md": md_path, "readme": readme_path, "svg": svg_path}
+    jobs = {fmt: path for fmt, path in outputs.items() if path and fmt in requested}
+    if not jobs:
+        return []
+
+    avatar_cache = avatar_cache if avatar_cache is not None else AvatarCache()
+    limits = {fmt: _format_limit(max_contributors, fmt) for fmt in jobs}
+    full_html = html_path if "html" in jobs and limits["html"] is None else None
+    listing = full_html or full_data_path
+
+    # One context per distinct cap: formats sharing a cap share cells and
+    # avatars, and a capped wall never downloads the avatars it leaves out
+    contexts: Dict[Optional[int], _RenderContext] = {}
+    for limit in set(limits.values()):
+        shown = _top_contributors(data, limit)
+        contexts[limit] = _RenderContext(
+            shown, html_mode, sprite_path, sprite_map_path, data_dir, image_options, avatar_cache,
+            overflow=len(data) - len(shown), listing=listing, data_listing=full_data_path,
+        )
+
+    # PNG is bound by avatar downloads and compositing; the text formats only
+    # do file I/O, so they finish alongside it instead of queueing behind it
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {pool.submit(_traced_render, fmt, contexts[limits[fmt]], path): fmt for fmt, path in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Warning: failed to render {futures[future]}: {e}")
+
+    return [path for ctx in contexts.values() for path in ctx.written]
+
+
+def _encode_png(img: Image.Image, options: Optional[ImageOptions] = None, colors: int = 256) -> bytes:
+    """Encode with pinned settings and no metadata chunks so identical walls
+    produce identical bytes and don't show up as changes"""
+    options = options or ImageOptions()
+    if options.quantize:
+        # Fast octree keeps the alpha channel in the palette
+        img = img.quantize(colors=colors, method=Image.Quantize.FASTOCTREE)
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=9 if options.optimize else 6, optimize=options.optimize)
+    return buf.getvalue()
+
+
+def _scaled(img: Image.Image, scale: float) -> Image.Image:
+    if scale == 1.0:
+        return img
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+
+def _encode_png_budget(img: Image.Image, options: ImageOptions) -> bytes:
+    """Encode the PNG wall, shrinking palette then tile size until it fits max_bytes"""
+    data = _encode_png(img, options)
+    if not options.max_bytes or len(data) <= options.max_bytes:
+        return data
+
+    forced = replace(options, quantize=True)
+    for scale in BUDGET_SCALES:
+        scaled = _scaled(img, scale)
+        for colors in BUDGET_COLORS:
+            data = _encode_png(scaled, forced, colors)
+            if len(data) <= options.max_bytes:
+                print(f"INFO: PNG fit byte budget at scale={scale} colors={colors} ({len(data)} bytes)")
+                return data
+    print(f"WARNING: PNG still {len(data)} bytes, over budget of {options.max_bytes}; using smallest encoding")
+    return data
+
+
+def _variant_supported(fmt: str) -> bool:
+    try:
+        return bool(features.check(fmt))
+    except Exception:
+        return False
+
+
+def _encode_variant(img: Image.Image, fmt: str, options: ImageOptions) -> bytes:
+    """Encode a lossy WebP/AVIF sibling, lowering quality then tile size to fit max_bytes"""
+    extra = {"method": 6} if fmt == "webp" else {}
+    data = b""
+    for scale in BUDGET_SCALES:
+        scaled = _scaled(img, scale)
+        for quality in BUDGET_QUALITIES:
+            buf = io.BytesIO()
+            scaled.save(buf, fmt.upper(), quality=quality, **extra)
+            data = buf.getvalue()
+            if not options.max_bytes or len(data) <= options.max_bytes:
+                return data
+    print(f"WARNING: {fmt} still {len(data)} bytes, over budget of {options.max_bytes}; using smallest encoding")
+    return data
+
+
+def _write_image_outputs(ctx: _RenderContext, img: Image.Image, out_path: str):
+    """Write the PNG wall and any configured WebP/AVIF siblings"""
+    options = ctx.image_options
+    ctx.write(out_path, _encode_png_budget(img, options))
+    for fmt in options.variants:
+        if fmt not in IMAGE_VARIANTS:
+            print(f"WARNING: unknown image variant '{fmt}', skipping")
+            continue
+        if not _variant_supported(fmt):
+            print(f"WARNING: Pillow was built without {fmt} support, skipping")
+            continue
+        ctx.write(Path(out_path).with_suffix(f".{fmt}"), _encode_variant(img, fmt, options))
+
+
+def _render_sprite(ctx: _RenderContext, avatars: List[Image.Image], sprite_path: str, map_path: str) -> Dict:
+    """Pack avatar tiles into one sprite sheet and write its coordinate map"""
+    tile = SPRITE_TILE_SIZE
+    columns = max(1, min(SPRITE_COLUMNS, len(avatars)))
+    rows = max(1, (len(avatars) + columns - 1) // columns)
+
+    sheet = Image.new("RGBA", (columns * tile, rows * tile), color=(0, 0, 0, 0))
+    sprites = []
+    for idx, (c, avatar) in enumerate(zip(ctx.contributors, avatars)):
+        col = idx % columns
+        row = idx // columns
+        sheet.paste(avatar, (col * tile, row * tile))
+        sprites.append({"name": c.get("name"), "col": col, "row": row})
+    # Sprite offsets must stay exact, so the byte budget only applies to the wall
+    ctx.write(sprite_path, _encode_png(sheet, ctx.image_options))
+
+    sprite_map = {
+        "image": Path(sprite_path).name,
+        "tile": tile,
+        "columns": columns,
+        "rows": rows,
+        "sprites": sprites,
+    }
+    ctx.write(map_path, json.dumps(sprite_map, ensure_ascii=False, indent=2))
+    return sprite_map
+
+
+def _render_virtual_data(ctx: _RenderContext, data_dir: str, out_path: str) -> str:
+    """Write contributors as compact paged JSON for the virtualized HTML wall
+
+    index.json carries the "+K more" count of a capped wall. Returns the data
+    directory's URL relative to the HTML page at out_path.
+    """
+    contributors = ctx.contributors
+    out_dir = Path(data_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    page_names = []
+    for start in range(0, len(contributors), VIRTUAL_PAGE_SIZE):
+        page_name = f"page-{len(page_names):04d}.json"
+        rows = [
+            [c.get("name"), c.get("email"), sized_avatar_url(c.get("avatar_url"), HTML_AVATAR_SIZE * HIDPI_SCALE), c.get("html_url")]
+            for c in contributors[start:start + VIRTUAL_PAGE_SIZE]
+        ]
+        ctx.write(out_dir / page_name, json.dumps(rows, ensure_ascii=False, separators=(",", ":")))
+        page_names.append(page_name)
+
+    # Drop pages left over from a previous, larger run
+    for stale in out_dir.glob("page-*.json"):
+        if stale.name not in page_names:
+            stale.unlink()
+            ctx.record(stale)
+
+    index = {
+        "count": len(contributors),
+        "page_size": VIRTUAL_PAGE_SIZE,
+        "fields": ["name", "email", "avatar_url", "html_url"],
+        "pages": page_names,
+        "overflow": ctx.overflow,
+    }
+    ctx.write(out_dir / "index.json", json.dumps(index, ensure_ascii=False, separators=(",", ":")))
+
+    return _more_href(str(out_dir), out_path) + "/"
+
+
+def _wall_layout(num_contributors: int) -> Tuple[int, int, int, int]:
+    """Grid (columns, rows, width, height) shared by the PNG and SVG walls"""
+    avatar_size = PNG_AVATAR_SIZE
+    padding = PNG_PADDING
+    gap = PNG_GAP
 
     # Choose layout targeting a 2:1 aspect ratio (w:h)
     best = None
@@ -114,155 +628,290 @@ def _render_png(contributors: List[Dict], out_path: str):
         best = candidate
 
     _, _, columns, rows, width, height = best
+    return columns, rows, width, height
+
+
+@_renderer("png")
+def _render_png(ctx: _RenderContext, out_path: str):
+    """Render contributors as PNG image grid using PIL with circular avatars and centered layout"""
+    if not HAS_PIL:
+        return
+    
+    contributors = ctx.contributors
+    if not contributors:
+        img = Image.new("RGBA", (400, 80), color=(0, 0, 0, 0))
+        _write_image_outputs(ctx, img, out_path)
+        return
     
+    avatar_size = PNG_AVATAR_SIZE
+    padding = PNG_PADDING
+    gap = PNG_GAP  # Gap between avatars
+    tiles = len(contributors) + (1 if ctx.overflow else 0)
+    columns, rows, width, height = _wall_layout(tiles)
+    
+    if _use_numpy(ctx.image_options):
+        img = _composite_numpy(ctx.squares(avatar_size), columns, rows, width, height)
+        if ctx.overflow:
+            _draw_more_tile(img, len(contributors), columns, ctx.overflow)
+        _write_image_outputs(ctx, img, out_path)
+        return
+
     # Create transparent background image
     img = Image.new("RGBA", (width, height), color=(0, 0, 0, 0))
-    
-    for idx, c in enumerate(contributors):
+
+    # Download and convert to circular with 3x anti-aliasing (returns avatar_size)
+    for idx, avatar in enumerate(ctx.avatars(avatar_size)):
         col = idx % columns
         row = idx // columns
         x = padding + col * (avatar_size + gap)
         y = padding + row * (avatar_size + gap)
-        
-        avatar_url = c.get("avatar_url") or FALLBACK_AVATAR
+        # Paste onto main image with alpha channel
+        img.paste(avatar, (x, y), avatar)
+
+    if ctx.overflow:
+        _draw_more_tile(img, len(contributors), columns, ctx.overflow)
+    _write_image_outputs(ctx, img, out_path)
+
+
+def _draw_more_tile(img: Image.Image, idx: int, columns: int, overflow: int):
+    """Draw the "+K" summary circle into grid slot idx of a capped wall"""
+    size = PNG_AVATAR_SIZE
+    hi = size * AVATAR_SUPERSAMPLE
+    tile = Image.new("RGBA", (hi, hi), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(tile)
+    draw.ellipse((0, 0, hi - 1, hi - 1), fill=(48, 54, 61, 255))
+    label = f"+{overflow}"
+    try:
+        font = ImageFont.load_default(size=hi // (2 + len(label) // 2))
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        font = ImageFont.load_default()
+    draw.text((hi // 2, hi // 2), label, fill=(201, 209, 217, 255), font=font, anchor="mm")
+    tile = tile.resize((size, size), Image.Resampling.LANCZOS)
+    x = PNG_PADDING + (idx % columns) * (size + PNG_GAP)
+    y = PNG_PADDING + (idx // columns) * (size + PNG_GAP)
+    img.alpha_composite(tile, (x, y))
+
+
+def _use_numpy(options: ImageOptions) -> bool:
+    if options.engine == "numpy" and not HAS_NUMPY:
+        print("WARNING: png engine 'numpy' requested but numpy is not installed; using PIL")
+    return HAS_NUMPY and options.engine in ("auto", "numpy")
+
+
+@lru_cache(maxsize=None)
+def _alpha_mask(size: int) -> "np.ndarray":
+    """Anti-aliased circular alpha (0..1) for size x size tiles, supersampled once"""
+    mask = _circle_mask(size * AVATAR_SUPERSAMPLE).resize((size, size), Image.Resampling.LANCZOS)
+    return np.asarray(mask, dtype=np.float32) / 255.0
+
+
+def _composite_numpy(squares: List[Optional[Image.Image]], columns: int, rows: int, width: int, height: int) -> Image.Image:
+    """Composite the PNG wall with a few array operations instead of per-tile pastes
+
+    Tiles are stacked into one (N, size, size, 4) array, cropped by a single
+    shared circular mask, laid out with their gaps by one reshape and copied
+    into the canvas; tiles never overlap, so no blending is needed.
+    """
+    size, gap, padding = PNG_AVATAR_SIZE, PNG_GAP, PNG_PADDING
+    with tracing.span("png.composite_numpy", "render", tiles=len(squares)):
+        placeholder = np.empty((size, size, 4), dtype=np.uint8)
+        placeholder[:] = (48, 54, 61, 255)
+
+        tiles = np.zeros((rows * columns, size, size, 4), dtype=np.uint8)
+        for idx, square in enumerate(squares):
+            tiles[idx] = placeholder if square is None else np.asarray(square, dtype=np.uint8)
+
+        # One vectorized alpha multiply for every tile; empty grid slots stay transparent
+        alpha = tiles[:, :, :, 3].astype(np.float32) * _alpha_mask(size)
+        tiles[:, :, :, 3] = np.rint(alpha).astype(np.uint8)
+
+        # (rows, columns, size, size, 4) -> rows of tiles with a gap after each one
+        cell = size + gap
+        block = np.zeros((rows, cell, columns, cell, 4), dtype=np.uint8)
+        block[:, :size, :, :size] = tiles.reshape(rows, columns, size, size, 4).transpose(0, 2, 1, 3, 4)
+
+        # The trailing gap lands in the padding (gap <= padding)
+        canvas = np.zeros((height, width, 4), dtype=np.uint8)
+        canvas[padding:padding + rows * cell, padding:padding + columns * cell] = block.reshape(rows * cell, columns * cell, 4)
+        return Image.fromarray(canvas, "RGBA")
+
+
+def _avatar_data_uri(img: Image.Image, size: int) -> str:
+    """Downscale an avatar to display size and encode it as a compact data URI"""
+    img = img.convert("RGBA").resize((size, size), Image.Resampling.LANCZOS)
+    buf = io.BytesIO()
+    if _variant_supported("webp"):
+        img.save(buf, "WEBP", quality=80, method=6)
+        mime = "image/webp"
+    else:
+        img.save(buf, "PNG", optimize=True)
+        mime = "image/png"
+    return f"data:{mime};base64,{base64.b64encode(buf.getvalue()).decode('ascii')}"
+
+
+@_renderer("svg")
+def _render_svg(ctx: _RenderContext, out_path: str):
+    """Render a self-contained SVG wall with embedded avatars and per-avatar links"""
+    contributors = ctx.contributors
+    size = PNG_AVATAR_SIZE
+    if contributors:
+        columns, _, width, height = _wall_layout(len(contributors) + (1 if ctx.overflow else 0))
+        sources = ctx.avatar_sources(size)
+    else:
+        columns, width, height, sources = 1, 400, 80, []
+
+    # One bounding-box clip path is shared by every avatar
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        f'<defs><clipPath id="{SVG_CLIP_ID}" clipPathUnits="objectBoundingBox"><circle cx="0.5" cy="0.5" r="0.5"/></clipPath></defs>',
+    ]
+    for idx, (c, source) in enumerate(zip(contributors, sources)):
+        x = PNG_PADDING + (idx % columns) * (size + PNG_GAP)
+        y = PNG_PADDING + (idx // columns) * (size + PNG_GAP)
+        name = html.escape(c.get("name") or "")
+        link = html.escape(c.get("html_url") or "#")
         try:
-            # Download and process avatar
-            avatar = _download_avatar(avatar_url)
-            # Convert to circular with 3x anti-aliasing (returns avatar_size)
-            avatar = _make_circular(avatar, avatar_size)
-            # Paste onto main image with alpha channel
-            img.paste(avatar, (x, y), avatar)
+            avatar = f'<image x="{x}" y="{y}" width="{size}" height="{size}" clip-path="url(#{SVG_CLIP_ID})" href="{_avatar_data_uri(source, size)}"/>'
         except Exception:
-            # If avatar fails, use placeholder circle
-            placeholder = Image.new("RGBA", (avatar_size, avatar_size), color=(0, 0, 0, 0))
-            placeholder_draw = ImageDraw.Draw(placeholder)
-            placeholder_draw.ellipse([(0, 0), (avatar_size, avatar_size)], fill=(48, 54, 61, 255))
-            img.paste(placeholder, (x, y), placeholder)
-    
-    img.save(out_path, "PNG")
+            r = size // 2
+            avatar = f'<circle cx="{x + r}" cy="{y + r}" r="{r}" fill="#30363d"/>'
+        parts.append(f'<a href="{link}" target="_blank"><title>{name}</title>{avatar}</a>')
+    if ctx.overflow and contributors:
+        idx = len(contributors)
+        r = size // 2
+        cx = PNG_PADDING + (idx % columns) * (size + PNG_GAP) + r
+        cy = PNG_PADDING + (idx // columns) * (size + PNG_GAP) + r
+        more = (
+            f'<title>{ctx.overflow} more contributors</title><circle cx="{cx}" cy="{cy}" r="{r}" fill="#30363d"/>'
+            f'<text x="{cx}" y="{cy}" fill="#c9d1d9" font-family="sans-serif" font-size="20" '
+            f'text-anchor="middle" dominant-baseline="central">+{ctx.overflow}</text>'
+        )
+        href = _more_href(ctx.listing, out_path)
+        parts.append(f'<a href="{html.escape(href)}" target="_blank">{more}</a>' if href else more)
+    parts.append("</svg>")
+
+    ctx.write(out_path, "\n".join(parts) + "\n")
 
 
-def _render_html(contributors: List[Dict], out_path: str):
+def _sprite_styles(sprite_map: Dict) -> str:
+    """CSS shared by every sprite avatar; per-item offsets are set inline"""
+    display = SPRITE_DISPLAY_SIZE
+    sheet_width = sprite_map["columns"] * display
+    return (
+        "    .item .sprite { "
+        f"display: block; width: {display}px; height: {display}px; border-radius: 50%; "
+        f"background-image: url('./{sprite_map['image']}'); background-size: {sheet_width}px auto; "
+        "background-repeat: no-repeat; box-shadow: 0 0 0 2px rgba(88, 166, 255, 0.2); "
+        "transition: box-shadow 0.3s; }\n"
+        "    .item:hover .sprite { box-shadow: 0 0 0 2px rgba(88, 166, 255, 0.8); }"
+    )
+
+
+def _virtual_styles() -> str:
+    """CSS for the virtualized grid; items are absolutely positioned by the script"""
+    item_height = VIRTUAL_ROW_HEIGHT - 20
+    return (
+        "    .virtual-grid { grid-column: 1 / -1; position: relative; }\n"
+        f"    .virtual-grid .item {{ position: absolute; height: {item_height}px; overflow: hidden; }}"
+    )
+
+
+@_renderer("html")
+def _render_html(ctx: _RenderContext, out_path: str):
+    contributors = ctx.contributors
     if not contributors:
         html_out = """<html><head><meta charset=\"utf-8\"><title>Contributors</title></head><body><p>No contributors</p></body></html>"""
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(html_out)
+        ctx.write(out_path, html_out)
         return
 
+    if ctx.html_mode == "virtual":
+        # Contributors are fetched page by page; only the container is inlined
+        data_src = _render_virtual_data(ctx, ctx.data_dir, out_path)
+        more_href = _more_href(ctx.data_listing, out_path) or "#"
+        script = _load_template("virtual-wall.js")
+        _write_html(
+            ctx,
+            out_path,
+            items=(
+                f"<div id='virtual-wall' class='virtual-grid' data-src='{html.escape(data_src)}' "
+                f"data-more='{html.escape(more_href)}'></div>"
+            ),
+            styles=_virtual_styles(),
+            scripts=f"<script>\n{script}</script>",
+        )
+        return
+
+    sprite_map = None
+    if ctx.html_mode == "sprite":
+        avatars = ctx.avatars(SPRITE_TILE_SIZE)
+        sprite_map = _render_sprite(ctx, avatars, ctx.sprite_path, ctx.sprite_map_path)
+
     items = []
-    for c in contributors:
+    for idx, c in enumerate(contributors):
         name = html.escape(c.get("name") or "")
         email = html.escape(c.get("email") or "")
-        avatar = c.get("avatar_url") or FALLBACK_AVATAR
+        avatar = html.escape(sized_avatar_url(c.get("avatar_url") or FALLBACK_AVATAR, HTML_AVATAR_SIZE * HIDPI_SCALE))
         link = c.get("html_url") or "#"
+        if sprite_map:
+            # Offsets are scaled from sprite tile size to display size by background-size
+            sprite = sprite_map["sprites"][idx]
+            pos_x = sprite["col"] * SPRITE_DISPLAY_SIZE
+            pos_y = sprite["row"] * SPRITE_DISPLAY_SIZE
+            avatar_html = f"<span class='sprite' role='img' aria-label='{name}' style='background-position: -{pos_x}px -{pos_y}px'></span>"
+        else:
+            avatar_html = f"<img src='{avatar}' alt='{name}'>"
         items.append(
-            f"<a class='item' href='{link}' target='_blank' title='{name}'><img src='{avatar}' alt='{name}'><div class='name'>{name}</div><div class='email'>{email}</div></a>"
+            f"<a class='item' href='{link}' target='_blank' title='{name}'>{avatar_html}<div class='name'>{name}</div><div class='email'>{email}</div></a>"
         )
 
-    # Load HTML template
-    template_path = TEMPLATE_DIR / "contributors.html"
-    with open(template_path, "r", encoding="utf-8") as f:
-        template_content = f.read()
-    
-    # Replace placeholder with items
-    html_out = template_content.format(items=''.join(items))
-    
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(html_out)
+    if ctx.overflow:
+        href = html.escape(_more_href(ctx.data_listing, out_path) or "#")
+        items.append(f"<a class='item' href='{href}' target='_blank'><div class='name'>+{ctx.overflow} more</div></a>")
 
+    styles = _sprite_styles(sprite_map) if sprite_map else ""
+    _write_html(ctx, out_path, items=''.join(items), styles=styles)
 
-def _render_markdown(contributors: List[Dict], out_path: str):
+
+def _write_html(ctx: _RenderContext, out_path: str, items: str, styles: str = "", scripts: str = ""):
+    # Replace template placeholders
+    html_out = _load_template("contributors.html").format(items=items, styles=styles, scripts=scripts)
+    ctx.write(out_path, html_out)
+
+
+@_renderer("md")
+def _render_markdown(ctx: _RenderContext, out_path: str):
     """Render contributors as Markdown with clickable avatars and names"""
-    if not contributors:
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write("## All Contributors\n\nNo contributors yet.\n")
+    if not ctx.contributors:
+        ctx.write(out_path, "## All Contributors\n\nNo contributors yet.\n")
         return
 
-    # Build table with 10 columns
-    cols_per_row = 10
-    rows = []
-    
-    for i in range(0, len(contributors), cols_per_row):
-        row_contributors = contributors[i:i + cols_per_row]
-        
-        # Build table row
-        row_cells = []
-        for c in row_contributors:
-            name = c.get("name") or "Unknown"
-            avatar = c.get("avatar_url") or FALLBACK_AVATAR
-            link = c.get("html_url") or "#"
-            
-            cell = f'''<td align="center">
-        <a href="{link}">
-            <img src="{avatar}" width="50;" alt="{name}"/>
-            <br />
-            <sub><b>{name}</b></sub>
-        </a>
-    </td>'''
-            row_cells.append(cell)
-        
-        # Fill empty cells if needed
-        while len(row_cells) < cols_per_row:
-            row_cells.append('<td></td>')
-        
-        rows.append('<tr>\n    ' + '\n    '.join(row_cells) + '\n</tr>')
-    
-    table_content = '<table>\n' + '\n'.join(rows) + '\n</table>'
+    cells = ctx.cells
+    if ctx.overflow:
+        cells = cells + [_more_cell(ctx.overflow, _more_href(ctx.listing, out_path))]
+    table_content = _build_table(cells, MD_COLUMNS)
 
-    # Load markdown template
-    template_path = TEMPLATE_DIR / "contributors.md"
-    with open(template_path, "r", encoding="utf-8") as f:
-        template_content = f.read()
-    
-    # Replace placeholder with table
-    md_out = template_content.format(items=table_content)
-    
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(md_out)
+    # Replace template placeholder with table
+    md_out = _load_template("contributors.md").format(items=table_content)
+    ctx.write(out_path, md_out)
 
 
-def _update_readme(contributors: List[Dict], readme_path: str):
+@_renderer("readme")
+def _update_readme(ctx: _RenderContext, readme_path: str):
     """Update README.md with contributors section"""
     readme_file = Path(readme_path).resolve()  # Resolve to absolute path
-    
-    print(f"DEBUG: Updating README at: {readme_file}")
-    print(f"DEBUG: README exists: {readme_file.exists()}")
-    print(f"DEBUG: Current working directory: {Path.cwd()}")
-    
+
     if not readme_file.exists():
         print(f"WARNING: README file '{readme_file}' does not exist; skipping update.")
         return
     
     print(f"INFO: Updating README: {readme_file}")
     
-    # Generate contributors table (same layout as _render_markdown)
-    cols_per_row = 8
-    rows = []
-    
-    for i in range(0, len(contributors), cols_per_row):
-        row_contributors = contributors[i:i + cols_per_row]
-        
-        row_cells = []
-        for c in row_contributors:
-            name = c.get("name") or "Unknown"
-            avatar = c.get("avatar_url") or FALLBACK_AVATAR
-            link = c.get("html_url") or "#"
-            
-            cell = f'''<td align="center">
-        <a href="{link}">
-            <img src="{avatar}" width="50;" alt="{name}"/>
-            <br />
-            <sub><b>{name}</b></sub>
-        </a>
-    </td>'''
-            row_cells.append(cell)
-        
-        while len(row_cells) < cols_per_row:
-            row_cells.append('<td></td>')
-        
-        rows.append('<tr>\n    ' + '\n    '.join(row_cells) + '\n</tr>')
-    
-    table_content = '<table>\n' + '\n'.join(rows) + '\n</table>'
+    # Same cells as _render_markdown, narrower table
+    cells = ctx.cells
+    if ctx.overflow:
+        cells = cells + [_more_cell(ctx.overflow, _more_href(ctx.listing, readme_file))]
+    table_content = _build_table(cells, README_COLUMNS)
     
     contributors_content = f"{README_START_MARKER}\n{table_content}\n{README_END_MARKER}"
     
@@ -270,23 +919,32 @@ def _update_readme(contributors: List[Dict], readme_path: str):
     with open(readme_file, "r", encoding="utf-8") as f:
         content = f.read()
     
-    # Check if markers exist
-    pattern = re.compile(
-        re.escape(README_START_MARKER) + r".*?" + re.escape(README_END_MARKER),
-        re.DOTALL
-    )
-    
-    if pattern.search(content):
-        # Replace existing section
-        new_content = pattern.sub(contributors_content, content)
+    # Locate markers with plain string search; the table itself is never
+    # regex-scanned. Every marked section is replaced, not just the first.
+    parts = []
+    pos = 0
+    while True:
+        start = content.find(README_START_MARKER, pos)
+        if start == -1:
+            break
+        end = content.find(README_END_MARKER, start + len(README_START_MARKER))
+        if end == -1:
+            break
+        parts.append(content[pos:start])
+        parts.append(contributors_content)
+        pos = end + len(README_END_MARKER)
+
+    if parts:
+        # Replace existing sections
+        new_content = "".join(parts) + content[pos:]
     else:
         # Append to the end
         if not content.endswith("\n"):
             content += "\n"
         new_content = content + "\n" + contributors_content + "\n"
     
-    # Write back to README
-    with open(readme_file, "w", encoding="utf-8") as f:
-        f.write(new_content)
-    
-    print(f"✓ Updated README: {readme_file}")
+    # Write back only when the section actually changed
+    if ctx.write(readme_file, new_content):
+        print(f"✓ Updated README: {readme_file}")
+    else:
+        print(f"ℹ️  README unchanged: {readme_file}")
@@ -0,0 +1,187 @@
+"""Deadlines, jittered retries and hedged requests for GitHub API calls.
+
+Every API call runs through call_with_retries(): each attempt gets a
+per-request timeout clipped to the overall deadline, idempotent calls are
+retried on connection errors / timeouts / 5xx / secondary rate limits with
+full-jitter exponential backoff, and a GET that is slower than the recent
+latency percentile can be hedged with a duplicate on another connection.
+"""
+
+from __future__ import annotations
+
+import http.client
+import random
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Hedging needs a latency baseline before it can pick a threshold
+HEDGE_MIN_SAMPLES = 20
+
+
+class DeadlineExceeded(TimeoutError):
+    """The overall deadline ran out before the call could complete."""
+
+
+class RetryableStatus(Exception):
+    """An HTTP status worth retrying; retry_after is the server's hint in seconds."""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+RETRYABLE_ERRORS = (RetryableStatus, ConnectionError, socket.timeout, TimeoutError, http.client.HTTPException)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    timeout: float = 15.0
+    retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    # Hedge GETs slower than this percentile of recent latencies (0 = off)
+    hedge_percentile: float = 0.0
+
+
+class Deadline:
+    """Absolute monotonic deadline; Deadline(None) never expires"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> Optional[float]:
+        if self.expires is None:
+            return None
+        return self.expires - time.monotonic()
+
+    def clip(self, timeout: float) -> float:
+        """timeout shortened to what is left, raising once nothing is"""
+        left = self.remaining()
+        if left is None:
+            return timeout
+        if left <= 0:
+            raise DeadlineExceeded("overall deadline exceeded")
+        return min(timeout, left)
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RunStats:
+    """Thread-safe counters reported at the end of a run"""
+
+    def __init__(self, *keys: str):
+        self._counts: Dict[str, int] = dict.fromkeys(keys, 0)
+        self._lock = threading.Lock()
+
+    def incr(self, key: str, n: int = 1):
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + n
+
+    def __getitem__(self, key: str) -> int:
+        with self._lock:
+            return self._counts.get(key, 0)
+
+    def get(self, key: str, default: int = 0) -> int:
+        with self._lock:
+            return self._counts.get(key, default)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def __repr__(self):
+        return " ".join(f"{k}={v}" for k, v in self.snapshot().items())
+
+
+def backoff_delay(attempt: int, policy: RetryPolicy, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, or the server's Retry-After when given"""
+    if retry_after is not None:
+        return min(retry_after, policy.backoff_max * 4)
+    return random.uniform(0, min(policy.backoff_max, policy.backoff_base * (2 ** attempt)))
+
+
+def call_with_retries(
+    attempt_fn: Callable[[float], T],
+    policy: RetryPolicy,
+    stats: RunStats,
+    deadline: Optional[Deadline] = None,
+    idempotent: bool = True,
+) -> T:
+    """Run attempt_fn(timeout) until it succeeds, retries run out or the deadline passes"""
+    deadline = deadline or Deadline(None)
+    retries = policy.retries if idempotent else 0
+    for attempt in range(retries + 1):
+        timeout = deadline.clip(policy.timeout)
+        try:
+            return attempt_fn(timeout)
+        except RETRYABLE_ERRORS as e:
+            if isinstance(e, (socket.timeout, TimeoutError)):
+                stats.incr("timeouts")
+            if attempt >= retries:
+                raise
+            delay = backoff_delay(attempt, policy, getattr(e, "retry_after", None))
+            left = deadline.remaining()
+            if left is not None and delay >= left:
+                raise DeadlineExceeded(f"overall deadline exceeded while retrying: {e}") from e
+            stats.incr("retries")
+            print(f"WARNING: retrying in {delay:.1f}s after: {e}")
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def hedged(
+    fn: Callable[[], T],
+    delay: Optional[float],
+    executor: ThreadPoolExecutor,
+    stats: RunStats,
+) -> T:
+    """Run fn; if it hasn't finished after delay, race a duplicate and take the first success"""
+    if delay is None:
+        return fn()
+    primary = executor.submit(fn)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    stats.incr("hedges")
+    backup = executor.submit(fn)
+    pending = {primary, backup}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            if future is backup:
+                stats.incr("hedge_wins")
+            return result
+    raise error
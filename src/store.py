@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""Optional SQLite store for repos, contributors and per-run snapshots.
+
+The collector upserts every run into it and renders the walls from queries
+against it, so history questions ("who is new since run N?", "where else
+does this login contribute?") are indexed lookups instead of rescans.
+
+Usage:
+    python src/store.py contributors.db runs
+    python src/store.py contributors.db new [--since RUN_ID]
+    python src/store.py contributors.db who LOGIN_OR_EMAIL
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCHEMA_VERSION = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    full_name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    owner TEXT NOT NULL COLLATE NOCASE,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_repos_owner ON repos(owner);
+
+CREATE TABLE IF NOT EXISTS contributors (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    login TEXT COLLATE NOCASE,
+    name TEXT,
+    email TEXT COLLATE NOCASE,
+    html_url TEXT,
+    avatar_url TEXT,
+    first_run INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_contributors_login ON contributors(login);
+CREATE INDEX IF NOT EXISTS idx_contributors_email ON contributors(email);
+
+-- Per-run snapshot of each scanned repo's list, so old runs keep their data
+CREATE TABLE IF NOT EXISTS repo_contributions (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    repo_id INTEGER NOT NULL REFERENCES repos(id) ON DELETE CASCADE,
+    contributor_id INTEGER NOT NULL REFERENCES contributors(id),
+    contributions INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (run_id, repo_id, contributor_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_repo_contributions_contributor ON repo_contributions(contributor_id);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    targets TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS run_repos (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    repo_id INTEGER NOT NULL REFERENCES repos(id) ON DELETE CASCADE,
+    PRIMARY KEY (run_id, repo_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_run_repos_repo ON run_repos(repo_id, run_id);
+
+CREATE TABLE IF NOT EXISTS run_contributors (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    contributor_id INTEGER NOT NULL REFERENCES contributors(id),
+    contributions INTEGER NOT NULL,
+    PRIMARY KEY (run_id, contributor_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_run_contributors_contributor ON run_contributors(contributor_id);
+
+CREATE TABLE IF NOT EXISTS feed_cursors (
+    feed TEXT PRIMARY KEY,
+    last_event_id INTEGER,
+    etag TEXT,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS owner_types (
+    login TEXT PRIMARY KEY COLLATE NOCASE,
+    type TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Up to version 3, repo_contributions held one list per repo, overwritten
+# every run. Upgrading keeps those rows as the snapshot of each repo's latest
+# run; the new table is created by SCHEMA in between.
+V3_SET_ASIDE = """
+ALTER TABLE repo_contributions RENAME TO repo_contributions_v3;
+DROP INDEX IF EXISTS idx_repo_contributions_contributor;
+"""
+V3_COPY = """
+INSERT INTO repo_contributions (run_id, repo_id, contributor_id, contributions, position)
+SELECT (SELECT MAX(rr.run_id) FROM run_repos rr WHERE rr.repo_id = old.repo_id),
+       old.repo_id, old.contributor_id, old.contributions, old.position
+FROM repo_contributions_v3 old
+WHERE EXISTS (SELECT 1 FROM run_repos rr WHERE rr.repo_id = old.repo_id);
+DROP TABLE repo_contributions_v3;
+"""
+
+
+class ContributorStore:
+    """SQLite-backed contributor history; safe to share between threads"""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        if self.path.parent:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA foreign_keys = ON")
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            self._db.close()
+            raise ValueError(
+                f"{self.path} uses store schema {version}, newer than this version supports ({SCHEMA_VERSION})"
+            )
+        if 0 < version < 4:
+            print(f"INFO: upgrading {self.path} from store schema {version} to {SCHEMA_VERSION}")
+            script = V3_SET_ASIDE + SCHEMA + V3_COPY
+        else:
+            # New file, or only tables were added since (CREATE IF NOT EXISTS)
+            script = SCHEMA
+        self._db.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {SCHEMA_VERSION};\nCOMMIT;")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def record_run(self, targets: List[str], people: Dict[str, Dict], contributions: Dict[str, Dict[str, int]]) -> int:
+        """Upsert one collection and snapshot it as a new run; returns the run id
+
+        people maps contributor key -> login/name/email/html_url/avatar_url,
+        contributions maps repo full name -> {contributor key: count} in the
+        order GitHub listed them.
+        """
+        now = time.time()
+        with self._lock, self._db:
+            db = self._db
+            run_id = db.execute(
+                "INSERT INTO runs (started_at, targets) VALUES (?, ?)", (now, " ".join(targets))
+            ).lastrowid
+
+            contributor_ids = {}
+            for key, p in people.items():
+                db.execute(
+                    """
+                    INSERT INTO contributors (key, login, name, email, html_url, avatar_url, first_run)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(key) DO UPDATE SET
+                        login = excluded.login, name = excluded.name, email = excluded.email,
+                        html_url = excluded.html_url, avatar_url = excluded.avatar_url
+                    """,
+                    (key, p.get("login"), p.get("name"), p.get("email"), p.get("html_url"), p.get("avatar_url"), run_id),
+                )
+                contributor_ids[key] = db.execute("SELECT id FROM contributors WHERE key = ?", (key,)).fetchone()[0]
+
+            for full, counts in contributions.items():
+                db.execute(
+                    """
+                    INSERT INTO repos (full_name, owner, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(full_name) DO UPDATE SET updated_at = excluded.updated_at
+                    """,
+                    (full, full.split("/")[0], now),
+                )
+                repo_id = db.execute("SELECT id FROM repos WHERE full_name = ?", (full,)).fetchone()[0]
+                db.executemany(
+                    """
+                    INSERT INTO repo_contributions (run_id, repo_id, contributor_id, contributions, position)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [(run_id, repo_id, contributor_ids[key], n, pos) for pos, (key, n) in enumerate(counts.items())],
+                )
+                db.execute("INSERT INTO run_repos (run_id, repo_id) VALUES (?, ?)", (run_id, repo_id))
+
+            db.execute(
+                """
+                INSERT INTO run_contributors (run_id, contributor_id, contributions)
+                SELECT run_id, contributor_id, SUM(contributions)
+                FROM repo_contributions
+                WHERE run_id = ?
+                GROUP BY contributor_id
+                """,
+                (run_id,),
+            )
+        return run_id
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def wall(self, run_id: int) -> List[Dict]:
+        """Display data (name, email, avatar_url, html_url, contributions) of a run"""
+        rows = self._query(
+            """
+            SELECT c.name, c.email, c.avatar_url, c.html_url, r.contributions
+            FROM run_contributors r JOIN contributors c ON c.id = r.contributor_id
+            WHERE r.run_id = ?
+            ORDER BY r.contributions DESC, c.id
+            """,
+            (run_id,),
+        )
+        return [dict(row) for row in rows]
+
+    def details(self, run_id: int) -> Dict[str, Dict]:
+        """Per-repo name/email/login/contributions lists of a run, as CollectResult.details"""
+        details = {}
+        rows = self._query(
+            """
+            SELECT p.full_name, c.name, c.email, c.login, rc.contributions
+            FROM run_repos rr
+            JOIN repos p ON p.id = rr.repo_id
+            JOIN repo_contributions rc ON rc.run_id = rr.run_id AND rc.repo_id = rr.repo_id
+            JOIN contributors c ON c.id = rc.contributor_id
+            WHERE rr.run_id = ?
+            ORDER BY p.full_name, rc.position
+            """,
+            (run_id,),
+        )
+        for row in rows:
+            entry = details.setdefault(row["full_name"], {"count": 0, "contributors": []})
+            entry["contributors"].append(
+                {"name": row["name"], "email": row["email"], "login": row["login"], "contributions": row["contributions"]}
+            )
+            entry["count"] += 1
+        return details
+
+    def repo_contributors(self, run_id: int) -> Dict[str, List[Dict]]:
+        """Per-repo contributor lists of a run in GitHub's order, shaped like API entries
+
+        Lets a fresh process reuse unchanged repos instead of fetching them.
+        """
+        lists = {}
+        rows = self._query(
+            """
+            SELECT p.full_name, c.login, c.name, c.email, c.html_url, c.avatar_url, rc.contributions
+            FROM run_repos rr
+            JOIN repos p ON p.id = rr.repo_id
+            JOIN repo_contributions rc ON rc.run_id = rr.run_id AND rc.repo_id = rr.repo_id
+            JOIN contributors c ON c.id = rc.contributor_id
+            WHERE rr.run_id = ?
+            ORDER BY p.full_name, rc.position
+            """,
+            (run_id,),
+        )
+        for row in rows:
+            entry = dict(row)
+            lists.setdefault(entry.pop("full_name"), []).append(entry)
+        return lists
+
+    def feed_cursor(self, feed: str) -> Optional[Dict]:
+        """last_event_id / etag stored for an events feed URL"""
+        rows = self._query("SELECT last_event_id, etag FROM feed_cursors WHERE feed = ?", (feed,))
+        return dict(rows[0]) if rows else None
+
+    def save_feed_cursor(self, feed: str, last_event_id: Optional[int], etag: Optional[str]):
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                INSERT INTO feed_cursors (feed, last_event_id, etag, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(feed) DO UPDATE SET
+                    last_event_id = excluded.last_event_id, etag = excluded.etag, updated_at = excluded.updated_at
+                """,
+                (feed, last_event_id, etag, time.time()),
+            )
+
+    def owner_types(self) -> Dict[str, str]:
+        """Known account types ("Organization" / "User") by lowercased login"""
+        return {row["login"].lower(): row["type"] for row in self._query("SELECT login, type FROM owner_types")}
+
+    def save_owner_types(self, owner_types: Dict[str, str]):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                """
+                INSERT INTO owner_types (login, type, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(login) DO UPDATE SET type = excluded.type, updated_at = excluded.updated_at
+                """,
+                [(login, kind, now) for login, kind in owner_types.items()],
+            )
+
+    def runs(self, limit: int = 20) -> List[Dict]:
+        rows = self._query(
+            """
+            SELECT r.id, r.started_at, r.targets, COUNT(rc.contributor_id) AS contributors
+            FROM runs r LEFT JOIN run_contributors rc ON rc.run_id = r.id
+            GROUP BY r.id ORDER BY r.id DESC LIMIT ?
+            """,
+            (limit,),
+        )
+        return [dict(row) for row in rows]
+
+    def latest_run(self) -> Optional[int]:
+        rows = self._query("SELECT MAX(id) FROM runs")
+        return rows[0][0] if rows else None
+
+    def new_contributors(self, since_run: int, run_id: Optional[int] = None) -> List[Dict]:
+        """Contributors in run_id (default: latest) that were not in since_run"""
+        run_id = run_id or self.latest_run()
+        rows = self._query(
+            """
+            SELECT c.login, c.name, c.email, c.html_url, r.contributions
+            FROM run_contributors r JOIN contributors c ON c.id = r.contributor_id
+            WHERE r.run_id = ? AND NOT EXISTS (
+                SELECT 1 FROM run_contributors old
+                WHERE old.run_id = ? AND old.contributor_id = r.contributor_id
+            )
+            ORDER BY r.contributions DESC
+            """,
+            (run_id, since_run),
+        )
+        return [dict(row) for row in rows]
+
+    def contributions_of(self, login_or_email: str) -> List[Dict]:
+        """Repos (across all orgs ever collected) a login or email contributed to,
+        as of the latest run that scanned each"""
+        rows = self._query(
+            """
+            SELECT c.login, c.email, p.full_name, rc.contributions
+            FROM contributors c
+            JOIN repo_contributions rc ON rc.contributor_id = c.id
+            JOIN repos p ON p.id = rc.repo_id
+            WHERE (c.login = ? OR c.email = ?)
+              AND rc.run_id = (SELECT MAX(rr.run_id) FROM run_repos rr WHERE rr.repo_id = rc.repo_id)
+            ORDER BY rc.contributions DESC
+            """,
+            (login_or_email, login_or_email),
+        )
+        return [dict(row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the contributors SQLite store")
+    parser.add_argument("db", help="Path to the store (STORE_PATH)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("runs", help="List recent runs")
+    new = sub.add_parser("new", help="Contributors new in the latest run")
+    new.add_argument("--since", type=int, help="Baseline run id (default: the previous run)")
+    who = sub.add_parser("who", help="Where a login or email contributes")
+    who.add_argument("login")
+    args = parser.parse_args()
+
+    store = ContributorStore(args.db)
+    if args.cmd == "runs":
+        out = store.runs()
+    elif args.cmd == "new":
+        latest = store.latest_run()
+        out = store.new_contributors(args.since if args.since is not None else (latest or 1) - 1, latest)
+    else:
+        out = store.contributions_of(args.login)
+    print(json.dumps(out, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
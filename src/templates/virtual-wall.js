@@ -0,0 +1,136 @@
+(function() {
+  const wall = document.getElementById('virtual-wall');
+  if (!wall) return;
+
+  const base = wall.dataset.src;
+  const moreHref = wall.dataset.more || '#';
+  const ITEM_MIN_WIDTH = 100;
+  const GAP = 20;
+  const ROW_HEIGHT = 170;
+  const OVERSCAN_ROWS = 3;
+
+  let index = null;
+  let columns = 1;
+  let scheduled = false;
+  const pages = new Map();
+  const pending = new Set();
+
+  function loadPage(n) {
+    if (pages.has(n) || pending.has(n)) return;
+    pending.add(n);
+    fetch(base + index.pages[n])
+      .then((res) => res.json())
+      .then((rows) => { pages.set(n, rows); })
+      .catch(() => { pages.set(n, []); })
+      .finally(() => { pending.delete(n); schedule(); });
+  }
+
+  function itemAt(i) {
+    const n = Math.floor(i / index.page_size);
+    const rows = pages.get(n);
+    if (!rows) {
+      loadPage(n);
+      return null;
+    }
+    return rows[i % index.page_size] || null;
+  }
+
+  function buildItem(row, left, top, width) {
+    const a = document.createElement('a');
+    a.className = 'item';
+    a.href = row[3] || '#';
+    a.target = '_blank';
+    a.title = row[0];
+    a.style.left = left + 'px';
+    a.style.top = top + 'px';
+    a.style.width = width + 'px';
+
+    const img = document.createElement('img');
+    img.loading = 'lazy';
+    img.decoding = 'async';
+    img.src = row[2];
+    img.alt = row[0];
+
+    const name = document.createElement('div');
+    name.className = 'name';
+    name.textContent = row[0];
+
+    const email = document.createElement('div');
+    email.className = 'email';
+    email.textContent = row[1] || '';
+
+    a.append(img, name, email);
+    return a;
+  }
+
+  function buildMore(left, top, width) {
+    const a = document.createElement('a');
+    a.className = 'item';
+    a.href = moreHref;
+    a.target = '_blank';
+    a.style.left = left + 'px';
+    a.style.top = top + 'px';
+    a.style.width = width + 'px';
+
+    const name = document.createElement('div');
+    name.className = 'name';
+    name.textContent = '+' + index.overflow + ' more';
+
+    a.append(name);
+    return a;
+  }
+
+  // Contributors plus the trailing "+K more" item of a capped wall
+  function tileCount() {
+    return index.count + (index.overflow ? 1 : 0);
+  }
+
+  function render() {
+    scheduled = false;
+    const totalRows = Math.ceil(tileCount() / columns);
+    const top = Math.max(0, -wall.getBoundingClientRect().top);
+    const firstRow = Math.max(0, Math.floor(top / ROW_HEIGHT) - OVERSCAN_ROWS);
+    const lastRow = Math.min(totalRows, Math.ceil((top + window.innerHeight) / ROW_HEIGHT) + OVERSCAN_ROWS);
+    const width = (wall.clientWidth - GAP * (columns - 1)) / columns;
+
+    const frag = document.createDocumentFragment();
+    const end = Math.min(tileCount(), lastRow * columns);
+    for (let i = firstRow * columns; i < end; i++) {
+      const left = (i % columns) * (width + GAP);
+      const top = Math.floor(i / columns) * ROW_HEIGHT;
+      if (i === index.count) {
+        frag.appendChild(buildMore(left, top, width));
+        continue;
+      }
+      const row = itemAt(i);
+      if (!row) continue;
+      frag.appendChild(buildItem(row, left, top, width));
+    }
+    wall.replaceChildren(frag);
+  }
+
+  function schedule() {
+    if (scheduled || !index) return;
+    scheduled = true;
+    window.requestAnimationFrame(render);
+  }
+
+  function layout() {
+    columns = Math.max(1, Math.floor((wall.clientWidth + GAP) / (ITEM_MIN_WIDTH + GAP)));
+    const totalRows = Math.ceil(tileCount() / columns);
+    wall.style.height = Math.max(0, totalRows * ROW_HEIGHT - GAP) + 'px';
+    schedule();
+  }
+
+  fetch(base + 'index.json')
+    .then((res) => res.json())
+    .then((data) => {
+      index = data;
+      layout();
+      window.addEventListener('scroll', schedule, { passive: true });
+      window.addEventListener('resize', layout);
+    })
+    .catch(() => {
+      wall.textContent = 'Failed to load contributors';
+    });
+})();
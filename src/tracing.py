@@ -0,0 +1,126 @@
+"""Opt-in Chrome trace-event recording (open the file in Perfetto or chrome://tracing).
+
+start(path) records a span for every API request, avatar download/crop,
+render format and git subprocess; the file is written when the process
+exits. A Collector starts it when its config names a trace_file (TRACE_FILE
+via CollectorConfig.from_env). Until then span() hands back a shared no-op
+object, so instrumented code pays one attribute lookup and a call.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Optional
+
+# Path segments kept verbatim by url_class(); anything else is a parameter
+_URL_KEYWORDS = frozenset(
+    {
+        "repos", "orgs", "users", "contributors", "git", "blobs", "trees", "commits",
+        "refs", "heads", "pulls", "events", "rate_limit", "u",
+    }
+)
+
+_events: List[Dict] = []
+_lock = threading.Lock()
+_path: Optional[str] = None
+_pid = os.getpid()
+_named_threads = set()
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name: str, cat: str, args: Dict):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def set(self, **attrs):
+        self.args.update(attrs)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = f"{exc_type.__name__}: {exc}"
+        thread = threading.current_thread()
+        event = {
+            "name": self.name,
+            "cat": self.cat,
+            "ph": "X",
+            "ts": self.start * 1e6,
+            "dur": (end - self.start) * 1e6,
+            "pid": _pid,
+            "tid": thread.ident,
+            "args": self.args,
+        }
+        with _lock:
+            if thread.ident not in _named_threads:
+                _named_threads.add(thread.ident)
+                _events.append(
+                    {"name": "thread_name", "ph": "M", "pid": _pid, "tid": thread.ident, "args": {"name": thread.name}}
+                )
+            _events.append(event)
+        return False
+
+
+def enabled() -> bool:
+    return _path is not None
+
+
+def span(name: str, cat: str = "app", **attrs):
+    """Context manager timing one operation; .set(**attrs) adds attributes"""
+    if _path is None:
+        return _NOOP
+    return _Span(name, cat, attrs)
+
+
+def url_class(url: str) -> str:
+    """Collapse a URL to its endpoint shape, e.g. /repos/{}/{}/contributors"""
+    parsed = urllib.parse.urlsplit(url)
+    segments = [s if s in _URL_KEYWORDS else "{}" for s in parsed.path.split("/") if s]
+    return f"{parsed.netloc}/{'/'.join(segments)}"
+
+
+def start(path: str):
+    """Begin recording; the trace is written to path at exit (or on flush())"""
+    global _path
+    if _path is None:
+        atexit.register(flush)
+    _path = path
+
+
+def flush():
+    """Write all recorded events as Chrome trace-event JSON"""
+    if _path is None:
+        return
+    with _lock:
+        events = list(_events)
+    with open(_path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    print(f"INFO: wrote {len(events)} trace events to {_path}")
+
@@ -0,0 +1,91 @@
+"""Collector.collect() with deferred repos and a rate-limited inventory."""
+
+import pytest
+
+import collect_contributors as cc
+from github_client import RateLimitError
+
+REPOS = [{"name": name, "full_name": f"acme/{name}", "owner": {"login": "acme", "type": "Organization"}} for name in ("a1", "a2")]
+
+
+class FakeClient:
+    """Two org repos with two contributors each; counts every contributor listing"""
+
+    def __init__(self):
+        self.fetched = []
+
+    def start_deadline(self, seconds):
+        pass
+
+    def list_org_public_repos(self, name):
+        return REPOS
+
+    def list_user_public_repos(self, name):
+        return REPOS
+
+    def list_repo_contributors(self, owner, repo, anon=True):
+        self.fetched.append(f"{owner}/{repo}")
+        return [
+            {"login": f"{repo}-dev", "avatar_url": f"https://avatars.example/{repo}", "html_url": f"https://github.com/{repo}-dev", "contributions": 7},
+            {"login": "shared", "avatar_url": "https://avatars.example/shared", "html_url": "https://github.com/shared", "contributions": 2},
+        ]
+
+
+def make_collector(tmp_path, client, **overrides):
+    config = cc.CollectorConfig.from_env(
+        {"GH_TOKEN": "x", "TARGETS": "acme/*", "PER_REPO_DELAY_MS": "0", "BUDGET_POLICY": "off"},
+        output_dir=tmp_path / "out",
+        readme_path=tmp_path / "README.md",
+        **overrides,
+    )
+    return cc.Collector(config, client=client)
+
+
+def write_json(collector, result):
+    path = collector.output_paths()["json"]
+    cc.ensure_parent_dir(str(path))
+    path.write_text(cc.dump_contributors_json(result.to_json()), encoding="utf-8")
+
+
+def wall(result):
+    return {c["name"]: (c["avatar_url"], c["html_url"], c["contributions"]) for c in result.contributors}
+
+
+def test_deferred_repo_keeps_wall_rows_from_previous_json(tmp_path):
+    first = make_collector(tmp_path, FakeClient())
+    write_json(first, first.collect())
+
+    client = FakeClient()
+    result = make_collector(tmp_path, client).collect(defer=["acme/a2"])
+
+    assert client.fetched == ["acme/a1"]
+    assert result.deferred == ["acme/a2"]
+    assert wall(result) == {
+        "a1-dev": ("https://avatars.example/a1", "https://github.com/a1-dev", 7),
+        "shared": ("https://avatars.example/shared", "https://github.com/shared", 4),
+        "a2-dev": ("https://avatars.githubusercontent.com/a2-dev", "https://github.com/a2-dev", 7),
+    }
+    assert [c["name"] for c in result.contributors_list] == ["a1-dev", "a2-dev", "shared"]
+    assert result.details["acme/a2"]["count"] == 2
+
+
+def test_deferred_repo_keeps_stored_rows(tmp_path):
+    store_path = tmp_path / "contributors.db"
+    first = make_collector(tmp_path, FakeClient(), store_path=store_path)
+    result = first.collect()
+    first.store.record_run(result.targets, result.people, result.contributions)
+
+    result = make_collector(tmp_path, FakeClient(), store_path=store_path).collect(defer=["acme/a2"])
+
+    assert result.deferred == ["acme/a2"]
+    assert wall(result)["a2-dev"] == ("https://avatars.example/a2", "https://github.com/a2-dev", 7)
+    assert wall(result)["shared"][2] == 4
+
+
+def test_rate_limited_listing_is_not_an_empty_owner(tmp_path):
+    class RateLimitedClient(FakeClient):
+        def list_org_public_repos(self, name):
+            raise RateLimitError(403, "API rate limit exceeded")
+
+    with pytest.raises(RateLimitError):
+        make_collector(tmp_path, RateLimitedClient()).collect()
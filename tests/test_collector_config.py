@@ -0,0 +1,28 @@
+"""CollectorConfig.from_env() is the only place the collector reads the environment."""
+
+from pathlib import Path
+
+import collect_contributors as cc
+import tracing
+
+
+def test_from_env_resolves_output_locations_against_workspace():
+    config = cc.CollectorConfig.from_env(
+        {"GH_TOKEN": "x", "GITHUB_WORKSPACE": "/ws", "OUTPUT_DIR": "wall", "README_PATH": "docs/README.md", "TRACE_FILE": "trace.json"}
+    )
+
+    assert config.output_dir == Path("/ws/wall")
+    assert config.readme_path == Path("/ws/docs/README.md")
+    assert config.trace_file == Path("/ws/trace.json")
+
+
+def test_explicit_config_ignores_output_env(monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", "elsewhere")
+    monkeypatch.setenv("README_PATH", "ELSEWHERE.md")
+    monkeypatch.setenv("TRACE_FILE", "trace.json")
+
+    paths = cc.Collector(cc.CollectorConfig(token="x"), client=object()).output_paths()
+
+    assert paths["json"] == Path(".thanks-contributors/contributors.json")
+    assert paths["readme"] == Path("README.md")
+    assert not tracing.enabled()
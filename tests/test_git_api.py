@@ -0,0 +1,215 @@
+"""commit_files_api() and the API transport against a local stand-in server."""
+
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import git
+
+REPO = "octo/wall"
+PREFIX = f"/repos/{REPO}"
+
+
+class StandInAPI(ThreadingHTTPServer):
+    """Just enough of the Git Data API for one repository, recording every request"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.requests = []
+        self.refs = {"main": "c1"}
+        self.commits = {"c1": "t1"}
+        self.trees = {
+            "t1": {
+                "README.md": git._git_blob_sha(b"# wall\n"),
+                "out/old.json": git._git_blob_sha(b"{}\n"),
+            }
+        }
+        self.blobs = {}
+        # Paths answered by dropping the connection, once (GET) or always (POST)
+        self.drop = set()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_PATCH(self):
+        self._handle()
+
+    def _handle(self):
+        api = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        api.requests.append((self.command, self.path, body))
+        assert self.headers["Authorization"] == "Bearer test-token"
+
+        if self.path in api.drop:
+            if self.command == "GET":
+                api.drop.discard(self.path)
+            self.close_connection = True
+            return
+
+        path = self.path[len(PREFIX):] if self.path.startswith(PREFIX) else self.path
+        status, data = 404, {"message": "Not Found"}
+        if self.command == "GET" and path.startswith("/git/ref/heads/"):
+            sha = api.refs.get(path[len("/git/ref/heads/"):])
+            if sha:
+                status, data = 200, {"object": {"sha": sha}}
+        elif self.command == "GET" and path.startswith("/git/commits/"):
+            status, data = 200, {"tree": {"sha": api.commits[path.rsplit("/", 1)[1]]}}
+        elif self.command == "GET" and path.startswith("/git/trees/"):
+            sha = path[len("/git/trees/"):].split("?")[0]
+            entries = [{"path": p, "type": "blob", "sha": s} for p, s in api.trees[sha].items()]
+            status, data = 200, {"sha": sha, "tree": entries, "truncated": False}
+        elif self.command == "POST" and path == "/git/blobs":
+            content = base64.b64decode(body["content"])
+            sha = git._git_blob_sha(content)
+            api.blobs[sha] = content
+            status, data = 201, {"sha": sha}
+        elif self.command == "POST" and path == "/git/trees":
+            tree = dict(api.trees[body["base_tree"]])
+            for entry in body["tree"]:
+                if entry["sha"] is None:
+                    tree.pop(entry["path"], None)
+                else:
+                    tree[entry["path"]] = entry["sha"]
+            sha = f"t{len(api.trees) + 1}"
+            api.trees[sha] = tree
+            status, data = 201, {"sha": sha}
+        elif self.command == "POST" and path == "/git/commits":
+            sha = f"c{len(api.commits) + 1}"
+            api.commits[sha] = body["tree"]
+            status, data = 201, {"sha": sha}
+        elif self.command == "POST" and path == "/git/refs":
+            api.refs[body["ref"][len("refs/heads/"):]] = body["sha"]
+            status, data = 201, {"object": {"sha": body["sha"]}}
+        elif self.command == "PATCH" and path.startswith("/git/refs/heads/"):
+            api.refs[path[len("/git/refs/heads/"):]] = body["sha"]
+            status, data = 200, {"object": {"sha": body["sha"]}}
+        elif self.command == "GET" and path == "/ping":
+            status, data = 200, {"pong": True}
+
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    server = StandInAPI()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("GITHUB_API_URL", server.url)
+    monkeypatch.setenv("GH_TOKEN", "test-token")
+    monkeypatch.setenv("GITHUB_REPOSITORY", REPO)
+    yield server
+    server.shutdown()
+    server.server_close()
+    for conn in git._API_CONNECTIONS.values():
+        conn.close()
+    git._API_CONNECTIONS.clear()
+
+
+@pytest.fixture
+def checkout(tmp_path):
+    (tmp_path / "README.md").write_text("# wall\n")
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "contributors.json").write_text('{"count": 1}\n')
+    return tmp_path
+
+
+def calls(api):
+    return [(method, path[len(PREFIX):]) for method, path, _ in api.requests]
+
+
+def test_new_branch_blobs_tree_commit_ref(api, checkout):
+    sha = git.commit_files_api(["README.md", "out"], "thanks/update", "chore: update", cwd=str(checkout), base_branch="main")
+
+    # GITHUB_API_URL points every call at the stand-in, in this order
+    assert calls(api) == [
+        ("GET", "/git/ref/heads/thanks/update"),
+        ("GET", "/git/ref/heads/main"),
+        ("GET", "/git/commits/c1"),
+        ("GET", "/git/trees/t1?recursive=1"),
+        ("POST", "/git/blobs"),  # README.md is unchanged and not uploaded
+        ("POST", "/git/trees"),
+        ("POST", "/git/commits"),
+        ("POST", "/git/refs"),
+    ]
+    bodies = {path: body for _, path, body in api.requests}
+    assert bodies[f"{PREFIX}/git/trees"]["base_tree"] == "t1"
+    assert bodies[f"{PREFIX}/git/commits"]["parents"] == ["c1"]
+    assert bodies[f"{PREFIX}/git/refs"] == {"ref": "refs/heads/thanks/update", "sha": sha}
+
+    tree = api.trees[api.commits[sha]]
+    assert sorted(tree) == ["README.md", "out/contributors.json"]  # out/old.json was removed
+    assert api.blobs[tree["out/contributors.json"]] == b'{"count": 1}\n'
+    assert api.refs["thanks/update"] == sha
+
+
+def test_existing_branch_is_patched_and_unchanged_tree_skipped(api, checkout):
+    first = git.commit_files_api(["README.md", "out"], "thanks/update", "one", cwd=str(checkout), base_branch="main")
+    (checkout / "out" / "contributors.json").write_text('{"count": 2}\n')
+    api.requests.clear()
+
+    second = git.commit_files_api(["out"], "thanks/update", "two", cwd=str(checkout), force=False)
+
+    assert calls(api)[-1] == ("PATCH", "/git/refs/heads/thanks/update")
+    assert api.requests[-1][2] == {"sha": second, "force": False}
+    assert ("POST", "/git/commits") in calls(api)
+    assert api.requests[calls(api).index(("POST", "/git/commits"))][2]["parents"] == [first]
+
+    api.requests.clear()
+    assert git.commit_files_api(["out"], "thanks/update", "three", cwd=str(checkout)) is None
+    assert all(method == "GET" for method, _ in calls(api))
+
+
+def test_dropped_get_is_resent_once(api):
+    api.drop.add("/ping")
+    assert git._get_github_api(f"{api.url}/ping") == {"pong": True}
+    assert [path for _, path, _ in api.requests] == ["/ping", "/ping"]
+
+
+def test_dropped_pr_creation_is_not_resent(api):
+    # The connection drops after the POST was received: it may have been
+    # applied, so sending it again could open a second PR
+    api.drop.add(f"{PREFIX}/pulls")
+    with pytest.raises(Exception):
+        git._get_github_api(f"{api.url}{PREFIX}/pulls", method="POST", data={"title": "t", "head": "h", "base": "main"})
+    assert [path for _, path, _ in api.requests] == [f"{PREFIX}/pulls"]
+
+
+def test_missing_listed_file_is_not_deleted(api, tmp_path):
+    # No checkout: only the rendered outputs are on disk, README.md is not
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "contributors.json").write_text('{"count": 1}\n')
+
+    sha = git.commit_files_api(
+        ["out", "README.md", "out/contributors.png"], "main", "chore: update", cwd=str(tmp_path), force=False
+    )
+
+    tree = api.trees[api.commits[sha]]
+    assert sorted(tree) == ["README.md", "out/contributors.json"]
+    assert tree["README.md"] == git._git_blob_sha(b"# wall\n")
+    trees = [body for method, path, body in api.requests if path == f"{PREFIX}/git/trees" and method == "POST"]
+    assert {e["path"] for e in trees[0]["tree"] if e["sha"] is None} == {"out/old.json"}
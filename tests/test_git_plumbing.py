@@ -0,0 +1,118 @@
+"""commit_files_plumbing() against a local clone of a bare repository."""
+
+import subprocess
+
+import pytest
+
+import git
+
+
+def run(*args, cwd):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A clone of a bare "origin" with one commit on main; returns the clone path"""
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(tmp_path / "gitconfig"))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", "test@example.com")
+
+    origin = tmp_path / "origin.git"
+    run("init", "-q", "--bare", "-b", "main", str(origin), cwd=tmp_path)
+    work = tmp_path / "work"
+    run("clone", "-q", str(origin), str(work), cwd=tmp_path)
+    run("checkout", "-q", "-b", "main", cwd=work)
+    (work / "README.md").write_text("# repo\n")
+    (work / ".thanks-contributors").mkdir()
+    (work / ".thanks-contributors" / "stale.json").write_text("{}\n")
+    run("add", "-A", cwd=work)
+    run("commit", "-q", "-m", "initial", cwd=work)
+    run("push", "-q", "origin", "main", cwd=work)
+    return work
+
+
+def test_commits_onto_branch_without_touching_checkout(repo):
+    out = repo / ".thanks-contributors"
+    (out / "stale.json").unlink()
+    (out / "contributors.json").write_text('{"count": 1}\n')
+    (repo / "README.md").write_text("# repo\n\nthanks\n")
+    head = run("rev-parse", "HEAD", cwd=repo)
+
+    commit = git.commit_files_plumbing(
+        [".thanks-contributors", "README.md"], "thanks/update", "chore: update contributors", cwd=str(repo)
+    )
+
+    assert run("rev-parse", "refs/heads/thanks/update", cwd=repo) == commit
+    assert run("rev-parse", f"{commit}^", cwd=repo) == head
+    tree = run("ls-tree", "-r", "--name-only", commit, cwd=repo).splitlines()
+    assert tree == [".thanks-contributors/contributors.json", "README.md"]
+    assert run("show", f"{commit}:README.md", cwd=repo) == "# repo\n\nthanks"
+    assert run("log", "-1", "--format=%an <%ae>|%s", commit, cwd=repo) == (
+        "github-actions[bot] <41898282+github-actions[bot]@users.noreply.github.com>|chore: update contributors"
+    )
+    # HEAD, the index and the working tree are left alone
+    assert run("rev-parse", "HEAD", cwd=repo) == head
+    assert run("symbolic-ref", "HEAD", cwd=repo) == "refs/heads/main"
+    assert run("diff", "--cached", "--name-only", cwd=repo) == ""
+    assert (out / "contributors.json").exists()
+
+    git._push_branch("thanks/update", force=True, cwd=str(repo))
+    assert run("rev-parse", "refs/heads/thanks/update", cwd=repo.parent / "origin.git") == commit
+
+
+def test_updates_existing_branch_and_skips_unchanged_tree(repo):
+    readme = repo / "README.md"
+    readme.write_text("one\n")
+    first = git.commit_files_plumbing(["README.md"], "thanks/update", "first", cwd=str(repo))
+    readme.write_text("two\n")
+    second = git.commit_files_plumbing(["README.md"], "thanks/update", "second", cwd=str(repo))
+
+    # The branch grows from its own tip, not from HEAD
+    assert run("rev-parse", f"{second}^", cwd=repo) == first
+    assert git.commit_files_plumbing(["README.md"], "thanks/update", "third", cwd=str(repo)) is None
+    assert run("rev-parse", "refs/heads/thanks/update", cwd=repo) == second
+
+
+def test_stale_expected_ref_fails_compare_and_swap(repo, monkeypatch):
+    (repo / "README.md").write_text("ours\n")
+    git.commit_files_plumbing(["README.md"], "thanks/update", "ours", cwd=str(repo))
+    concurrent = run("commit-tree", "HEAD^{tree}", "-p", "HEAD", "-m", "concurrent", cwd=repo)
+
+    real = git._git_or_raise
+
+    def racing(args, *a, **kw):
+        # Another writer moves the branch after its tip was read
+        if args[0] == "update-ref":
+            real(["update-ref", "refs/heads/thanks/update", concurrent], cwd=str(repo))
+        return real(args, *a, **kw)
+
+    monkeypatch.setattr(git, "_git_or_raise", racing)
+    (repo / "README.md").write_text("theirs\n")
+    with pytest.raises(RuntimeError, match="update-ref"):
+        git.commit_files_plumbing(["README.md"], "thanks/update", "late", cwd=str(repo))
+    assert run("rev-parse", "refs/heads/thanks/update", cwd=repo) == concurrent
+
+
+def test_missing_listed_file_is_not_deleted(repo):
+    # A tracked file this run didn't write (README not updated, PNG without
+    # Pillow) stays as it is on the branch
+    (repo / "README.md").unlink()
+    (repo / ".thanks-contributors" / "stale.json").unlink()
+    (repo / ".thanks-contributors" / "contributors.json").write_text('{"count": 1}\n')
+
+    commit = git.commit_files_plumbing(
+        [".thanks-contributors", "README.md", ".thanks-contributors/contributors.png"],
+        "thanks/update",
+        "update",
+        cwd=str(repo),
+    )
+
+    tree = run("ls-tree", "-r", "--name-only", commit, cwd=repo).splitlines()
+    assert "README.md" in tree
+    assert run("show", f"{commit}:README.md", cwd=repo) == "# repo"
+    # Stale files inside a generated directory are still dropped
+    assert ".thanks-contributors/stale.json" not in tree
+    assert ".thanks-contributors/contributors.json" in tree
@@ -0,0 +1,36 @@
+"""The virtualized HTML wall: paged data location and the "+K more" item."""
+
+import json
+import re
+
+import render_contributors as rc
+
+PEOPLE = [{"name": f"dev{i}", "html_url": f"https://github.com/dev{i}", "contributions": 10 - i} for i in range(5)]
+
+
+def test_capped_wall_carries_overflow_and_page_relative_data_url(tmp_path):
+    html_path = tmp_path / "site" / "contributors.html"
+    data_dir = tmp_path / "data" / "contributors-data"
+    json_path = tmp_path / "data" / "contributors.json"
+    html_path.parent.mkdir()
+
+    rc.render_wall(
+        PEOPLE, str(html_path), None, html_mode="virtual", data_dir=str(data_dir), formats=["html"],
+        max_contributors={"html": 2}, full_data_path=str(json_path),
+    )
+
+    index = json.loads((data_dir / "index.json").read_text(encoding="utf-8"))
+    assert (index["count"], index["overflow"]) == (2, 3)
+    page = html_path.read_text(encoding="utf-8")
+    assert re.search(r"data-src='\.\./data/contributors-data/'", page)
+    assert re.search(r"data-more='\.\./data/contributors\.json'", page)
+
+
+def test_uncapped_wall_has_no_overflow(tmp_path):
+    html_path = tmp_path / "contributors.html"
+    data_dir = tmp_path / "contributors-data"
+
+    rc.render_wall(PEOPLE, str(html_path), None, html_mode="virtual", data_dir=str(data_dir), formats=["html"])
+
+    assert json.loads((data_dir / "index.json").read_text(encoding="utf-8"))["overflow"] == 0
+    assert "data-src='contributors-data/'" in html_path.read_text(encoding="utf-8")
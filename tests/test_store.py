@@ -0,0 +1,76 @@
+"""ContributorStore run snapshots and schema versions."""
+
+import sqlite3
+
+import pytest
+
+import store
+from store import ContributorStore
+
+PEOPLE = {
+    "user:alice": {"login": "alice", "name": "alice", "html_url": "https://github.com/alice", "avatar_url": "https://a/alice"},
+    "user:bob": {"login": "bob", "name": "bob", "html_url": "https://github.com/bob", "avatar_url": "https://a/bob"},
+}
+
+
+def counts(details, full):
+    return [(c["name"], c["contributions"]) for c in details[full]["contributors"]]
+
+
+def test_old_runs_keep_their_repo_contributions(tmp_path):
+    db = ContributorStore(tmp_path / "contributors.db")
+    first = db.record_run(["o/*"], PEOPLE, {"o/r": {"user:alice": 3}})
+    second = db.record_run(["o/*"], PEOPLE, {"o/r": {"user:bob": 5, "user:alice": 4}})
+
+    assert counts(db.details(first), "o/r") == [("alice", 3)]
+    assert counts(db.details(second), "o/r") == [("bob", 5), ("alice", 4)]
+    assert [c["login"] for c in db.repo_contributors(first)["o/r"]] == ["alice"]
+    assert [(c["name"], c["contributions"]) for c in db.wall(first)] == [("alice", 3)]
+    assert [(c["full_name"], c["contributions"]) for c in db.contributions_of("alice")] == [("o/r", 4)]
+
+
+def test_upgrades_version_3_file(tmp_path):
+    path = tmp_path / "contributors.db"
+    old = sqlite3.connect(str(path))
+    old.executescript(
+        """
+        CREATE TABLE repos (id INTEGER PRIMARY KEY, full_name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                            owner TEXT NOT NULL COLLATE NOCASE, updated_at REAL NOT NULL);
+        CREATE TABLE contributors (id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, login TEXT COLLATE NOCASE,
+                                   name TEXT, email TEXT COLLATE NOCASE, html_url TEXT, avatar_url TEXT, first_run INTEGER);
+        CREATE TABLE repo_contributions (repo_id INTEGER NOT NULL, contributor_id INTEGER NOT NULL,
+                                         contributions INTEGER NOT NULL, position INTEGER NOT NULL,
+                                         PRIMARY KEY (repo_id, contributor_id)) WITHOUT ROWID;
+        CREATE INDEX idx_repo_contributions_contributor ON repo_contributions(contributor_id);
+        CREATE TABLE runs (id INTEGER PRIMARY KEY, started_at REAL NOT NULL, targets TEXT NOT NULL);
+        CREATE TABLE run_repos (run_id INTEGER NOT NULL, repo_id INTEGER NOT NULL,
+                                PRIMARY KEY (run_id, repo_id)) WITHOUT ROWID;
+        INSERT INTO repos VALUES (1, 'o/r', 'o', 0);
+        INSERT INTO contributors VALUES (1, 'user:alice', 'alice', 'alice', NULL, NULL, NULL, 1);
+        INSERT INTO runs VALUES (1, 0, 'o/*'), (2, 0, 'o/*');
+        INSERT INTO run_repos VALUES (1, 1), (2, 1);
+        INSERT INTO repo_contributions VALUES (1, 1, 9, 0);
+        PRAGMA user_version = 3;
+        """
+    )
+    old.close()
+
+    db = ContributorStore(path)
+
+    assert counts(db.details(2), "o/r") == [("alice", 9)]
+    assert db.details(1) == {}
+    assert db.owner_types() == {}
+    db.record_run(["o/*"], PEOPLE, {"o/r": {"user:alice": 10}})
+    assert counts(db.details(2), "o/r") == [("alice", 9)]
+    db.close()
+    assert sqlite3.connect(str(path)).execute("PRAGMA user_version").fetchone()[0] == store.SCHEMA_VERSION
+
+
+def test_refuses_newer_schema(tmp_path):
+    path = tmp_path / "contributors.db"
+    newer = sqlite3.connect(str(path))
+    newer.execute(f"PRAGMA user_version = {store.SCHEMA_VERSION + 1}")
+    newer.close()
+
+    with pytest.raises(ValueError, match="newer"):
+        ContributorStore(path)